@@ -54,6 +54,18 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument('--open-report', action='store_true', help='Open generated static HTML report in browser')
     parser.add_argument('--token', default=None, help='Explicit Webex access token (overrides .env and WEBEX_ACCESS_TOKEN)')
     parser.add_argument('--concurrent-requests', type=int, default=10)
+    parser.add_argument('--parallel-exports', type=int, default=4, help='inventory_run: exports scheduled concurrently')
+    parser.add_argument('--artifact-concurrency', type=int, default=1,
+                        help='inventory_run: concurrent per-ID calls within one artifact (async SDK when > 1)')
+    parser.add_argument('--resume', action='store_true', help='inventory_run: reuse checkpoints of the previous run')
+    parser.add_argument('--refresh-module', action='append', default=None,
+                        help='inventory_run with --resume: refetch this module (repeatable)')
+    parser.add_argument('--export-formats', default='json,csv',
+                        help='inventory_run: comma separated export formats besides NDJSON (json, csv, parquet)')
+    parser.add_argument('--raw-json', choices=['full', 'compact', 'off'], default='full',
+                        help='inventory_run: how artifact rows keep the raw API payload')
+    parser.add_argument('--delta', action='store_true',
+                        help='inventory_run: export changes against the previous run and only refresh changed entities')
     parser.add_argument('--only-failures', action='store_true')
     parser.add_argument('--debug-har', action='store_true')
     parser.add_argument('--decisions-file', default=None, help='JSON file with stage decisions to avoid interactive prompts')
@@ -70,6 +82,13 @@ def inventory_run(args) -> int:
         include_group_members=not args.skip_group_members,
         write_cache=not args.no_cache,
         write_report=not args.no_report,
+        max_parallel_exports=getattr(args, 'parallel_exports', 4),
+        artifact_concurrency=getattr(args, 'artifact_concurrency', 1),
+        resume=getattr(args, 'resume', False),
+        refresh_modules=tuple(getattr(args, 'refresh_module', None) or ()),
+        raw_json=getattr(args, 'raw_json', 'full'),
+        delta=getattr(args, 'delta', False),
+        export_formats=tuple(f.strip() for f in getattr(args, 'export_formats', 'json,csv').split(',') if f.strip()),
     )
     try:
         api = create_api(token=args.token)
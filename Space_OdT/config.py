@@ -13,6 +13,20 @@ class Settings:
     include_group_members: bool = True
     write_cache: bool = True
     write_report: bool = True
+    # exports running at once; HTTP concurrency stays capped by the API session's request budget
+    max_parallel_exports: int = 4
+    # per-ID calls in flight for each artifact; values above 1 use the async SDK
+    artifact_concurrency: int = 1
+    # reuse checkpoints of an earlier run; modules in refresh_modules are fetched again and artifacts
+    # whose source rows changed are recomputed
+    resume: bool = False
+    refresh_modules: tuple[str, ...] = ()
+    # written next to the per-module NDJSON rows; 'parquet' needs pyarrow
+    export_formats: tuple[str, ...] = ('json', 'csv')
+    # raw_json column of artifact rows: 'full' (sorted keys), 'compact' or 'off'
+    raw_json: str = 'full'
+    # diff against the previous run (delta/ folder and report) and reuse per-ID results of unchanged source rows
+    delta: bool = False
     enabled_modules: list[str] = field(default_factory=lambda: [
         'people',
         'groups',
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+#: columns identifying an entity, most specific first; the first one present in a module's columns is its key, so
+#: e.g. a person row is keyed by ``person_id`` and moving the person to another location is a change
+KEY_COLUMNS = (
+    'requirement_id', 'entity_id', 'member_id', 'person_id', 'workspace_id', 'virtual_line_id', 'license_id',
+    'group_id', 'id', 'location_id',
+)
+#: composite keys of modules whose rows are not identified by one column: associations are keyed by parent and
+#: member, number lists by owner and number
+MODULE_KEY_COLUMNS: dict[str, tuple[str, ...]] = {
+    'group_members': ('group_id', 'member_id'),
+    'license_assigned_users': ('license_id', 'member_id'),
+    'call_queue_agents': ('queue_id', 'id'),
+    'person_available_numbers_primary': ('location_id', 'direct_number'),
+    **{name: ('person_id', 'direct_number') for name in (
+        'person_numbers', 'person_transfer_numbers', 'person_available_numbers_secondary',
+        'person_available_numbers_call_forward', 'person_available_numbers_call_intercept',
+        'person_available_numbers_ecbn', 'person_available_numbers_fax_message',
+    )},
+    **{name: ('workspace_id', 'direct_number') for name in (
+        'workspace_numbers', 'workspace_available_numbers_available', 'workspace_available_numbers_secondary',
+    )},
+    **{name: ('virtual_line_id', 'direct_number') for name in (
+        'virtual_line_available_numbers_available', 'virtual_line_available_numbers_primary',
+        'virtual_line_available_numbers_secondary',
+    )},
+}
+#: columns ignored when hashing row content
+VOLATILE_COLUMNS = ('source_method', 'raw_keys')
+
+
+def row_hash(row: dict) -> str:
+    content = {k: v for k, v in row.items() if k not in VOLATILE_COLUMNS}
+    data = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def key_columns(name: str, columns: Iterable[str]) -> tuple[str, ...]:
+    """Natural key of a module: its composite key from :data:`MODULE_KEY_COLUMNS`, else the first key column."""
+    present = set(columns)
+    composite = tuple(c for c in MODULE_KEY_COLUMNS.get(name, ()) if c in present)
+    if composite:
+        return composite
+    return tuple(c for c in KEY_COLUMNS if c in present)[:1]
+
+
+def _keyed(rows: Iterable[dict], key: tuple[str, ...]) -> Iterator[tuple[str, str, dict]]:
+    """
+    (natural key, content hash, row). Rows without a key value or repeating a key already seen are keyed by their
+    content hash, so the result does not depend on row order; identical rows are told apart by their count.
+    """
+    seen_keys: set[str] = set()
+    seen_hashes: Counter = Counter()
+    for row in rows:
+        digest = row_hash(row)
+        values = [row.get(column) for column in key]
+        if any(value not in (None, '') for value in values):
+            row_key = json.dumps(values, default=str)
+            if row_key not in seen_keys:
+                seen_keys.add(row_key)
+                yield row_key, digest, row
+                continue
+        seen_hashes[digest] += 1
+        yield f'#{digest}#{seen_hashes[digest]}', digest, row
+
+
+def _read_ndjson(path: Path) -> Iterator[dict]:
+    with path.open(encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def snapshot_previous(exports_dir: Path, previous_dir: Path) -> bool:
+    """
+    Keep the NDJSON rows of the last run in ``previous_dir`` before they are overwritten.
+
+    Files are hard linked where possible; the row store replaces files instead of rewriting them, so the links keep
+    the old content. Returns False if there is nothing to compare against.
+    """
+    sources = sorted(exports_dir.glob('*.ndjson')) if exports_dir.exists() else []
+    if not sources:
+        return False
+    if previous_dir.exists():
+        shutil.rmtree(previous_dir)
+    previous_dir.mkdir(parents=True)
+    for path in sources:
+        target = previous_dir / path.name
+        try:
+            os.link(path, target)
+        except OSError:
+            shutil.copy2(path, target)
+    return True
+
+
+class _DeltaFile:
+    """NDJSON file that is only created once the first row is written."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = None
+
+    def write(self, row: dict) -> None:
+        if self._f is None:
+            self._f = self.path.open('w', encoding='utf-8')
+        self._f.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+
+
+def diff_module(name: str, previous: Path | None, current: Iterable[dict], columns: list[str],
+                delta_dir: Path) -> dict[str, int]:
+    """
+    Compare the rows of one module with the previous run by natural key and content hash.
+
+    Writes ``<name>.added.ndjson``, ``<name>.removed.ndjson`` and ``<name>.changed.ndjson`` (current row plus
+    ``changed_fields``) to ``delta_dir`` when they are not empty and returns the counts. Only the keys and content
+    hashes of the previous run are held in memory; its full rows are read back for the changed and removed keys.
+    """
+    key = key_columns(name, columns)
+    has_previous = previous is not None and previous.exists()
+    old: dict[str, str] = {}
+    if has_previous:
+        old = {row_key: digest for row_key, digest, _ in _keyed(_read_ndjson(previous), key)}
+    counts = {'added': 0, 'removed': 0, 'changed': 0, 'unchanged': 0}
+    files = {kind: _DeltaFile(delta_dir / f'{name}.{kind}.ndjson') for kind in ('added', 'removed', 'changed')}
+    changed_rows: dict[str, dict] = {}
+    try:
+        for row_key, digest, row in _keyed(current, key):
+            before = old.pop(row_key, None)
+            if before is None:
+                counts['added'] += 1
+                files['added'].write(row)
+            elif before != digest:
+                changed_rows[row_key] = row
+            else:
+                counts['unchanged'] += 1
+        # ``old`` now only holds the removed keys
+        if changed_rows or old:
+            for row_key, _, previous_row in _keyed(_read_ndjson(previous), key):
+                row = changed_rows.get(row_key)
+                if row is not None:
+                    counts['changed'] += 1
+                    changed = sorted(k for k in set(row) | set(previous_row)
+                                     if k not in VOLATILE_COLUMNS and row.get(k) != previous_row.get(k))
+                    files['changed'].write({**row, 'changed_fields': ','.join(changed)})
+                elif row_key in old:
+                    counts['removed'] += 1
+                    files['removed'].write(previous_row)
+    finally:
+        for f in files.values():
+            f.close()
+    return counts
+
+
+def diff_runs(modules: Iterable[str], previous_dir: Path, rows_for: Callable[[str], Iterable[dict]],
+              columns_for: Callable[[str], list[str]], delta_dir: Path) -> dict[str, dict[str, int]]:
+    """Diff every module against ``previous_dir`` and write ``summary.json`` to ``delta_dir``."""
+    if delta_dir.exists():
+        shutil.rmtree(delta_dir)
+    delta_dir.mkdir(parents=True)
+    summary = {
+        name: diff_module(name, previous_dir / f'{name}.ndjson', rows_for(name), columns_for(name), delta_dir)
+        for name in modules
+    }
+    (delta_dir / 'summary.json').write_text(json.dumps(summary, indent=2), encoding='utf-8')
+    return summary
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
 from html import escape
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Callable
 
 from .config import Settings
+from .delta import diff_runs, row_hash, snapshot_previous
 from .io.artifact_paths import ensure_dirs
+from .io.checkpoints import CheckpointStore, fingerprint
 from .io.csv_writer import write_csv
 from .io.json_writer import write_json
+from .io.row_store import RowStore
 from .modules.catalog import MODULE_SPECS, run_spec
-from .modules.v1_manifest import V1_ARTIFACT_SPECS, columns_for_artifact, run_artifact
-from .status import StatusRecord, StatusRecorder, classify_exception, timed_call
+from .modules.common import BoundCall, bind_call
+from .modules.v1_manifest import (
+    LOOKUP_METHODS,
+    V1_ARTIFACT_SPECS,
+    ArtifactSpec,
+    SharedAsyncApi,
+    columns_for_artifact,
+    kwargs_key,
+    run_artifact,
+    run_artifact_concurrent,
+    source_groups,
+)
+from .status import StatusRecord, StatusRecorder, classify_exception, collect_metrics, record_response, timed_call
 
 
 EXPORT_COLUMNS = {
@@ -22,7 +40,8 @@ EXPORT_COLUMNS = {
     'workspaces': ['id', 'workspace_id', 'name', 'location_id', 'extension', 'phone_number', 'webex_calling_enabled'],
     'licenses_no_pstn': ['entity_id', 'entity_type', 'license_id', 'license_name', 'is_pstn'],
     'v1_requirements_status': ['requirement_id', 'status', 'artifact', 'details'],
-    'status': ['module', 'method', 'result', 'http_status', 'error', 'count', 'elapsed_ms'],
+    'status': ['module', 'method', 'result', 'http_status', 'error', 'count', 'elapsed_ms', 'calls', 'requests', 'bytes',
+               'throttled', 'p50_ms', 'p95_ms', 'calls_per_sec', 'calls_per_row'],
 }
 
 
@@ -32,15 +51,26 @@ def _columns_for_module(module_name: str) -> list[str]:
     return columns_for_artifact(module_name)
 
 
-def _write_module_exports(exports_dir: Path, module_name: str, rows: list[dict]) -> None:
-    write_json(exports_dir / f'{module_name}.json', rows)
-    write_csv(exports_dir / f'{module_name}.csv', rows, _columns_for_module(module_name))
+#: modules read by lookups or post-processing; they get a compact on-disk index in the row store
+INDEXED_MODULES = frozenset(
+    {src.module for spec in V1_ARTIFACT_SPECS for src in spec.param_sources}
+    | set(LOOKUP_METHODS)
+    | {'licenses', 'license_assigned_users'}
+)
 
 
-def _empty_module(exports_dir: Path, module_name: str) -> None:
-    _write_module_exports(exports_dir, module_name, [])
+def _open_row_store(exports_dir: Path, settings: Settings) -> RowStore:
+    return RowStore(exports_dir, columns_for=_columns_for_module, formats=settings.export_formats,
+                    indexed_modules=INDEXED_MODULES)
 
 
+def _write_module_exports(store: RowStore, module_name: str, rows: list[dict]) -> None:
+    with store.writer(module_name) as writer:
+        writer.write(rows)
+
+
+def _empty_module(store: RowStore, module_name: str) -> None:
+    _write_module_exports(store, module_name, [])
 
 
 def _is_non_pstn_license(name: str) -> bool:
@@ -112,20 +142,30 @@ def _build_v1_requirements_status(cache_entities: dict[str, list[dict]]) -> list
 
     return statuses
 
-def _write_cache_if_enabled(settings: Settings, cache_entities: dict) -> None:
+def _write_cache_if_enabled(settings: Settings, cache_entities: RowStore) -> None:
+    """Stream every module of the row store into cache.json, one row per line."""
     if not settings.write_cache:
         return
-    payload = {
-        'meta': {
-            'generated_at_utc': datetime.now(timezone.utc).isoformat(),
-            'schema_version': 'v1',
-        },
-        'entities': cache_entities,
+    meta = {
+        'generated_at_utc': datetime.now(timezone.utc).isoformat(),
+        'schema_version': 'v1',
     }
-    write_json(settings.out_dir / 'cache.json', payload)
-
-
-def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module_counts: dict[str, int]) -> Path | None:
+    path = settings.out_dir / 'cache.json'
+    tmp = path.with_suffix('.json.tmp')
+    with tmp.open('w', encoding='utf-8') as f:
+        f.write('{\n  "meta": ' + json.dumps(meta, ensure_ascii=False) + ',\n  "entities": {')
+        for module_index, name in enumerate(cache_entities):
+            f.write((',' if module_index else '') + '\n    ' + json.dumps(name) + ': [')
+            row_index = -1
+            for row_index, row in enumerate(cache_entities.full_rows(name)):
+                f.write((',' if row_index else '') + '\n      ' + json.dumps(row, ensure_ascii=False, default=str))
+            f.write('\n    ]' if row_index >= 0 else ']')
+        f.write('\n  }\n}\n')
+    os.replace(tmp, path)
+
+
+def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module_counts: dict[str, int],
+                             delta_summary: dict[str, dict[str, int]] | None = None) -> Path | None:
     if not settings.write_report:
         return None
 
@@ -145,6 +185,47 @@ def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module
     ok_count = sum(1 for row in status_rows if row.get('result') == 'ok')
     not_found_count = sum(1 for row in status_rows if row.get('result') == 'not_found')
     error_count = sum(1 for row in status_rows if row.get('result') == 'error')
+    call_count = sum(row.get('calls') or 0 for row in status_rows)
+    throttled_count = sum(row.get('throttled') or 0 for row in status_rows)
+
+    # where to optimise or trim the manifest: longest steps and steps needing most calls per exported row
+    slowest = sorted((row for row in status_rows if row.get('elapsed_ms')), key=lambda row: -row['elapsed_ms'])[:5]
+    slowest_list = ''.join(
+        f"<li><span>{escape(str(row.get('module', '')))}</span><strong>{row['elapsed_ms']} ms</strong></li>"
+        for row in slowest
+    ) or '<li><span>No timings recorded</span></li>'
+    fan_out = sorted((row for row in status_rows if row.get('calls_per_row')),
+                     key=lambda row: -row['calls_per_row'])[:5]
+    fan_out_list = ''.join(
+        f"<li><span>{escape(str(row.get('module', '')))}</span>"
+        f"<strong>{row['calls_per_row']} calls/row</strong></li>"
+        for row in fan_out
+    ) or '<li><span>No calls recorded</span></li>'
+
+    def metric_cell(row: dict, key: str) -> str:
+        value = row.get(key)
+        return f"<td>{escape(str(value)) if value is not None else ''}</td>"
+
+    delta_html = ''
+    if delta_summary is not None:
+        delta_rows = ''.join(
+            '<tr>'
+            f"<td>{escape(name)}</td><td>{counts['added']}</td><td>{counts['removed']}</td>"
+            f"<td>{counts['changed']}</td><td>{counts['unchanged']}</td>"
+            '</tr>'
+            for name, counts in sorted(delta_summary.items())
+            if counts['added'] or counts['removed'] or counts['changed']
+        ) or "<tr><td colspan='5'>No changes since the previous run</td></tr>"
+        delta_html = f"""
+    <section class='table-wrap delta'>
+      <table>
+        <thead>
+          <tr><th>Changes since previous run</th><th>Added</th><th>Removed</th><th>Changed</th><th>Unchanged</th></tr>
+        </thead>
+        <tbody>{delta_rows}</tbody>
+      </table>
+    </section>
+"""
 
     rows_html = ''.join(
         (
@@ -153,7 +234,9 @@ def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module
             f"<td><code>{escape(str(row.get('method', '')))}</code></td>"
             f"<td><span class='badge badge-{escape(str(row.get('result', 'unknown')))}'>{escape(str(row.get('result', '')))}</span></td>"
             f"<td>{escape(str(row.get('count', 0)))}</td>"
-            f"<td class='error-cell'>{escape(str(row.get('error', '')))}</td>"
+            + ''.join(metric_cell(row, key) for key in ('elapsed_ms', 'calls', 'throttled', 'p50_ms', 'p95_ms',
+                                                         'calls_per_sec', 'calls_per_row'))
+            + f"<td class='error-cell'>{escape(str(row.get('error', '')))}</td>"
             '</tr>'
         )
         for row in status_rows
@@ -267,6 +350,7 @@ def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module
     .badge-ok {{ color: #a7f3c2; background: rgba(46, 204, 113, 0.15); border-color: rgba(46, 204, 113, 0.35); }}
     .badge-not_found {{ color: #ffe8a3; background: rgba(241, 196, 15, 0.16); border-color: rgba(241, 196, 15, 0.35); }}
     .badge-error {{ color: #ffc4c4; background: rgba(255, 107, 107, 0.16); border-color: rgba(255, 107, 107, 0.35); }}
+    .delta {{ margin-bottom: 18px; }}
     .error-cell {{ color: #ffccd3; max-width: 520px; white-space: pre-wrap; word-break: break-word; }}
 
     @media (max-width: 768px) {{
@@ -288,6 +372,8 @@ def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module
       <article class='metric'><div class='metric-label'>OK</div><div class='metric-value'>{ok_count}</div></article>
       <article class='metric'><div class='metric-label'>Not found</div><div class='metric-value'>{not_found_count}</div></article>
       <article class='metric'><div class='metric-label'>Errors</div><div class='metric-value'>{error_count}</div></article>
+      <article class='metric'><div class='metric-label'>API calls</div><div class='metric-value'>{call_count}</div></article>
+      <article class='metric'><div class='metric-label'>429 responses</div><div class='metric-value'>{throttled_count}</div></article>
     </section>
 
     <section class='cards'>
@@ -299,12 +385,21 @@ def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module
         <h2>V1 retrieval artifacts</h2>
         <ul>{artifact_list}</ul>
       </article>
+      <article class='card'>
+        <h2>Slowest steps</h2>
+        <ul>{slowest_list}</ul>
+      </article>
+      <article class='card'>
+        <h2>Highest fan-out</h2>
+        <ul>{fan_out_list}</ul>
+      </article>
     </section>
-
+{delta_html}
     <section class='table-wrap'>
       <table>
         <thead>
-          <tr><th>Module</th><th>Method</th><th>Result</th><th>Count</th><th>Error</th></tr>
+          <tr><th>Module</th><th>Method</th><th>Result</th><th>Count</th><th>Elapsed ms</th><th>Calls</th><th>429s</th>
+            <th>p50 ms</th><th>p95 ms</th><th>Calls/s</th><th>Calls/row</th><th>Error</th></tr>
         </thead>
         <tbody>{rows_html}</tbody>
       </table>
@@ -319,64 +414,264 @@ def _write_report_if_enabled(settings: Settings, status_rows: list[dict], module
     return report_file
 
 
-
-
-def run_exports(api, settings: Settings) -> dict:
-    paths = ensure_dirs(settings.out_dir)
-    exports_dir = paths['exports']
-
-    recorder = StatusRecorder()
-    cache_entities: dict[str, list[dict]] = {}
-    module_counts: dict[str, int] = {}
+@dataclass(frozen=True)
+class ExportNode:
+    """One schedulable export step: a catalog module or a V1 artifact."""
+    key: str
+    module: str
+    method: str
+    kind: str
+    spec: Any
+    depends_on: tuple[str, ...] = ()
+
+
+def build_export_plan(settings: Settings) -> list[ExportNode]:
+    """Build the export DAG in the legacy sequential order.
+
+    An artifact depends on the latest earlier producer of every module named in its ``param_sources``. A step that
+    (re)writes a module additionally waits for that module's previous producer and for every step that read the
+    previous rows, so the outcome matches the sequential run.
+    """
+    nodes: list[ExportNode] = []
+    producers: dict[str, str] = {}
+    readers: dict[str, list[str]] = {}
+
+    def add(key: str, module: str, method: str, kind: str, spec: Any, sources: set[str]) -> None:
+        deps = {producers[name] for name in sources if name in producers}
+        if module in producers:
+            deps.add(producers[module])
+        deps.update(readers.get(module, []))
+        deps.discard(key)
+        for name in sources:
+            readers.setdefault(name, []).append(key)
+        producers[module] = key
+        readers[module] = []
+        nodes.append(ExportNode(key, module, method, kind, spec, tuple(sorted(deps))))
 
     for spec in MODULE_SPECS:
         if spec.name not in settings.enabled_modules:
             continue
-        try:
-            result, elapsed = timed_call(run_spec, api, spec)
-            _write_module_exports(exports_dir, result.module, result.rows)
-            cache_entities[result.module] = result.rows
-            module_counts[result.module] = result.count
-            recorder.add(StatusRecord(spec.name, spec.list_path, 'ok', None, '', result.count, elapsed))
-        except Exception as exc:
-            err, status, msg = classify_exception(exc)
-            _empty_module(exports_dir, spec.name)
-            recorder.add(StatusRecord(spec.name, spec.list_path, err, status, msg, 0, 0))
-            cache_entities[spec.name] = []
-            module_counts[spec.name] = 0
-
+        add(f'module:{spec.name}', spec.name, spec.list_path, 'module', spec, set())
     for spec in V1_ARTIFACT_SPECS:
         if spec.module not in settings.enabled_modules:
             continue
+        add(f'artifact:{spec.module}', spec.module, spec.method_path, 'artifact', spec,
+            {src.module for src in spec.param_sources})
+    return nodes
+
+
+@dataclass
+class CompiledPlan:
+    """
+    Export plan bound to one API instance.
+
+    The method of every step is resolved and its accepted kwargs introspected once, so per-ID calls skip both.
+    ``elapsed_ms`` collects the step timings of runs made with the plan; a plan can be reused for several runs.
+    """
+    nodes: list[ExportNode]
+    calls: dict[str, BoundCall]
+    elapsed_ms: dict[str, int] = field(default_factory=dict)
+
+    def describe(self) -> list[dict[str, Any]]:
+        return [
+            {
+                'key': node.key,
+                'method': node.method,
+                'depends_on': list(node.depends_on),
+                'accepted_kwargs': sorted(self.calls[node.key].accepted) if node.key in self.calls else None,
+                'elapsed_ms': self.elapsed_ms.get(node.key),
+            }
+            for node in self.nodes
+        ]
+
+
+def compile_export_plan(api, settings: Settings) -> CompiledPlan:
+    nodes = build_export_plan(settings)
+    calls: dict[str, BoundCall] = {}
+    for node in nodes:
+        try:
+            calls[node.key] = bind_call(api, node.method)
+        except AttributeError:
+            # reported as an error status when the step runs
+            continue
+    return CompiledPlan(nodes, calls)
+
+
+def run_dag(nodes: list[ExportNode], run_node: Callable[[ExportNode], Any], max_workers: int) -> dict[str, Any]:
+    """Run ``run_node`` for every node, starting each one as soon as all of its dependencies have finished.
+
+    Returns the results keyed by node key. Exceptions raised by ``run_node`` propagate once running nodes finish.
+    """
+    pending = {node.key: node for node in nodes}
+    done: dict[str, Any] = {}
+    running: dict[Future, str] = {}
+
+    def submit_ready(pool: ThreadPoolExecutor) -> None:
+        for key, node in list(pending.items()):
+            if all(dep in done for dep in node.depends_on):
+                del pending[key]
+                running[pool.submit(run_node, node)] = key
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='export') as pool:
+        submit_ready(pool)
+        while running:
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in finished:
+                key = running.pop(future)
+                done[key] = future.result()
+            submit_ready(pool)
+    if pending:
+        raise RuntimeError(f'export plan has unresolved dependencies: {sorted(pending)}')
+    return done
+
+
+def _node_fingerprint(node: ExportNode, store: RowStore, settings: Settings) -> str:
+    if node.kind == 'module':
+        return fingerprint({'method': node.method, 'kwargs': node.spec.static_list_kwargs})
+    spec = node.spec
+    sources = sorted({src.module for src in spec.param_sources})
+    return fingerprint({
+        'method': node.method,
+        'kwargs': spec.static_kwargs,
+        'param_sources': spec.param_sources,
+        'required_fields': spec.required_fields,
+        'raw_json': settings.raw_json,
+        'sources': {name: store.digest(name) for name in sources},
+    })
+
+
+def _source_row_hashes(store: RowStore, spec: ArtifactSpec) -> dict[str, str]:
+    """Content hash of the source row(s) behind every per-ID call of ``spec``, keyed by :func:`kwargs_key`."""
+    groups = source_groups(spec)
+    if len(groups) != 1:
+        return {}
+    sources = groups[0]
+    hashes: dict[str, list[str]] = {}
+    for row in store.get(sources[0].module, []):
+        values = [row.get(source.field) for source in sources]
+        if not all(values) or any(source.required_field and not row.get(source.required_field) for source in sources):
+            continue
+        kwargs = dict(spec.static_kwargs)
+        kwargs.update(zip((source.name for source in sources), values))
+        hashes.setdefault(kwargs_key(kwargs), []).append(row_hash(row))
+    return {key: ','.join(sorted(digests)) for key, digests in hashes.items()}
+
+
+def _run_export_node(api, node: ExportNode, store: RowStore, settings: Settings, checkpoints: CheckpointStore,
+                     call: BoundCall | None = None, shared: SharedAsyncApi | None = None):
+    name = f'{node.kind}-{node.module}'
+    node_fingerprint = _node_fingerprint(node, store, settings)
+    if settings.resume and not (node.kind == 'module' and node.module in settings.refresh_modules):
+        done = checkpoints.load_done(name, node_fingerprint)
+        if done is not None and store.adopt(node.module, done['count']):
+            return done['count'], StatusRecord(node.module, done['method'], 'ok', None, '', done['count'],
+                                               done['elapsed_ms'])
+    partial = None
+    with collect_metrics() as metrics:
         try:
-            result, elapsed = timed_call(run_artifact, api, spec, cache_entities)
-            _write_module_exports(exports_dir, result.module, result.rows)
-            cache_entities[result.module] = result.rows
-            module_counts[result.module] = result.count
-            recorder.add(StatusRecord(result.module, result.method, 'ok', None, '', result.count, elapsed))
+            if node.kind == 'module':
+                result, elapsed = timed_call(run_spec, api, node.spec, call)
+                _write_module_exports(store, result.module, result.rows)
+            else:
+                resumed = checkpoints.load_partial(name, node_fingerprint) if settings.resume else {}
+                source_hashes = _source_row_hashes(store, node.spec) if settings.delta else {}
+                partial = checkpoints.open_partial(name, node_fingerprint, keep=settings.resume)
+                if settings.delta:
+                    # calls of the previous run whose source row is unchanged are not repeated; they are copied
+                    # into the partial log one at a time and read back from it when reused
+                    for key, source, rows in checkpoints.iter_calls(name):
+                        if key not in resumed and source and source_hashes.get(key) == source:
+                            partial.add(key, rows, source)
+                    partial.flush()
+                completed = (checkpoints.load_partial(name, node_fingerprint)
+                             if settings.resume or settings.delta else {})
+                with store.writer(node.module) as writer:
+                    options = {
+                        'completed': completed,
+                        'on_progress': lambda kwargs, rows: partial.add(
+                            kwargs_key(kwargs), rows, source_hashes.get(kwargs_key(kwargs), '')),
+                        'sink': writer.write,
+                        'raw_json': settings.raw_json,
+                    }
+                    if settings.artifact_concurrency > 1 and node.spec.param_sources:
+                        result, elapsed = timed_call(run_artifact_concurrent, api, node.spec, store,
+                                                     concurrency=settings.artifact_concurrency, shared=shared,
+                                                     **options)
+                    else:
+                        result, elapsed = timed_call(run_artifact, api, node.spec, store, call=call, **options)
+                partial.flush()
+            checkpoints.save_done(name, node_fingerprint, method=result.method, count=result.count, elapsed_ms=elapsed)
+            return result.count, StatusRecord(result.module, result.method, 'ok', None, '', result.count, elapsed,
+                                              **metrics.summary(elapsed, result.count))
         except Exception as exc:
             err, status, msg = classify_exception(exc)
-            _empty_module(exports_dir, spec.module)
-            recorder.add(StatusRecord(spec.module, spec.method_path, err, status, msg, 0, 0))
-            cache_entities[spec.module] = []
-            module_counts[spec.module] = 0
+            _empty_module(store, node.module)
+            return 0, StatusRecord(node.module, node.method, err, status, msg, 0, 0, **metrics.summary(0, 0))
+        finally:
+            if partial is not None:
+                partial.flush()
+
+
+def run_exports(api, settings: Settings, plan: CompiledPlan | None = None) -> dict:
+    paths = ensure_dirs(settings.out_dir)
+    exports_dir = paths['exports']
+    previous_dir = settings.out_dir / 'previous'
+    has_previous = settings.delta and snapshot_previous(exports_dir, previous_dir)
+
+    recorder = StatusRecorder()
+    cache_entities = _open_row_store(exports_dir, settings)
+    module_counts: dict[str, int] = {}
+
+    checkpoints = CheckpointStore(settings.out_dir / 'checkpoints')
+
+    plan = plan or compile_export_plan(api, settings)
+    session = getattr(api, 'session', None)
+    callback_id = None
+    if session is not None and hasattr(session, 'register_response_callback'):
+        callback_id = session.register_response_callback(record_response)
+    # one async session for all nodes, so their concurrent per-ID calls share one request budget
+    shared = None
+    if settings.artifact_concurrency > 1 and any(node.kind == 'artifact' and node.spec.param_sources
+                                                 for node in plan.nodes):
+        shared = SharedAsyncApi(api.access_token, settings.artifact_concurrency)
+    try:
+        results = run_dag(
+            plan.nodes,
+            lambda node: _run_export_node(api, node, cache_entities, settings, checkpoints, plan.calls.get(node.key),
+                                          shared),
+            settings.max_parallel_exports,
+        )
+    finally:
+        if shared is not None:
+            shared.close()
+        if callback_id is not None:
+            session.unregister_response_callback(callback_id)
+    # report in plan order so status files do not depend on completion order
+    for node in plan.nodes:
+        count, record = results[node.key]
+        module_counts[node.module] = count
+        plan.elapsed_ms[node.key] = record.elapsed_ms
+        recorder.add(record)
 
     status_rows = [asdict(r) for r in recorder.records]
     write_csv(exports_dir / 'status.csv', status_rows, EXPORT_COLUMNS['status'])
     write_json(exports_dir / 'status.json', status_rows)
 
     licenses_no_pstn_rows = _build_licenses_no_pstn(cache_entities)
-    _write_module_exports(exports_dir, 'licenses_no_pstn', licenses_no_pstn_rows)
-    cache_entities['licenses_no_pstn'] = licenses_no_pstn_rows
+    _write_module_exports(cache_entities, 'licenses_no_pstn', licenses_no_pstn_rows)
     module_counts['licenses_no_pstn'] = len(licenses_no_pstn_rows)
 
     requirement_rows = _build_v1_requirements_status(cache_entities)
-    _write_module_exports(exports_dir, 'v1_requirements_status', requirement_rows)
-    cache_entities['v1_requirements_status'] = requirement_rows
+    _write_module_exports(cache_entities, 'v1_requirements_status', requirement_rows)
     module_counts['v1_requirements_status'] = len(requirement_rows)
 
+    delta_summary = None
+    if has_previous:
+        delta_summary = diff_runs(list(cache_entities), previous_dir, cache_entities.full_rows, _columns_for_module,
+                                  settings.out_dir / 'delta')
+
     _write_cache_if_enabled(settings, cache_entities)
-    report_path = _write_report_if_enabled(settings, status_rows, module_counts)
+    report_path = _write_report_if_enabled(settings, status_rows, module_counts, delta_summary)
 
     return {
         'out_dir': str(settings.out_dir),
@@ -384,4 +679,5 @@ def run_exports(api, settings: Settings) -> dict:
         'status_count': len(status_rows),
         'module_counts': module_counts,
         'report_path': str(report_path) if report_path else '',
+        'delta': delta_summary,
     }
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+from typing import Any
+
+#: per-ID results buffered before they are appended to the partial checkpoint
+CHECKPOINT_BATCH_SIZE = 50
+
+
+def fingerprint(payload: Any) -> str:
+    """Hash of the inputs a checkpoint was produced from."""
+    data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class PartialCheckpoint:
+    """Append-only JSONL log of finished per-ID calls of one artifact."""
+
+    def __init__(self, path: Path, fingerprint_value: str, *, batch_size: int = CHECKPOINT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._buffer: list[str] = []
+        self._lock = threading.Lock()
+        if not path.exists():
+            path.write_text(json.dumps({'fingerprint': fingerprint_value}) + '\n', encoding='utf-8')
+
+    def add(self, key: str, rows: list[dict], source: str = '') -> None:
+        """Record the rows of one call; ``source`` is the content hash of the source row it was made for."""
+        with self._lock:
+            entry = {'key': key, 'rows': rows, 'source': source}
+            self._buffer.append(json.dumps(entry, ensure_ascii=False, default=str))
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        with self.path.open('a', encoding='utf-8') as f:
+            f.write('\n'.join(self._buffer) + '\n')
+        self._buffer.clear()
+
+
+class LoggedCalls(Mapping):
+    """
+    Read-only view of a call log: key -> rows.
+
+    Only the byte offset of each entry is kept in memory; the rows of a call are read back from the log when it is
+    looked up.
+    """
+
+    def __init__(self, path: Path, offsets: dict[str, int]):
+        self.path = path
+        self._offsets = offsets
+
+    def __getitem__(self, key: str) -> list[dict]:
+        offset = self._offsets[key]
+        with self.path.open('rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())['rows']
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+
+class CheckpointStore:
+    """
+    On-disk checkpoints of an inventory run.
+
+    ``<name>.done.json`` records a finished export step (its rows live in the row store); ``<name>.partial.jsonl`` holds the finished
+    per-ID calls of an artifact that did not complete. Both are only reused when their fingerprint matches. Once an
+    artifact completes its call log is kept as ``<name>.calls.jsonl`` so a later run can reuse calls whose source
+    rows did not change.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        root.mkdir(parents=True, exist_ok=True)
+
+    def _done_path(self, name: str) -> Path:
+        return self.root / f'{name}.done.json'
+
+    def _partial_path(self, name: str) -> Path:
+        return self.root / f'{name}.partial.jsonl'
+
+    def _calls_path(self, name: str) -> Path:
+        return self.root / f'{name}.calls.jsonl'
+
+    def load_done(self, name: str, fingerprint_value: str) -> dict | None:
+        path = self._done_path(name)
+        if not path.exists():
+            return None
+        try:
+            payload = json.loads(path.read_text(encoding='utf-8'))
+        except json.JSONDecodeError:
+            return None
+        if payload.get('fingerprint') != fingerprint_value:
+            return None
+        return payload
+
+    def save_done(self, name: str, fingerprint_value: str, *, method: str, count: int, elapsed_ms: int) -> None:
+        path = self._done_path(name)
+        tmp = path.with_suffix('.tmp')
+        payload = {'fingerprint': fingerprint_value, 'method': method, 'elapsed_ms': elapsed_ms, 'count': count}
+        tmp.write_text(json.dumps(payload, ensure_ascii=False, default=str), encoding='utf-8')
+        os.replace(tmp, path)
+        partial = self._partial_path(name)
+        if partial.exists():
+            os.replace(partial, self._calls_path(name))
+        else:
+            self._calls_path(name).unlink(missing_ok=True)
+
+    @staticmethod
+    def _iter_log(path: Path, fingerprint_value: str | None) -> Iterator[tuple[int, dict]]:
+        """Entries of a call log one at a time, with the byte offset of their line."""
+        if not path.exists():
+            return
+        with path.open('rb') as f:
+            try:
+                header = json.loads(f.readline())
+            except json.JSONDecodeError:
+                return
+            if fingerprint_value is not None and header.get('fingerprint') != fingerprint_value:
+                return
+            offset = f.tell()
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # line torn by an interrupted run
+                    entry = None
+                if entry is not None:
+                    yield offset, entry
+                offset += len(line)
+
+    def load_partial(self, name: str, fingerprint_value: str) -> LoggedCalls:
+        path = self._partial_path(name)
+        return LoggedCalls(path, {entry['key']: offset for offset, entry in self._iter_log(path, fingerprint_value)})
+
+    def iter_calls(self, name: str) -> Iterator[tuple[str, str, list[dict]]]:
+        """Calls of the last completed run of an artifact, streamed: (key, source row hash, rows)."""
+        for _, entry in self._iter_log(self._calls_path(name), None):
+            yield entry['key'], entry.get('source', ''), entry['rows']
+
+    def open_partial(self, name: str, fingerprint_value: str, *, keep: bool) -> PartialCheckpoint:
+        path = self._partial_path(name)
+        if not keep or not self._header_matches(path, fingerprint_value):
+            path.unlink(missing_ok=True)
+        return PartialCheckpoint(path, fingerprint_value)
+
+    @staticmethod
+    def _header_matches(path: Path, fingerprint_value: str) -> bool:
+        if not path.exists():
+            return False
+        with path.open(encoding='utf-8') as f:
+            try:
+                return json.loads(f.readline()).get('fingerprint') == fingerprint_value
+            except json.JSONDecodeError:
+                return False
+
+    def clear(self, name: str) -> None:
+        self._done_path(name).unlink(missing_ok=True)
+        self._partial_path(name).unlink(missing_ok=True)
+        self._calls_path(name).unlink(missing_ok=True)
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+#: formats written next to the NDJSON row store for every module
+DEFAULT_EXPORT_FORMATS = ('json', 'csv')
+SUPPORTED_EXPORT_FORMATS = ('json', 'csv', 'parquet')
+#: columns left out of the compact lookup indexes
+INDEX_EXCLUDED_COLUMNS = ('raw_json', 'raw_keys')
+PARQUET_BATCH_SIZE = 1000
+
+
+def _dumps(row: dict) -> str:
+    return json.dumps(row, ensure_ascii=False, default=str)
+
+
+class StoredRows:
+    """Lazy, re-iterable view of the rows of one module stored as NDJSON."""
+
+    def __init__(self, path: Path, count: int | None = None):
+        self.path = path
+        self._count = count
+
+    def __iter__(self) -> Iterator[dict]:
+        if not self.path.exists():
+            return
+        with self.path.open(encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def __len__(self) -> int:
+        if self._count is None:
+            if not self.path.exists():
+                self._count = 0
+            else:
+                with self.path.open('rb') as f:
+                    self._count = sum(1 for line in f if line.strip())
+        return self._count
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, StoredRows)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+class _JsonArrayWriter:
+    """Streams a JSON array laid out exactly like ``json.dumps(rows, indent=2)``."""
+
+    def __init__(self, path: Path):
+        self._f = path.open('w', encoding='utf-8')
+        self._first = True
+
+    def write(self, row: dict) -> None:
+        text = json.dumps(row, indent=2, ensure_ascii=False)
+        self._f.write(('[\n' if self._first else ',\n') + '\n'.join(f'  {line}' for line in text.split('\n')))
+        self._first = False
+
+    def close(self) -> None:
+        self._f.write('[]' if self._first else '\n]')
+        self._f.close()
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: list[str]):
+        self._f = path.open('w', newline='', encoding='utf-8')
+        self._columns = columns
+        self._writer = csv.DictWriter(self._f, fieldnames=columns, extrasaction='ignore')
+        self._writer.writeheader()
+
+    def write(self, row: dict) -> None:
+        self._writer.writerow({k: row.get(k, '') for k in self._columns})
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class _ParquetWriter:
+    """Parquet output with the CSV column projection; values are stored as strings."""
+
+    def __init__(self, path: Path, columns: list[str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError('parquet export requires pyarrow (pip install pyarrow)') from exc
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(c, pa.string()) for c in columns])
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._batch: list[dict] = []
+
+    def write(self, row: dict) -> None:
+        self._batch.append({c: None if row.get(c) is None else str(row.get(c)) for c in self._columns})
+        if len(self._batch) >= PARQUET_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._batch:
+            self._writer.write_table(self._pa.Table.from_pylist(self._batch, schema=self._schema))
+            self._batch = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+class _NdjsonWriter:
+    def __init__(self, path: Path, exclude: tuple[str, ...] = ()):
+        self._f = path.open('w', encoding='utf-8')
+        self._exclude = exclude
+
+    def write(self, row: dict) -> None:
+        if self._exclude:
+            row = {k: v for k, v in row.items() if k not in self._exclude}
+        self._f.write(_dumps(row) + '\n')
+
+    def close(self) -> None:
+        self._f.close()
+
+
+class ModuleWriter:
+    """
+    Streams the rows of one module to the row store and its export files.
+
+    Everything is written to temporary files that replace the previous version on :meth:`close`, so readers never
+    see a half written module; :meth:`abort` discards them.
+    """
+
+    def __init__(self, store: 'RowStore', name: str, *, export: bool = True):
+        self.store = store
+        self.name = name
+        self.count = 0
+        self._targets: list[tuple[Path, Path]] = []
+        self._writers = []
+        columns = store.columns_for(name)
+
+        def add(path: Path, factory) -> None:
+            tmp = path.with_name(f'.{path.name}.tmp')
+            self._writers.append(factory(tmp))
+            self._targets.append((tmp, path))
+
+        try:
+            add(store.rows_path(name), _NdjsonWriter)
+            if name in store.indexed_modules:
+                add(store.index_path(name), lambda p: _NdjsonWriter(p, INDEX_EXCLUDED_COLUMNS))
+            for fmt in store.formats if export else ():
+                if fmt == 'json':
+                    add(store.root / f'{name}.json', _JsonArrayWriter)
+                elif fmt == 'csv':
+                    add(store.root / f'{name}.csv', lambda p: _CsvWriter(p, columns))
+                elif fmt == 'parquet':
+                    add(store.root / f'{name}.parquet', lambda p: _ParquetWriter(p, columns))
+        except Exception:
+            self.abort()
+            raise
+
+    def write(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            for writer in self._writers:
+                writer.write(row)
+            self.count += 1
+
+    def close(self) -> int:
+        for writer in self._writers:
+            writer.close()
+        for tmp, path in self._targets:
+            os.replace(tmp, path)
+        self.store._written(self.name, self.count)
+        return self.count
+
+    def abort(self) -> None:
+        for writer in self._writers:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        for tmp, _ in self._targets:
+            tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> 'ModuleWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class RowStore(Mapping):
+    """
+    Export rows of an inventory run, kept on disk instead of in memory.
+
+    Each module is stored as ``<root>/<module>.ndjson`` and mirrored to the configured export formats. Modules used
+    as lookup sources also get a compact index (``<root>/.index/<module>.ndjson``, without raw payload columns) that
+    backs lookups. Reading a module returns a lazy :class:`StoredRows`; assigning rows updates the store without
+    touching the export files.
+    """
+
+    def __init__(self, root: Path, *, columns_for: Callable[[str], list[str]],
+                 formats: Iterable[str] = DEFAULT_EXPORT_FORMATS, indexed_modules: Iterable[str] = ()):
+        formats = tuple(formats)
+        unknown = set(formats) - set(SUPPORTED_EXPORT_FORMATS)
+        if unknown:
+            raise ValueError(f'unsupported export formats: {sorted(unknown)}')
+        self.root = root
+        self.columns_for = columns_for
+        self.formats = formats
+        self.indexed_modules = frozenset(indexed_modules)
+        self._counts: dict[str, int] = {}
+        root.mkdir(parents=True, exist_ok=True)
+        (root / '.index').mkdir(exist_ok=True)
+
+    def rows_path(self, name: str) -> Path:
+        return self.root / f'{name}.ndjson'
+
+    def index_path(self, name: str) -> Path:
+        return self.root / '.index' / f'{name}.ndjson'
+
+    def writer(self, name: str, *, export: bool = True) -> ModuleWriter:
+        return ModuleWriter(self, name, export=export)
+
+    def _written(self, name: str, count: int) -> None:
+        self._counts[name] = count
+
+    def adopt(self, name: str, count: int) -> bool:
+        """Register the files of a previous run for ``name`` if all of them are present and hold ``count`` rows."""
+        paths = [self.rows_path(name)] + [self.root / f'{name}.{fmt}' for fmt in self.formats]
+        if name in self.indexed_modules:
+            paths.append(self.index_path(name))
+        if not all(p.exists() for p in paths):
+            return False
+        if len(StoredRows(self.rows_path(name))) != count:
+            return False
+        self._counts[name] = count
+        return True
+
+    def digest(self, name: str) -> str:
+        if name not in self._counts:
+            return ''
+        h = hashlib.sha256()
+        with self.rows_path(name).open('rb') as f:
+            for chunk in iter(lambda: f.read(1 << 16), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def __getitem__(self, name: str) -> StoredRows:
+        if name not in self._counts:
+            raise KeyError(name)
+        path = self.index_path(name) if name in self.indexed_modules else self.rows_path(name)
+        return StoredRows(path, self._counts[name])
+
+    def __setitem__(self, name: str, rows: Iterable[dict]) -> None:
+        # lookups (e.g. hydrated sources) update the store only; exports go through writer()
+        with self.writer(name, export=False) as writer:
+            writer.write(rows)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._counts))
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def full_rows(self, name: str) -> StoredRows:
+        """All columns of ``name``, bypassing the compact index."""
+        return StoredRows(self.rows_path(name), self._counts.get(name, 0))
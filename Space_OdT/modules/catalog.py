@@ -1,9 +1,22 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from dataclasses import dataclass
+from time import perf_counter
 from typing import Any, Callable
 
-from .common import ModuleResult, as_list, call_with_supported_kwargs, details_keys, model_to_dict, resolve_attr
+from ..status import record_call
+from .common import (
+    BoundCall,
+    ModuleResult,
+    as_list,
+    bind_call,
+    call_with_supported_kwargs,
+    details_keys,
+    model_to_dict,
+    resolve_attr,
+)
 
 
 @dataclass(frozen=True)
@@ -47,6 +60,8 @@ def people_row(item: dict) -> dict:
         'person_id': _value(item, 'person_id', 'id'),
         'email': (item.get('emails') or [''])[0] if isinstance(item.get('emails'), list) else item.get('email', ''),
         'display_name': _value(item, 'display_name', 'displayName'),
+        'first_name': _value(item, 'first_name', 'firstName'),
+        'last_name': _value(item, 'last_name', 'lastName'),
         'status': _value(item, 'status'),
         'roles': ';'.join(item.get('roles', []) or []),
         'licenses': ';'.join(item.get('licenses', []) or []),
@@ -120,16 +135,26 @@ MODULE_SPECS: list[ModuleSpec] = [
 ]
 
 
-def run_spec(api, spec: ModuleSpec) -> ModuleResult:
-    list_fn = resolve_attr(api, spec.list_path)
-    raw = call_with_supported_kwargs(list_fn, **spec.static_list_kwargs)
-    items = [model_to_dict(v) for v in as_list(raw)]
-    rows = [spec.to_row(i) for i in items]
+def content_hash(item: dict) -> str:
+    """Hash of a full list item, so changes outside the exported columns are visible to delta runs."""
+    data = json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(data.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def run_spec(api, spec: ModuleSpec, list_call: BoundCall | None = None) -> ModuleResult:
+    list_call = list_call or bind_call(api, spec.list_path)
+    start = perf_counter()
+    # the list call returns a lazy generator; pages are fetched while it is consumed
+    items = [model_to_dict(v) for v in as_list(list_call(**spec.static_list_kwargs))]
+    record_call(start)
+    rows = [{**spec.to_row(i), 'content_hash': content_hash(i)} for i in items]
     keys: list[str] = []
     if rows and spec.detail_path:
         detail_fn = resolve_attr(api, spec.detail_path)
         detail_kwargs = spec.detail_kwargs_builder(rows[0])
+        start = perf_counter()
         detail_obj = call_with_supported_kwargs(detail_fn, **detail_kwargs)
+        record_call(start)
         keys = details_keys(detail_obj)
     for row in rows:
         if 'raw_keys' in row:
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import inspect
 from dataclasses import dataclass
-from typing import Any, Iterable
+from functools import lru_cache
+from typing import Any, Callable, Iterable
 
 
 @dataclass
@@ -45,17 +46,59 @@ def as_list(value: Any) -> list:
     return [value]
 
 
+@lru_cache(maxsize=None)
+def _path_parts(dotted: str) -> tuple[str, ...]:
+    return tuple(dotted.split('.'))
+
+
 def resolve_attr(root: Any, dotted: str) -> Any:
     current = root
-    for part in dotted.split('.'):
+    for part in _path_parts(dotted):
         current = getattr(current, part)
     return current
 
 
+@lru_cache(maxsize=1024)
+def _parameter_names(fn: Callable, bound: bool) -> frozenset[str]:
+    names = list(inspect.signature(fn).parameters)
+    return frozenset(names[1:] if bound else names)
+
+
+def accepted_kwargs(fn: Callable) -> frozenset[str]:
+    """
+    Parameter names of ``fn``.
+
+    Cached per underlying function, so bound methods of every API instance share one introspection.
+    """
+    func = getattr(fn, '__func__', None)
+    try:
+        if func is not None:
+            return _parameter_names(func, True)
+        return _parameter_names(fn, False)
+    except TypeError:
+        # unhashable callable
+        return frozenset(inspect.signature(fn).parameters)
+
+
+@dataclass(frozen=True)
+class BoundCall:
+    """An API method resolved from its dotted path, with the keyword arguments it accepts."""
+    path: str
+    fn: Callable
+    accepted: frozenset[str]
+
+    def __call__(self, **kwargs):
+        return self.fn(**{k: v for k, v in kwargs.items() if k in self.accepted and v is not None})
+
+
+def bind_call(root: Any, dotted: str) -> BoundCall:
+    fn = resolve_attr(root, dotted)
+    return BoundCall(dotted, fn, accepted_kwargs(fn))
+
+
 def call_with_supported_kwargs(fn, **kwargs):
-    sig = inspect.signature(fn)
-    accepted = {k: v for k, v in kwargs.items() if k in sig.parameters and v is not None}
-    return fn(**accepted)
+    accepted = accepted_kwargs(fn)
+    return fn(**{k: v for k, v in kwargs.items() if k in accepted and v is not None})
 
 
 def first_id(rows: list[dict]) -> str | None:
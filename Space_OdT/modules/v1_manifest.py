@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
 import json
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from itertools import product
-from typing import Any
+from time import perf_counter
+from typing import Any, Awaitable, Callable, TypeVar
 
-from .common import ModuleResult, as_list, call_with_supported_kwargs, model_to_dict, resolve_attr
+from ..status import record_call, record_response
+from .common import BoundCall, ModuleResult, as_list, bind_call, call_with_supported_kwargs, model_to_dict, resolve_attr
 
 
 STANDARD_COLUMNS = [
@@ -93,7 +99,7 @@ ARTIFACT_COLUMNS: dict[str, list[str]] = {
     'call_queues': ['location_id', 'id', 'name', 'direct_number', 'source_method', 'raw_keys', 'raw_json'],
     'call_queue_details': ['location_id', 'id', 'name', 'direct_number', 'source_method', 'raw_keys', 'raw_json'],
     'call_queue_settings': ['location_id', 'id', 'name', 'source_method', 'raw_keys', 'raw_json'],
-    'call_queue_agents': ['location_id', 'id', 'name', 'member_id', 'member_type', 'person_id', 'workspace_id', 'first_name', 'last_name', 'source_method', 'raw_keys', 'raw_json'],
+    'call_queue_agents': ['location_id', 'queue_id', 'id', 'name', 'member_id', 'member_type', 'person_id', 'workspace_id', 'first_name', 'last_name', 'source_method', 'raw_keys', 'raw_json'],
     'call_queue_forwarding': ['location_id', 'id', 'name', 'direct_number', 'source_method', 'raw_keys', 'raw_json'],
     'virtual_lines': ['virtual_line_id', 'location_id', 'id', 'name', 'first_name', 'last_name', 'direct_number', 'source_method', 'raw_keys', 'raw_json'],
     'virtual_line_details': ['virtual_line_id', 'location_id', 'id', 'name', 'first_name', 'last_name', 'direct_number', 'source_method', 'raw_keys', 'raw_json'],
@@ -123,10 +129,27 @@ class ParamSource:
 
 @dataclass(frozen=True)
 class ArtifactSpec:
+    """
+    Param sources from the same module are bound per row: one call per distinct source row.
+    Sources from different modules are combined as a cartesian product, which must be requested
+    explicitly with ``cross_product=True``.
+
+    With ``required_fields`` the per-row call is skipped when the cached source row already has all of these
+    fields; the row is then exported from the cache with ``source_method`` ``cache:<module>`` and empty
+    ``raw_keys``/``raw_json``.
+    """
     module: str
     method_path: str
     static_kwargs: dict[str, Any]
     param_sources: tuple[ParamSource, ...] = ()
+    cross_product: bool = False
+    required_fields: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        modules = {source.module for source in self.param_sources}
+        if len(modules) > 1 and not self.cross_product:
+            raise ValueError(f"Artifact '{self.module}' combines sources from {sorted(modules)}; "
+                             f"set cross_product=True to call every combination")
 
 
 class ParamSourceValidationError(ValueError):
@@ -165,6 +188,29 @@ def _id_values(cache: dict[str, list[dict]], source: ParamSource) -> list[Any]:
     return uniq
 
 
+def source_groups(spec: ArtifactSpec) -> list[tuple[ParamSource, ...]]:
+    """Param sources of ``spec`` grouped by the module they read from; each group is bound to one row."""
+    groups: dict[str, list[ParamSource]] = {}
+    for source in spec.param_sources:
+        groups.setdefault(source.module, []).append(source)
+    return [tuple(group) for group in groups.values()]
+
+
+def _row_values(cache: dict[str, list[dict]], sources: tuple[ParamSource, ...]) -> list[tuple[Any, ...]]:
+    """Distinct value tuples of sources bound to the same module row."""
+    out: list[tuple[Any, ...]] = []
+    seen = set()
+    for row in cache.get(sources[0].module, []):
+        values = tuple(row.get(source.field) for source in sources)
+        if not all(values) or any(source.required_field and not row.get(source.required_field) for source in sources):
+            continue
+        if values in seen:
+            continue
+        seen.add(values)
+        out.append(values)
+    return out
+
+
 def _iter_kwargs(
     cache: dict[str, list[dict]],
     spec: ArtifactSpec,
@@ -173,23 +219,42 @@ def _iter_kwargs(
 ) -> list[dict[str, Any]]:
     if not spec.param_sources:
         return [dict(spec.static_kwargs)]
-    source_diagnostics = [_build_source_id_diagnostic(cache, src) for src in spec.param_sources]
-    value_lists = [_id_values(cache, src) for src in spec.param_sources]
+    if diagnostics is not None:
+        diagnostics.extend(_build_source_id_diagnostic(cache, src) for src in spec.param_sources)
+    groups = source_groups(spec)
+    value_lists = [_row_values(cache, group) for group in groups]
     if any(not vals for vals in value_lists):
-        if diagnostics is not None:
-            diagnostics.extend(source_diagnostics)
         return []
-    if diagnostics is not None:
-        diagnostics.extend(source_diagnostics)
-    keys = [s.name for s in spec.param_sources]
     out: list[dict[str, Any]] = []
+    # a single group unless the spec opted into cross_product
     for combo in product(*value_lists):
         kwargs = dict(spec.static_kwargs)
-        kwargs.update(dict(zip(keys, combo)))
+        for group, values in zip(groups, combo):
+            kwargs.update(zip((source.name for source in group), values))
         out.append(kwargs)
     return out
 
 
+def _cached_source_rows(cache: dict[str, list[dict]], spec: ArtifactSpec) -> dict[tuple[Any, ...], dict]:
+    """Cached source rows that already carry every required field, keyed by their param values."""
+    groups = source_groups(spec)
+    if not spec.required_fields or len(groups) != 1:
+        return {}
+    sources = groups[0]
+    out: dict[tuple[Any, ...], dict] = {}
+    for row in cache.get(sources[0].module, []):
+        canonical = _canonical_item(row)
+        if all(canonical.get(field) not in (None, '') for field in spec.required_fields):
+            out.setdefault(tuple(row.get(source.field) for source in sources), row)
+    return out
+
+
+def _cached_row_for(cached: dict[tuple[Any, ...], dict], spec: ArtifactSpec, kwargs: dict[str, Any]) -> dict | None:
+    if not cached:
+        return None
+    return cached.get(tuple(kwargs.get(source.name) for source in spec.param_sources))
+
+
 def required_source_ids_per_artifact(spec: ArtifactSpec) -> list[dict[str, str | int | None]]:
     if not spec.param_sources:
         return []
@@ -254,56 +319,161 @@ def _enrich_lookup_row(module_name: str, raw_item: dict[str, Any]) -> dict[str,
     return row
 
 
-def hydrate_lookup_sources(api, spec: ArtifactSpec, cache: dict[str, list[dict]]) -> None:
+def _sources_to_hydrate(spec: ArtifactSpec, cache: dict[str, list[dict]]):
     for source in spec.param_sources:
         if _id_values(cache, source):
             continue
         lookup = LOOKUP_METHODS.get(source.module)
         if lookup is None:
             continue
-        method_path, kwargs = lookup
+        yield source, lookup
+
+
+def _store_lookup_rows(cache: dict[str, list[dict]], source: ParamSource, payload: Any) -> None:
+    rows = [_enrich_lookup_row(source.module, model_to_dict(i)) for i in as_list(payload)]
+    if rows:
+        cache[source.module] = rows
+
+
+#: export nodes run in parallel and can share a lookup module that no node produces
+_HYDRATE_LOCK = threading.Lock()
+
+
+def hydrate_lookup_sources(api, spec: ArtifactSpec, cache: dict[str, list[dict]]) -> None:
+    """
+    Fill sources without IDs from :data:`LOOKUP_METHODS`. Hydration is serialised and sources are checked again
+    under the lock, so a lookup module is fetched and written once even when several artifacts need it.
+    """
+    if next(_sources_to_hydrate(spec, cache), None) is None:
+        return
+    with _HYDRATE_LOCK:
+        for source, (method_path, kwargs) in _sources_to_hydrate(spec, cache):
+            try:
+                payload = call_with_supported_kwargs(resolve_attr(api, method_path), **kwargs)
+            except Exception:
+                continue
+            _store_lookup_rows(cache, source, payload)
+
+
+async def hydrate_lookup_sources_async(api, spec: ArtifactSpec, cache: dict[str, list[dict]]) -> None:
+    for source, (method_path, kwargs) in _sources_to_hydrate(spec, cache):
         try:
-            payload = call_with_supported_kwargs(resolve_attr(api, method_path), **kwargs)
+            payload = await call_with_supported_kwargs(resolve_attr(api, method_path), **kwargs)
         except Exception:
             continue
-        rows = [_enrich_lookup_row(source.module, model_to_dict(i)) for i in as_list(payload)]
-        if rows:
-            cache[source.module] = rows
+        _store_lookup_rows(cache, source, payload)
+
+
+#: candidate sources per canonical field, in order of preference; ('address', 'city') reads a nested value
+CANONICAL_SOURCES: dict[str, tuple[tuple[str, ...], ...]] = {
+    'id': (('id',), ('member_id',), ('person_id',), ('workspace_id',)),
+    'name': (('name',), ('displayName',), ('display_name',)),
+    'first_name': (('first_name',), ('firstName',)),
+    'last_name': (('last_name',), ('lastName',)),
+    'member_id': (('member_id',), ('memberId',), ('id',)),
+    'member_type': (('member_type',), ('memberType',), ('type',)),
+    'location_id': (('location_id',), ('locationId',), ('calling_data', 'location_id'), ('calling_data', 'locationId')),
+    'person_id': (('person_id',), ('personId',)),
+    'workspace_id': (('workspace_id',), ('workspaceId',)),
+    'license_id': (('license_id',), ('licenseId',)),
+    'virtual_line_id': (('virtual_line_id',), ('virtualLineId',)),
+    'group_id': (('group_id',), ('groupId',)),
+    'route_group_id': (('route_group_id',), ('routeGroupId',), ('premise_route_id',), ('premiseRouteId',)),
+    'connection_type': (('connection_type',), ('connectionType',), ('pstn_connection_type',),
+                        ('pstnConnectionType',)),
+    'language': (('language',), ('preferredLanguage',)),
+    'address_1': (('address_1',), ('address1',), ('address', 'address1')),
+    'city': (('city',), ('address', 'city')),
+    'state': (('state',), ('address', 'state')),
+    'postal_code': (('postal_code',), ('postalCode',), ('address', 'postalCode')),
+    'country': (('country',), ('address', 'country')),
+    'direct_number': (('direct_number',), ('directNumber',), ('phone_number',), ('phoneNumber',)),
+}
+#: top level keys holding the nested dicts used in CANONICAL_SOURCES
+_NESTED_KEYS = {'address': ('address',), 'calling_data': ('calling_data', 'callingData')}
+RAW_JSON_MODES = ('full', 'compact', 'off')
+
+
+def _nested(item: dict[str, Any], container: str) -> dict:
+    for key in _NESTED_KEYS[container]:
+        value = item.get(key)
+        if isinstance(value, dict):
+            return value
+    return {}
+
+
+def _compile_field(field: str, shape: frozenset[str]) -> Callable[[dict[str, Any]], Any]:
+    """
+    Getter for one canonical field, specialised to the keys present in an item: the first truthy candidate,
+    otherwise the value of the last candidate. A field already present in the item is taken as is.
+    """
+    if field in shape:
+        return lambda item: item[field]
+    candidates = CANONICAL_SOURCES[field]
+
+    def present(path: tuple[str, ...]) -> bool:
+        if len(path) == 1:
+            return path[0] in shape
+        return any(key in shape for key in _NESTED_KEYS[path[0]])
+
+    def getter(path: tuple[str, ...]) -> Callable[[dict[str, Any]], Any]:
+        if len(path) == 1:
+            key = path[0]
+            return lambda item: item.get(key)
+        container, key = path
+        return lambda item: _nested(item, container).get(key)
+
+    getters = [getter(path) for path in candidates if present(path)]
+    fallback = getters[-1] if getters and present(candidates[-1]) else (lambda item: None)
+    if not getters:
+        return fallback
+
+    def extract(item: dict[str, Any]) -> Any:
+        for get in getters:
+            value = get(item)
+            if value:
+                return value
+        return fallback(item)
+
+    return extract
+
+
+@lru_cache(maxsize=1024)
+def _compile_extractor(shape: frozenset[str], fields: tuple[str, ...]):
+    """Canonical field extractor for items with the given keys, computing only ``fields``; built once per shape."""
+    getters = {field: _compile_field(field, shape) for field in fields if field in CANONICAL_SOURCES}
+    needs_ids = any(field in fields for field in ('person_id', 'workspace_id'))
+    id_getters = {field: _compile_field(field, shape) for field in ('member_type', 'member_id', 'person_id',
+                                                                     'workspace_id', 'location_id')}
+    plain = tuple(field for field in fields if field not in CANONICAL_SOURCES)
+    has_calling_flag = 'webex_calling_enabled' in shape
+
+    def extract(item: dict[str, Any]) -> dict[str, Any]:
+        out = {field: get(item) for field, get in getters.items()}
+        for field in plain:
+            out[field] = item.get(field, '') if field != 'webex_calling_enabled' or has_calling_flag else None
+        if needs_ids:
+            member_type = str(id_getters['member_type'](item) or '').upper()
+            member_id = id_getters['member_id'](item)
+            if 'person_id' in out and not out['person_id'] and member_type in {'PEOPLE', 'PERSON', 'USER'} and member_id:
+                out['person_id'] = member_id
+            if 'workspace_id' in out and not out['workspace_id'] and member_type in {'WORKSPACE', 'PLACE'} and member_id:
+                out['workspace_id'] = member_id
+        if 'webex_calling_enabled' in out and not has_calling_flag:
+            out['webex_calling_enabled'] = bool(id_getters['location_id'](item))
+        return out
+
+    return extract
+
+
+@lru_cache(maxsize=1024)
+def _raw_keys(shape: tuple[str, ...]) -> str:
+    return ','.join(sorted(shape))
 
 
 def _canonical_item(item: dict[str, Any]) -> dict[str, Any]:
-    address = item.get('address') if isinstance(item.get('address'), dict) else {}
-    calling_data = item.get('calling_data') if isinstance(item.get('calling_data'), dict) else (
-        item.get('callingData') if isinstance(item.get('callingData'), dict) else {}
-    )
     out = dict(item)
-
-    out.setdefault('id', item.get('id') or item.get('member_id') or item.get('person_id') or item.get('workspace_id'))
-    out.setdefault('name', item.get('name') or item.get('displayName') or item.get('display_name'))
-    out.setdefault('first_name', item.get('first_name') or item.get('firstName'))
-    out.setdefault('last_name', item.get('last_name') or item.get('lastName'))
-    out.setdefault('member_id', item.get('member_id') or item.get('memberId') or item.get('id'))
-    out.setdefault('member_type', item.get('member_type') or item.get('memberType') or item.get('type'))
-    out.setdefault('location_id', item.get('location_id') or item.get('locationId')
-                   or calling_data.get('location_id') or calling_data.get('locationId'))
-    out.setdefault('person_id', item.get('person_id') or item.get('personId'))
-    out.setdefault('workspace_id', item.get('workspace_id') or item.get('workspaceId'))
-    out.setdefault('license_id', item.get('license_id') or item.get('licenseId'))
-    out.setdefault('virtual_line_id', item.get('virtual_line_id') or item.get('virtualLineId'))
-    out.setdefault('group_id', item.get('group_id') or item.get('groupId'))
-    out.setdefault('route_group_id', item.get('route_group_id') or item.get('routeGroupId') or item.get('premise_route_id')
-                   or item.get('premiseRouteId'))
-    out.setdefault('connection_type', item.get('connection_type') or item.get('connectionType')
-                   or item.get('pstn_connection_type') or item.get('pstnConnectionType'))
-    out.setdefault('language', item.get('language') or item.get('preferredLanguage'))
-    out.setdefault('address_1', item.get('address_1') or item.get('address1') or address.get('address1'))
-    out.setdefault('city', item.get('city') or address.get('city'))
-    out.setdefault('state', item.get('state') or address.get('state'))
-    out.setdefault('postal_code', item.get('postal_code') or item.get('postalCode') or address.get('postalCode'))
-    out.setdefault('country', item.get('country') or address.get('country'))
-    out.setdefault('direct_number', item.get('direct_number') or item.get('directNumber') or item.get('phone_number') or item.get('phoneNumber'))
-
-
+    out.update(_compile_extractor(frozenset(item), tuple(f for f in CANONICAL_SOURCES if f not in item))(item))
     member_type = str(out.get('member_type') or '').upper()
     if not out.get('person_id') and member_type in {'PEOPLE', 'PERSON', 'USER'} and out.get('member_id'):
         out['person_id'] = out.get('member_id')
@@ -316,15 +486,29 @@ def _canonical_item(item: dict[str, Any]) -> dict[str, Any]:
     return out
 
 
-def _row_from_item(item: dict, method_path: str, kwargs: dict[str, Any], module_name: str) -> dict:
-    canonical = _canonical_item(item)
-    row = {k: canonical.get(k, '') for k in columns_for_artifact(module_name)}
-    for k in ('location_id', 'person_id', 'workspace_id', 'license_id', 'virtual_line_id', 'group_id', 'id', 'name'):
+def _raw_json(item: dict[str, Any], mode: str) -> str:
+    if mode == 'full':
+        return json.dumps(item, ensure_ascii=False, sort_keys=True)
+    if mode == 'compact':
+        return json.dumps(item, ensure_ascii=False, separators=(',', ':'))
+    return ''
+
+
+def _row_from_item(item: dict, method_path: str, kwargs: dict[str, Any], module_name: str | None = None,
+                   raw_json: str = 'full') -> dict:
+    """
+    Export row for one API item. ``raw_json`` is 'full' (sorted keys), 'compact' or 'off' (left empty).
+    """
+    columns = tuple(columns_for_artifact(module_name or ''))
+    shape = tuple(item)
+    row = _compile_extractor(frozenset(shape), columns)(item)
+    for k in ('location_id', 'person_id', 'workspace_id', 'license_id', 'virtual_line_id', 'group_id', 'queue_id', 'id',
+              'name'):
         if k in row and not row.get(k) and kwargs.get(k):
             row[k] = kwargs[k]
     row['source_method'] = method_path
-    row['raw_keys'] = ','.join(sorted(item.keys()))
-    row['raw_json'] = json.dumps(item, ensure_ascii=False, sort_keys=True)
+    row['raw_keys'] = _raw_keys(shape)
+    row['raw_json'] = _raw_json(item, raw_json)
     return row
 
 
@@ -341,30 +525,258 @@ def _is_user_access_error(exc: Exception) -> bool:
     return False
 
 
-def run_artifact(api, spec: ArtifactSpec, cache: dict[str, list[dict]]) -> ModuleResult:
-    method = resolve_attr(api, spec.method_path)
-    rows: list[dict] = []
+def _payload_items(payload: Any) -> list[dict]:
+    """Items of a call result; consuming it fetches every page of a paginated list."""
+    items = [model_to_dict(i) for i in as_list(payload)]
+    if not items and isinstance(payload, object):
+        maybe = model_to_dict(payload)
+        if maybe:
+            items = [maybe]
+    return items
+
+
+def _rows_from_items(spec: ArtifactSpec, kwargs: dict[str, Any], items: list[dict],
+                     raw_json: str = 'full') -> list[dict]:
+    return [_row_from_item(item, spec.method_path, kwargs, spec.module, raw_json) for item in items]
+
+
+def _cached_artifact_row(spec: ArtifactSpec, kwargs: dict[str, Any], cached_row: dict) -> dict:
+    """
+    Artifact row built from a cached list row instead of a detail call. ``source_method`` is
+    ``cache:<module>`` and ``raw_keys``/``raw_json`` stay empty: there is no detail payload to record.
+    """
+    row = _row_from_item(cached_row, f'cache:{spec.param_sources[0].module}', kwargs, spec.module, 'off')
+    row['raw_keys'] = ''
+    return row
+
+
+ProgressCallback = Callable[[dict[str, Any], list[dict]], None]
+
+
+def kwargs_key(kwargs: dict[str, Any]) -> str:
+    """Stable key of one per-ID call, used to checkpoint fan-out progress."""
+    return json.dumps(kwargs, sort_keys=True, ensure_ascii=False, default=str)
+
+
+RowSink = Callable[[list[dict]], None]
+
+
+class _Rows:
+    """Collects artifact rows, or forwards them to a sink so they are never held in memory."""
+
+    def __init__(self, sink: RowSink | None):
+        self.sink = sink
+        self.rows: list[dict] = []
+        self.count = 0
+
+    def extend(self, rows: list[dict]) -> None:
+        self.count += len(rows)
+        if self.sink is None:
+            self.rows.extend(rows)
+        else:
+            self.sink(rows)
+
+    def append(self, row: dict) -> None:
+        self.extend([row])
+
+    def result(self, spec: ArtifactSpec) -> ModuleResult:
+        return ModuleResult(module=spec.module, method=spec.method_path, rows=self.rows, count=self.count, raw_keys=[])
+
+
+def run_artifact(api, spec: ArtifactSpec, cache: dict[str, list[dict]], *,
+                 call: BoundCall | None = None,
+                 completed: dict[str, list[dict]] | None = None,
+                 on_progress: ProgressCallback | None = None,
+                 sink: RowSink | None = None,
+                 raw_json: str = 'full') -> ModuleResult:
+    """
+    Call ``spec.method_path`` once per kwargs set derived from the cached sources.
+
+    ``completed`` maps :func:`kwargs_key` to rows of calls finished by an earlier run; those are not repeated.
+    ``on_progress`` is called with the kwargs and rows of every call made. With a ``sink`` rows are handed over in
+    order as they are produced and the returned result only carries the count. ``raw_json`` is passed on to
+    :func:`_row_from_item`. ``call`` is ``spec.method_path`` already bound to ``api`` (see
+    :func:`Space_OdT.export_runner.compile_export_plan`); it is resolved here when not given.
+    """
+    call = call or bind_call(api, spec.method_path)
+    rows = _Rows(sink)
     hydrate_lookup_sources(api, spec, cache)
     validate_param_sources(cache, spec)
     kwargs_diagnostics: list[dict[str, Any]] = []
+    cached = _cached_source_rows(cache, spec)
+    completed = completed or {}
     for kwargs in _iter_kwargs(cache, spec, diagnostics=kwargs_diagnostics):
+        cached_row = _cached_row_for(cached, spec, kwargs)
+        if cached_row is not None:
+            rows.append(_cached_artifact_row(spec, kwargs, cached_row))
+            continue
+        previous = completed.get(kwargs_key(kwargs))
+        if previous is not None:
+            rows.extend(previous)
+            continue
+        start = perf_counter()
         try:
-            payload = call_with_supported_kwargs(method, **kwargs)
+            # list methods return a lazy generator: the call only ends once every page is read
+            items = _payload_items(call(**kwargs))
         except Exception as exc:
+            record_call(start)
             # Some person-level endpoints return 4003 (unauthorized/user not found)
             # for users without Webex Calling entitlements. Skip these entities and
             # continue with the remaining exportable users.
-            if _is_user_access_error(exc):
-                continue
+            if not _is_user_access_error(exc):
+                raise
+            call_rows = []
+        else:
+            record_call(start)
+            call_rows = _rows_from_items(spec, kwargs, items, raw_json)
+        rows.extend(call_rows)
+        if on_progress is not None:
+            on_progress(kwargs, call_rows)
+    return rows.result(spec)
+
+
+async def run_artifact_async(api, spec: ArtifactSpec, cache: dict[str, list[dict]], *,
+                             concurrency: int = 10,
+                             completed: dict[str, list[dict]] | None = None,
+                             on_progress: ProgressCallback | None = None,
+                             sink: RowSink | None = None,
+                             raw_json: str = 'full') -> ModuleResult:
+    """
+    Same as :func:`run_artifact` but on an :class:`wxc_sdk.as_api.AsWebexSimpleApi`: the per-ID calls run
+    concurrently with at most ``concurrency`` calls in flight. Rows keep the order of the sequential run.
+    """
+    call = bind_call(api, spec.method_path)
+    await hydrate_lookup_sources_async(api, spec, cache)
+    validate_param_sources(cache, spec)
+    sem = asyncio.Semaphore(max(1, concurrency))
+    cached = _cached_source_rows(cache, spec)
+    completed = completed or {}
+
+    async def fetch(kwargs: dict[str, Any]) -> list[dict]:
+        cached_row = _cached_row_for(cached, spec, kwargs)
+        if cached_row is not None:
+            return [_cached_artifact_row(spec, kwargs, cached_row)]
+        previous = completed.get(kwargs_key(kwargs))
+        if previous is not None:
+            return previous
+        async with sem:
+            start = perf_counter()
+            try:
+                items = _payload_items(await call(**kwargs))
+            except Exception as exc:
+                record_call(start)
+                # same 4003 skip as in run_artifact
+                if not _is_user_access_error(exc):
+                    raise
+                call_rows = []
+            else:
+                record_call(start)
+                call_rows = _rows_from_items(spec, kwargs, items, raw_json)
+        if on_progress is not None:
+            on_progress(kwargs, call_rows)
+        return call_rows
+
+    rows = _Rows(sink)
+    finished: dict[int, list[dict]] = {}
+    next_index = 0
+
+    async def fetch_in_order(index: int, kwargs: dict[str, Any]) -> None:
+        # hand rows over in kwargs order, whatever order the calls finish in
+        nonlocal next_index
+        finished[index] = await fetch(kwargs)
+        while next_index in finished:
+            rows.extend(finished.pop(next_index))
+            next_index += 1
+
+    tasks = [asyncio.ensure_future(fetch_in_order(index, kwargs))
+             for index, kwargs in enumerate(_iter_kwargs(cache, spec))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return rows.result(spec)
+
+
+T = TypeVar('T')
+
+
+class SharedAsyncApi:
+    """
+    One :class:`wxc_sdk.as_api.AsWebexSimpleApi` on a background event loop, shared by the export nodes of a run.
+
+    Nodes run in worker threads; with one session their per-ID calls share a single limit of ``concurrency``
+    requests in flight instead of each node opening a session with its own limit.
+    """
+
+    def __init__(self, access_token: str, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='export-async', daemon=True)
+        self._thread.start()
+        try:
+            self.api = self.run(self._open(access_token))
+        except BaseException:
+            self._stop()
             raise
-        items = [model_to_dict(i) for i in as_list(payload)]
-        if not items and isinstance(payload, object):
-            maybe = model_to_dict(payload)
-            if maybe:
-                items = [maybe]
-        for item in items:
-            rows.append(_row_from_item(item, spec.method_path, kwargs, spec.module))
-    return ModuleResult(module=spec.module, method=spec.method_path, rows=rows, count=len(rows), raw_keys=[])
+
+    async def _open(self, access_token: str):
+        from wxc_sdk.as_api import AsWebexSimpleApi
+
+        api = AsWebexSimpleApi(tokens=access_token, concurrent_requests=self.concurrency)
+        api.session.register_response_callback(record_response)
+        return api
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run ``coro`` on the shared loop and wait for it; context variables of the caller (metrics) are kept."""
+        context = contextvars.copy_context()
+
+        async def in_context():
+            for var, value in context.items():
+                var.set(value)
+            return await coro
+
+        return asyncio.run_coroutine_threadsafe(in_context(), self._loop).result()
+
+    def _stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def close(self) -> None:
+        try:
+            self.run(self.api.close())
+        finally:
+            self._stop()
+
+    def __enter__(self) -> SharedAsyncApi:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_artifact_concurrent(api, spec: ArtifactSpec, cache: dict[str, list[dict]], *,
+                            concurrency: int = 10,
+                            completed: dict[str, list[dict]] | None = None,
+                            on_progress: ProgressCallback | None = None,
+                            sink: RowSink | None = None,
+                            raw_json: str = 'full',
+                            shared: SharedAsyncApi | None = None) -> ModuleResult:
+    """
+    Run :func:`run_artifact_async` from synchronous code on ``shared``, or on a :class:`SharedAsyncApi` opened for
+    this call with the token of ``api``. Lookup sources are hydrated beforehand with ``api`` through
+    :func:`hydrate_lookup_sources`.
+    """
+    hydrate_lookup_sources(api, spec, cache)
+    if shared is None:
+        with SharedAsyncApi(api.access_token, concurrency) as shared:
+            return run_artifact_concurrent(api, spec, cache, concurrency=concurrency, completed=completed,
+                                           on_progress=on_progress, sink=sink, raw_json=raw_json, shared=shared)
+    return shared.run(run_artifact_async(shared.api, spec, cache, concurrency=concurrency, completed=completed,
+                                         on_progress=on_progress, sink=sink, raw_json=raw_json))
 
 
 V1_ARTIFACT_SPECS: list[ArtifactSpec] = [
@@ -372,11 +784,14 @@ V1_ARTIFACT_SPECS: list[ArtifactSpec] = [
     ArtifactSpec('calling_locations_details', 'telephony.locations.details', {}, (ParamSource('location_id', 'calling_locations', 'id'),)),
 
     ArtifactSpec('location_details', 'locations.details', {},
-                 (ParamSource('location_id', 'locations', 'location_id'),)),
+                 (ParamSource('location_id', 'locations', 'location_id'),),
+                 required_fields=('location_id', 'name', 'language', 'address_1', 'city', 'postal_code', 'country')),
     ArtifactSpec('people_details', 'people.details', {'calling_data': True},
-                 (ParamSource('person_id', 'people', 'person_id'),)),
+                 (ParamSource('person_id', 'people', 'person_id'),),
+                 required_fields=('person_id', 'name', 'first_name', 'last_name')),
     ArtifactSpec('workspace_details', 'workspaces.details', {},
-                 (ParamSource('workspace_id', 'workspaces', 'id'),)),
+                 (ParamSource('workspace_id', 'workspaces', 'id'),),
+                 required_fields=('workspace_id', 'name', 'location_id', 'direct_number')),
     ArtifactSpec('location_pstn_connection', 'telephony.pstn.read', {},
                  (ParamSource('location_id', 'calling_locations', 'id'),)),
     ArtifactSpec('person_call_forwarding', 'person_settings.forwarding.read', {},
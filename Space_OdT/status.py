@@ -1,8 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
 from time import perf_counter
-from typing import Callable
+from typing import Any, Callable, Iterator
 
 from wxc_sdk.rest import RestError
 
@@ -16,6 +20,17 @@ class StatusRecord:
     error: str
     count: int
     elapsed_ms: int
+    #: SDK calls made by the step (one per list call / per-ID call)
+    calls: int = 0
+    #: HTTP requests behind those calls, including pages and 429 retries
+    requests: int = 0
+    bytes: int = 0
+    throttled: int = 0
+    p50_ms: int | None = None
+    p95_ms: int | None = None
+    calls_per_sec: float | None = None
+    #: SDK calls per exported row
+    calls_per_row: float | None = None
 
 
 class StatusRecorder:
@@ -45,3 +60,91 @@ def timed_call(fn: Callable, *args, **kwargs):
     value = fn(*args, **kwargs)
     elapsed_ms = int((perf_counter() - start) * 1000)
     return value, elapsed_ms
+
+
+def _percentile(values: list[float], pct: float) -> int | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return int(round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))]))
+
+
+@dataclass
+class CallMetrics:
+    """Call and response counters of one export step."""
+    calls: int = 0
+    requests: int = 0
+    bytes: int = 0
+    throttled: int = 0
+    latencies_ms: list[float] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add_call(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.latencies_ms.append(elapsed_ms)
+
+    def add_response(self, status: int, size: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.bytes += size
+            if status == 429:
+                self.throttled += 1
+
+    def summary(self, elapsed_ms: int, count: int) -> dict[str, Any]:
+        """Fields of :class:`StatusRecord` describing these metrics."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'requests': self.requests,
+                'bytes': self.bytes,
+                'throttled': self.throttled,
+                'p50_ms': _percentile(self.latencies_ms, 0.5),
+                'p95_ms': _percentile(self.latencies_ms, 0.95),
+                'calls_per_sec': round(self.calls * 1000 / elapsed_ms, 2) if self.calls and elapsed_ms else None,
+                'calls_per_row': round(self.calls / count, 2) if self.calls and count else None,
+            }
+
+
+_current_metrics: ContextVar[CallMetrics | None] = ContextVar('current_metrics', default=None)
+
+
+@contextmanager
+def collect_metrics() -> Iterator[CallMetrics]:
+    """Attribute calls and responses made in this context (and in tasks started from it) to a new :class:`CallMetrics`."""
+    metrics = CallMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def record_call(start: float) -> None:
+    """Record an SDK call started at ``perf_counter()`` value ``start``."""
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.add_call((perf_counter() - start) * 1000)
+
+
+def record_response(response, *args) -> None:
+    """
+    Response callback for :class:`wxc_sdk.rest.RestSession` and :class:`wxc_sdk.as_rest.AsRestSession`.
+
+    Register it with ``session.register_response_callback``; responses outside :func:`collect_metrics` are ignored.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return
+    status = getattr(response, 'status_code', None) or getattr(response, 'status', 0)
+    size = response.headers.get('Content-Length') if getattr(response, 'headers', None) is not None else None
+    if size is None and isinstance(getattr(response, 'content', None), bytes):
+        size = len(response.content)
+    if size is None and len(args) > 1:
+        # async callback: (response, request body, request content type, response data, diff_ns)
+        data = args[2]
+        if data is None:
+            size = 0
+        else:
+            size = len((data if isinstance(data, str) else json.dumps(data, default=str)).encode('utf-8'))
+    metrics.add_response(status, int(size or 0))
@@ -4,9 +4,9 @@ import asyncio
 import datetime as dt
 import json
 import uuid
-from dataclasses import asdict, replace
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterable, Iterator
 
 from wxc_sdk.as_api import AsWebexSimpleApi
 from wxc_sdk.har_writer import HarWriter
@@ -20,15 +20,18 @@ from wxc_sdk.person_settings.voicemail import VoicemailSettings
 from wxc_sdk.telephony.callqueue.agents import AgentCallQueueSetting
 
 from .io import (
+    RunJournal,
+    append_change_log,
     append_failures,
     bootstrap_v2_inputs,
-    load_input_records,
+    iter_input_records,
     load_policy,
     load_run_state,
     load_stage_overrides,
     load_v1_maps,
-    save_run_state,
-    write_change_log,
+    read_change_log,
+    read_failures,
+    reset_run_results,
     write_html_report,
 )
 from .models import ChangeEntry, FailureEntry, InputRecord, RecordResult, Stage, StageDecision
@@ -52,6 +55,22 @@ def _to_jsonable(value: Any) -> Any:
     return value
 
 
+def _desired(update: Any) -> dict[str, Any]:
+    # extra (undeclared) fields such as raw CSV columns are not part of the settings and cannot be compared
+    extra = set(getattr(update, 'model_extra', None) or {})
+    return update.model_dump(mode='json', by_alias=True, exclude_none=True, exclude=extra)
+
+
+def _is_subset(desired: Any, current: Any) -> bool:
+    """True if every value set in ``desired`` is equal in ``current``; an empty ``desired`` never matches."""
+    if isinstance(desired, dict):
+        return bool(desired) and isinstance(current, dict) and all(
+            k in current and (_is_subset(v, current[k]) if isinstance(v, dict) and v else v == current[k])
+            for k, v in desired.items()
+        )
+    return desired == current
+
+
 def parse_stage_decision(raw: str) -> tuple[StageDecision, str | None]:
     clean = raw.strip()
     if not clean:
@@ -78,12 +97,15 @@ class V2Runner:
         concurrent_requests: int = 10,
         debug_har: bool = False,
         decision_provider: DecisionProvider | None = None,
+        compact_every: int = 1000,
     ):
         self.token = token
         self.out_dir = out_dir
         self.concurrent_requests = concurrent_requests
         self.debug_har = debug_har
         self.decision_provider = decision_provider
+        # record results journaled between two rewrites of run_state.json
+        self.compact_every = compact_every
 
     async def run(self, *, only_failures: bool = False) -> dict[str, Any]:
         v2_dir = self.out_dir / 'v2'
@@ -96,12 +118,17 @@ class V2Runner:
                 f'{created_lines}'
             )
         policy = load_policy(v2_dir / 'static_policy.json')
-        records = load_input_records(v2_dir / 'input_softphones.csv')
+        input_path = v2_dir / 'input_softphones.csv'
+        # validate the whole input before the first change; records are streamed again when processed
+        for _ in iter_input_records(input_path):
+            pass
         resolvers = load_v1_maps(self.out_dir / 'v1_inventory')
 
         state_path = v2_dir / 'run_state.json'
         failures_path = v2_dir / 'failures.csv'
+        changes_path = v2_dir / 'changes.log'
         state = load_run_state(state_path)
+        interrupted = bool(state.get('in_progress'))
         run_id = str(uuid.uuid4())
         state.update({'run_id': run_id, 'started_at': dt.datetime.now(dt.timezone.utc).isoformat()})
 
@@ -110,45 +137,96 @@ class V2Runner:
             s.value: {'decision': d.value, 'override_path': p} for s, (d, p) in stage_decisions.items()
         }
 
-        pending_records = self._build_pending(records, state, only_failures=only_failures)
-        sem = asyncio.Semaphore(self.concurrent_requests)
+        if not only_failures:
+            reset_run_results(state)
+        pending_records = self._build_pending(iter_input_records(input_path), state, only_failures=only_failures,
+                                              interrupted=interrupted)
         har = HarWriter(file_name=str(v2_dir / 'http.har')) if self.debug_har else None
-
-        failures: list[FailureEntry] = []
-        changes: list[ChangeEntry] = []
-
-        async with AsWebexSimpleApi(tokens=self.token, concurrent_requests=self.concurrent_requests) as api:
-            if har:
-                api.session.har_writer = har
-            await api.people.me()
-            await api.licenses.list()
-
-            async def worker(record: InputRecord) -> None:
-                async with sem:
-                    result, row_failures, row_changes = await self._process_record(
-                        api,
-                        record,
-                        resolvers,
-                        policy,
-                        stage_decisions,
-                        stage_overrides,
-                    )
-                    state['record_results'][record.user_email] = asdict(result)
-                    failures.extend(row_failures)
-                    changes.extend(row_changes)
-
-            await asyncio.gather(*(worker(record) for record in pending_records))
-
-        state['completed_count'] = sum(1 for r in state['record_results'].values() if r.get('status') == 'success')
-        state['failed_count'] = sum(1 for r in state['record_results'].values() if r.get('status') == 'failed')
-
-        save_run_state(state_path, state)
-        if failures:
-            append_failures(failures_path, failures)
-        write_change_log(v2_dir / 'changes.log', changes)
-        write_html_report(v2_dir / 'report.html', run_id=run_id, changes=changes, failures=failures)
+        failures_offset = failures_path.stat().st_size if failures_path.exists() else 0
+
+        state['in_progress'] = True
+        journal = RunJournal(state_path, state, compact_every=self.compact_every)
+        journal.compact()
+
+        def queued() -> Iterator[InputRecord]:
+            for index, record in pending_records:
+                journal.start(index, record.user_email)
+                yield record
+
+        try:
+            with changes_path.open('w', encoding='utf-8') as changes_log:
+                async with AsWebexSimpleApi(tokens=self.token, concurrent_requests=self.concurrent_requests) as api:
+                    if har:
+                        api.session.har_writer = har
+                    await api.people.me()
+                    await api.licenses.list()
+
+                    async def prefetch(record: InputRecord) -> dict[Stage, Any]:
+                        return await self._prefetch_stage_states(api, record, resolvers, stage_decisions)
+
+                    async def process(record: InputRecord, prefetched: asyncio.Future | None) -> None:
+                        result, row_failures, row_changes = await self._process_record(
+                            api,
+                            record,
+                            resolvers,
+                            policy,
+                            stage_decisions,
+                            stage_overrides,
+                            prefetched=await prefetched if prefetched is not None else None,
+                        )
+                        if row_failures:
+                            append_failures(failures_path, row_failures)
+                        append_change_log(changes_log, row_changes)
+                        journal.append(result)
+
+                    await self._run_pool(queued(), process, prefetch)
+            state['in_progress'] = False
+        finally:
+            journal.close()
+
+        write_html_report(v2_dir / 'report.html', run_id=run_id, changes=read_change_log(changes_path),
+                          failures=read_failures(failures_path, failures_offset))
         return state
 
+    async def _run_pool(self, records: Iterable[InputRecord], process: Callable[[InputRecord, Any], Any],
+                        prefetch: Callable[[InputRecord], Any] | None = None) -> None:
+        """
+        Feed ``records`` to ``concurrent_requests`` workers; at most two records per worker are queued.
+
+        ``prefetch(record)`` is started as soon as a record is queued, so the reads for the whole window of queued
+        records run concurrently with the writes of the records being processed. Its task is passed to ``process``.
+        """
+        workers = max(1, self.concurrent_requests)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * workers)
+
+        async def feed() -> None:
+            for record in records:
+                await queue.put((record, asyncio.ensure_future(prefetch(record)) if prefetch else None))
+            for _ in range(workers):
+                await queue.put(None)
+
+        async def work() -> None:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                await process(*item)
+
+        tasks = [asyncio.ensure_future(feed())] + [asyncio.ensure_future(work()) for _ in range(workers)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # prefetches of records that were queued but never processed
+            while not queue.empty():
+                item = queue.get_nowait()
+                if item is not None and item[1] is not None:
+                    item[1].cancel()
+
     def _collect_stage_decisions(self, v2_dir: Path) -> tuple[dict[Stage, tuple[StageDecision, str | None]], dict[Stage, dict[str, dict[str, Any]]]]:
         decisions: dict[Stage, tuple[StageDecision, str | None]] = {}
         overrides: dict[Stage, dict[str, dict[str, Any]]] = {}
@@ -170,11 +248,42 @@ class V2Runner:
                 print(str(exc))
 
     @staticmethod
-    def _build_pending(records: list[InputRecord], state: dict[str, Any], *, only_failures: bool) -> list[InputRecord]:
-        if not only_failures:
-            return records
+    def _build_pending(records: Iterable[InputRecord], state: dict[str, Any], *, only_failures: bool,
+                       interrupted: bool = False) -> Iterator[tuple[int, InputRecord]]:
+        """
+        Records to process with their input index. With ``only_failures`` these are the failed ones plus, if the last
+        run was interrupted, the ones it never reached.
+        """
         previous = state.get('record_results', {})
-        return [record for record in records if previous.get(record.user_email, {}).get('status') == 'failed']
+        offset = state.get('processed_offset', 0)
+        for index, record in enumerate(records):
+            if not only_failures:
+                yield index, record
+                continue
+            result = previous.get(record.user_email)
+            if result is None:
+                # records inside the processed prefix without a result succeeded
+                if interrupted and index >= offset:
+                    yield index, record
+            elif result.get('status') == 'failed':
+                yield index, record
+
+    async def _prefetch_stage_states(
+        self,
+        api: AsWebexSimpleApi,
+        record: InputRecord,
+        resolvers: dict[str, dict[str, str]],
+        stage_decisions: dict[Stage, tuple[StageDecision, str | None]],
+    ) -> dict[Stage, Any]:
+        """Current settings of every stage that will be applied to ``record``, read concurrently."""
+        person_id = resolvers['email_to_person_id'].get(record.user_email)
+        if not person_id:
+            return {}
+        stages = [stage for stage in self._build_stages(record) if stage_decisions[stage][0] != StageDecision.NO]
+        states = await asyncio.gather(*(self._read_stage_state(api, stage, person_id) for stage in stages),
+                                      return_exceptions=True)
+        # a failed read leaves the stage without a known state: it is applied and read again afterwards
+        return {stage: state for stage, state in zip(stages, states) if not isinstance(state, Exception)}
 
     async def _process_record(
         self,
@@ -184,6 +293,7 @@ class V2Runner:
         policy: dict[str, Any],
         stage_decisions: dict[Stage, tuple[StageDecision, str | None]],
         stage_overrides: dict[Stage, dict[str, dict[str, Any]]],
+        prefetched: dict[Stage, Any] | None = None,
     ) -> tuple[RecordResult, list[FailureEntry], list[ChangeEntry]]:
         failures: list[FailureEntry] = []
         changes: list[ChangeEntry] = []
@@ -197,36 +307,51 @@ class V2Runner:
         if not location_id.startswith('Y2lzY29zcGFyazovL3VzL0xPQ0FUSU9OLw'):
             location_id = resolvers['location_name_to_id'].get(record.location_id.lower(), record.location_id)
 
-        stages = self._build_stages(record)
-        executed: list[str] = []
-        for stage in stages:
+        if prefetched is None:
+            prefetched = await self._prefetch_stage_states(api, record, resolvers, stage_decisions)
+
+        async def run_stage(stage: Stage) -> tuple[ChangeEntry, FailureEntry | None]:
             decision, _ = stage_decisions[stage]
             if decision == StageDecision.NO:
-                changes.append(ChangeEntry(record.user_email, stage.value, 'skipped', None, None, 'skipped_by_operator'))
-                continue
+                return ChangeEntry(record.user_email, stage.value, 'skipped', None, None, 'skipped_by_operator'), None
 
             override_payload = stage_overrides.get(stage, {}).get(record.user_email, {}) if decision == StageDecision.YESBUT else {}
             stage_record = replace(record, payload={**record.payload, **override_payload})
-            before = await self._read_stage_state(api, stage, person_id)
+            before = prefetched[stage] if stage in prefetched else await self._read_stage_state(api, stage, person_id)
             try:
-                await self._apply_stage(api, stage, stage_record, person_id, location_id, policy, resolvers)
+                update = self._stage_update(stage, stage_record, location_id, policy, resolvers)
+                if self._stage_matches(stage, stage_record, location_id, before, update):
+                    return ChangeEntry(record.user_email, stage.value, 'skipped', before, before, 'already_applied'), None
+                await self._apply_stage(api, stage, person_id, update)
                 after = await self._read_stage_state(api, stage, person_id)
-                changes.append(ChangeEntry(record.user_email, stage.value, 'success', before, after, 'applied'))
-                executed.append(stage.value)
+                return ChangeEntry(record.user_email, stage.value, 'success', before, after, 'applied'), None
             except Exception as exc:
                 after = await self._read_stage_state(api, stage, person_id)
-                changes.append(ChangeEntry(record.user_email, stage.value, 'failed', before, after, str(exc)))
-                failures.append(
-                    FailureEntry(
-                        user_email=record.user_email,
-                        stage=stage.value,
-                        error_type=type(exc).__name__,
-                        http_status=getattr(exc, 'status_code', None),
-                        tracking_id=getattr(exc, 'tracking_id', None),
-                        details=str(exc),
-                    )
+                failure = FailureEntry(
+                    user_email=record.user_email,
+                    stage=stage.value,
+                    error_type=type(exc).__name__,
+                    http_status=getattr(exc, 'status_code', None),
+                    tracking_id=getattr(exc, 'tracking_id', None),
+                    details=str(exc),
                 )
-                return RecordResult(user_email=record.user_email, status='failed', failed_stage=stage.value), failures, changes
+                return ChangeEntry(record.user_email, stage.value, 'failed', before, after, str(exc)), failure
+
+        # the calling license has to be in place first; the remaining stages touch independent settings
+        first, *rest = self._build_stages(record)
+        outcomes = [await run_stage(first)]
+        if outcomes[0][1] is None and rest:
+            outcomes.extend(await asyncio.gather(*(run_stage(stage) for stage in rest)))
+
+        executed: list[str] = []
+        for change, failure in outcomes:
+            changes.append(change)
+            if failure is not None:
+                failures.append(failure)
+            elif change.status == 'success':
+                executed.append(change.stage)
+        if failures:
+            return RecordResult(user_email=record.user_email, status='failed', failed_stage=failures[0].stage), failures, changes
 
         await api.people.details(person_id=person_id, calling_data=True)
         return RecordResult(user_email=record.user_email, status='success', verified=True, details={'stages': executed}), failures, changes
@@ -268,56 +393,46 @@ class V2Runner:
             return _to_jsonable(await api.telephony.callqueue.agents.details(id=person_id))
         return None
 
-    async def _apply_stage(
-        self,
-        api: AsWebexSimpleApi,
+    @staticmethod
+    def _stage_update(
         stage: Stage,
         record: InputRecord,
-        person_id: str,
         location_id: str,
         policy: dict[str, Any],
         resolvers: dict[str, dict[str, str]],
-    ) -> None:
+    ) -> Any:
+        """Settings ``_apply_stage`` writes for ``stage``."""
         if stage == Stage.ASSIGN_CALLING_LICENSE:
-            req = LicenseRequest(
+            return LicenseRequest(
                 id=record.calling_license_id,
                 properties=LicenseProperties(location_id=location_id, extension=record.extension, phone_number=record.phone_number),
             )
-            await api.licenses.assign_licenses_to_users(person_id=person_id, licenses=[req])
-            return
 
         if stage == Stage.APPLY_NUMBERS_UPDATE:
-            update = UpdatePersonNumbers.model_validate(json.loads(record.payload['alternate_numbers']))
-            await api.person_settings.numbers.update(person_id=person_id, update=update)
-            return
+            return UpdatePersonNumbers.model_validate(json.loads(record.payload['alternate_numbers']))
 
         if stage == Stage.APPLY_FORWARDING:
             merged = dict(policy.get('forwarding_defaults') or {})
             merged.update({k: v for k, v in record.payload.items() if k.startswith('cf_') and v is not None})
-            await api.person_settings.forwarding.configure(
-                entity_id=person_id,
-                forwarding=PersonForwardingSetting.model_validate(merged),
-            )
-            return
+            return PersonForwardingSetting.model_validate(merged)
 
         if stage == Stage.APPLY_VOICEMAIL:
             merged = dict(policy.get('voicemail_defaults') or {})
             merged.update({k: v for k, v in record.payload.items() if k.startswith('voicemail_') and v is not None})
-            await api.person_settings.voicemail.configure(entity_id=person_id, settings=VoicemailSettings.model_validate(merged))
-            return
+            return VoicemailSettings.model_validate(merged)
 
         if stage == Stage.APPLY_CALL_INTERCEPT:
             merged = dict(policy.get('intercept_defaults') or {})
             merged.update({k: v for k, v in record.payload.items() if k.startswith('intercept_') and v is not None})
-            await api.person_settings.call_intercept.configure(entity_id=person_id, intercept=InterceptSetting.model_validate(merged))
-            return
+            return InterceptSetting.model_validate(merged)
 
         if stage == Stage.APPLY_PERMISSIONS:
             in_payload = json.loads(record.payload['incoming_permissions_json']) if record.payload.get('incoming_permissions_json') else (policy.get('incoming_permissions_defaults') or {})
             out_payload = json.loads(record.payload['outgoing_permissions_json']) if record.payload.get('outgoing_permissions_json') else (policy.get('outgoing_permissions_defaults') or {})
-            await api.person_settings.permissions_in.configure(entity_id=person_id, settings=IncomingPermissions.model_validate(in_payload))
-            await api.person_settings.permissions_out.configure(entity_id=person_id, settings=OutgoingPermissions.model_validate(out_payload))
-            return
+            return {
+                'incoming': IncomingPermissions.model_validate(in_payload),
+                'outgoing': OutgoingPermissions.model_validate(out_payload),
+            }
 
         if stage == Stage.APPLY_CALL_QUEUE_MEMBERSHIPS:
             queue_ids = [q.strip() for q in (record.payload.get('call_queue_ids') or '').split('|') if q.strip()]
@@ -325,8 +440,58 @@ class V2Runner:
                 names = [q.strip().lower() for q in (record.payload.get('call_queue_names') or '').split('|') if q.strip()]
                 queue_ids = [resolvers['queue_name_to_id'][name] for name in names if name in resolvers['queue_name_to_id']]
             join_enabled = bool(record.payload.get('join_enabled', True))
-            settings = [AgentCallQueueSetting(queue_id=q, join_enabled=join_enabled) for q in queue_ids]
-            await api.telephony.callqueue.agents.update_call_queue_settings(id=person_id, settings=settings)
+            return [AgentCallQueueSetting(queue_id=q, join_enabled=join_enabled) for q in queue_ids]
+
+        raise ValueError(f'Unsupported stage: {stage}')
+
+    @staticmethod
+    def _stage_matches(stage: Stage, record: InputRecord, location_id: str, current: Any, update: Any) -> bool:
+        """True if the current settings already are what ``update`` would write; only checked for settings reads."""
+        if not current:
+            return False
+        if stage == Stage.ASSIGN_CALLING_LICENSE:
+            numbers = {n.get('value') for n in current.get('phoneNumbers') or []}
+            return (record.calling_license_id in (current.get('licenses') or [])
+                    and current.get('locationId') == location_id
+                    and (not record.extension or current.get('extension') == record.extension)
+                    and (not record.phone_number or record.phone_number in numbers))
+        if stage in (Stage.APPLY_FORWARDING, Stage.APPLY_VOICEMAIL, Stage.APPLY_CALL_INTERCEPT):
+            return _is_subset(_desired(update), current)
+        if stage == Stage.APPLY_PERMISSIONS:
+            return all(_is_subset(_desired(update[key]), current.get(key)) for key in ('incoming', 'outgoing'))
+        # number and call queue updates are not comparable with what the read returns
+        return False
+
+    async def _apply_stage(self, api: AsWebexSimpleApi, stage: Stage, person_id: str, update: Any) -> None:
+        if stage == Stage.ASSIGN_CALLING_LICENSE:
+            await api.licenses.assign_licenses_to_users(person_id=person_id, licenses=[update])
+            return
+
+        if stage == Stage.APPLY_NUMBERS_UPDATE:
+            await api.person_settings.numbers.update(person_id=person_id, update=update)
+            return
+
+        if stage == Stage.APPLY_FORWARDING:
+            await api.person_settings.forwarding.configure(entity_id=person_id, forwarding=update)
+            return
+
+        if stage == Stage.APPLY_VOICEMAIL:
+            await api.person_settings.voicemail.configure(entity_id=person_id, settings=update)
+            return
+
+        if stage == Stage.APPLY_CALL_INTERCEPT:
+            await api.person_settings.call_intercept.configure(entity_id=person_id, intercept=update)
+            return
+
+        if stage == Stage.APPLY_PERMISSIONS:
+            await asyncio.gather(
+                api.person_settings.permissions_in.configure(entity_id=person_id, settings=update['incoming']),
+                api.person_settings.permissions_out.configure(entity_id=person_id, settings=update['outgoing']),
+            )
+            return
+
+        if stage == Stage.APPLY_CALL_QUEUE_MEMBERSHIPS:
+            await api.telephony.callqueue.agents.update_call_queue_settings(id=person_id, settings=update)
             return
 
         raise ValueError(f'Unsupported stage: {stage}')
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import csv
 import json
+import os
+from dataclasses import asdict
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Iterable, Iterator
 
-from .models import ChangeEntry, FailureEntry, InputRecord
+from .models import ChangeEntry, FailureEntry, InputRecord, RecordResult
 
 V2_INPUT_HEADERS = [
     'user_email',
@@ -104,51 +106,48 @@ def _normalize_phone(raw: str | None) -> str | None:
     raise ValueError(f'invalid phone_number format: {raw}')
 
 
-def load_input_records(path: Path) -> list[InputRecord]:
+def iter_input_records(path: Path) -> Iterator[InputRecord]:
+    """Validate and yield the input records one at a time, without loading the whole CSV."""
     with path.open('r', encoding='utf-8', newline='') as handle:
         reader = csv.DictReader(handle)
-        rows = list(reader)
-
-    required = {'user_email', 'calling_license_id'}
-    if not required.issubset(set(reader.fieldnames or [])):
-        missing = ', '.join(sorted(required - set(reader.fieldnames or [])))
-        raise ValueError(f'missing required CSV columns: {missing}')
-
-    results: list[InputRecord] = []
-    seen: set[str] = set()
-    for row_number, row in enumerate(rows, start=2):
-        email = (row.get('user_email') or '').strip().lower()
-        if not email:
-            raise ValueError(f'row {row_number}: user_email is required')
-        if email in seen:
-            raise ValueError(f'row {row_number}: duplicated user_email {email}')
-        seen.add(email)
-
-        calling_license_id = (row.get('calling_license_id') or '').strip()
-        if not calling_license_id:
-            raise ValueError(f'row {row_number}: calling_license_id is required')
-
-        location_id = (row.get('location_id') or '').strip()
-        location_name = (row.get('location_name') or '').strip()
-        if not location_id and not location_name:
-            raise ValueError(f'row {row_number}: location_id or location_name is required')
-
-        extension = (row.get('extension') or '').strip() or None
-        phone_number = _normalize_phone(row.get('phone_number'))
-        if not extension and not phone_number:
-            raise ValueError(f'row {row_number}: extension or phone_number is required')
-
-        normalized: dict[str, Any] = {}
-        for key, value in row.items():
-            if value is None:
-                normalized[key] = None
-                continue
-            stripped = value.strip()
-            normalized[key] = _normalize_bool(stripped) if key.endswith('_enabled') else (stripped or None)
-
-        normalized['phone_number'] = phone_number
-        results.append(
-            InputRecord(
+        required = {'user_email', 'calling_license_id'}
+        if not required.issubset(set(reader.fieldnames or [])):
+            missing = ', '.join(sorted(required - set(reader.fieldnames or [])))
+            raise ValueError(f'missing required CSV columns: {missing}')
+
+        seen: set[str] = set()
+        for row_number, row in enumerate(reader, start=2):
+            email = (row.get('user_email') or '').strip().lower()
+            if not email:
+                raise ValueError(f'row {row_number}: user_email is required')
+            if email in seen:
+                raise ValueError(f'row {row_number}: duplicated user_email {email}')
+            seen.add(email)
+
+            calling_license_id = (row.get('calling_license_id') or '').strip()
+            if not calling_license_id:
+                raise ValueError(f'row {row_number}: calling_license_id is required')
+
+            location_id = (row.get('location_id') or '').strip()
+            location_name = (row.get('location_name') or '').strip()
+            if not location_id and not location_name:
+                raise ValueError(f'row {row_number}: location_id or location_name is required')
+
+            extension = (row.get('extension') or '').strip() or None
+            phone_number = _normalize_phone(row.get('phone_number'))
+            if not extension and not phone_number:
+                raise ValueError(f'row {row_number}: extension or phone_number is required')
+
+            normalized: dict[str, Any] = {}
+            for key, value in row.items():
+                if value is None:
+                    normalized[key] = None
+                    continue
+                stripped = value.strip()
+                normalized[key] = _normalize_bool(stripped) if key.endswith('_enabled') else (stripped or None)
+
+            normalized['phone_number'] = phone_number
+            yield InputRecord(
                 row_number=row_number,
                 user_email=email,
                 calling_license_id=calling_license_id,
@@ -157,8 +156,10 @@ def load_input_records(path: Path) -> list[InputRecord]:
                 phone_number=phone_number,
                 payload=normalized,
             )
-        )
-    return results
+
+
+def load_input_records(path: Path) -> list[InputRecord]:
+    return list(iter_input_records(path))
 
 
 def _read_rows(path: Path) -> list[dict[str, Any]]:
@@ -212,22 +213,136 @@ def load_v1_maps(v1_inventory_dir: Path) -> dict[str, dict[str, str]]:
     }
 
 
+def journal_path(state_path: Path) -> Path:
+    return state_path.with_name(f'{state_path.stem}.journal.jsonl')
+
+
+_STATUS_COUNTERS = {'success': 'completed_count', 'failed': 'failed_count'}
+
+
 def load_run_state(path: Path) -> dict[str, Any]:
+    """Load ``run_state.json`` and replay the record results journaled after its last compaction."""
     if path.exists():
-        return json.loads(path.read_text(encoding='utf-8'))
-    return {
-        'run_id': '',
-        'started_at': '',
-        'completed_count': 0,
-        'failed_count': 0,
-        'record_results': {},
-        'stage_decisions': {},
-    }
+        state = json.loads(path.read_text(encoding='utf-8'))
+    else:
+        state = {
+            'run_id': '',
+            'started_at': '',
+            'completed_count': 0,
+            'failed_count': 0,
+            'processed_offset': 0,
+            'record_results': {},
+            'stage_decisions': {},
+        }
+    state.setdefault('processed_offset', 0)
+    journal = journal_path(path)
+    if journal.exists():
+        ahead = results_ahead(state)
+        with journal.open('r', encoding='utf-8') as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line torn by an interrupted run
+                    continue
+                record_result(state, entry, ahead)
+    return state
+
+
+def reset_run_results(state: dict[str, Any]) -> None:
+    """Forget the results of earlier runs; used when every input record is processed again."""
+    state.update({'completed_count': 0, 'failed_count': 0, 'processed_offset': 0, 'record_results': {}})
+
+
+def results_ahead(state: dict[str, Any]) -> dict[int, str]:
+    """Input index -> user email of the results at or beyond ``processed_offset``."""
+    offset = state['processed_offset']
+    return {entry['index']: email for email, entry in state['record_results'].items()
+            if entry.get('index') is not None and entry['index'] >= offset}
+
+
+def record_result(state: dict[str, Any], entry: dict[str, Any], ahead: dict[int, str]) -> None:
+    """
+    Account one record result in ``state``.
+
+    Only counters, failed results and the results beyond the processed prefix are kept: ``processed_offset`` is the
+    number of leading input records with a result, and successes inside that prefix are dropped once it moves past
+    them. ``ahead`` is the :func:`results_ahead` index of ``state`` and is kept up to date.
+    """
+    results = state['record_results']
+    email = entry['user_email']
+    previous = results.get(email)
+    if previous is not None and previous.get('status') in _STATUS_COUNTERS:
+        state[_STATUS_COUNTERS[previous['status']]] -= 1
+    if entry.get('status') in _STATUS_COUNTERS:
+        state[_STATUS_COUNTERS[entry['status']]] += 1
+    results[email] = entry
+    index = entry.get('index')
+    if index is None or index < state['processed_offset']:
+        if entry.get('status') != 'failed':
+            # a retried record inside the prefix is done
+            del results[email]
+        return
+    ahead[index] = email
+    offset = state['processed_offset']
+    while offset in ahead:
+        done = ahead.pop(offset)
+        if results[done].get('status') != 'failed':
+            del results[done]
+        offset += 1
+    state['processed_offset'] = offset
 
 
 def save_run_state(path: Path, state: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2, ensure_ascii=False, sort_keys=True), encoding='utf-8')
+    tmp = path.with_name(f'.{path.name}.tmp')
+    tmp.write_text(json.dumps(state, indent=2, ensure_ascii=False, sort_keys=True), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+class RunJournal:
+    """
+    Append-only log of record results next to ``run_state.json``.
+
+    Every result is written (and flushed) as soon as its record finishes, so an interrupted run loses nothing.
+    The state in memory stays bounded (see :func:`record_result`), so :meth:`compact`, which rewrites
+    ``run_state.json`` and starts an empty journal, costs the same at any point of the run.
+    """
+
+    def __init__(self, state_path: Path, state: dict[str, Any], *, compact_every: int = 1000):
+        self.state_path = state_path
+        self.state = state
+        self.compact_every = compact_every
+        self.path = journal_path(state_path)
+        self._pending = 0
+        self._ahead = results_ahead(state)
+        # input index of the records handed out and not finished yet
+        self._started: dict[str, int] = {}
+        self._handle: IO[str] = self.path.open('a', encoding='utf-8')
+
+    def start(self, index: int, user_email: str) -> None:
+        """Register the input index of a record before it is processed."""
+        self._started[user_email] = index
+
+    def append(self, result: RecordResult) -> None:
+        entry = {**asdict(result), 'index': self._started.pop(result.user_email, None)}
+        self._handle.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+        self._handle.flush()
+        record_result(self.state, entry, self._ahead)
+        self._pending += 1
+        if self._pending >= self.compact_every:
+            self.compact()
+
+    def compact(self) -> None:
+        save_run_state(self.state_path, self.state)
+        self._handle.close()
+        self._handle = self.path.open('w', encoding='utf-8')
+        self._pending = 0
+
+    def close(self) -> None:
+        self.compact()
+        self._handle.close()
+        self.path.unlink(missing_ok=True)
 
 
 def append_failures(path: Path, failures: list[FailureEntry]) -> None:
@@ -241,33 +356,59 @@ def append_failures(path: Path, failures: list[FailureEntry]) -> None:
             writer.writerow([failure.user_email, failure.stage, failure.error_type, failure.http_status, failure.tracking_id, failure.details])
 
 
-def write_change_log(path: Path, changes: list[ChangeEntry]) -> None:
+def read_failures(path: Path, offset: int = 0) -> Iterator[FailureEntry]:
+    """Failures appended to ``path`` after byte ``offset`` (its size before the current run)."""
+    if not path.exists():
+        return
+    with path.open('r', encoding='utf-8', newline='') as handle:
+        handle.seek(offset)
+        reader = csv.reader(handle)
+        if offset == 0:
+            next(reader, None)
+        for user_email, stage, error_type, http_status, tracking_id, details in reader:
+            yield FailureEntry(user_email, stage, error_type, int(http_status) if http_status else None,
+                               tracking_id or None, details)
+
+
+def append_change_log(handle: IO[str], changes: Iterable[ChangeEntry]) -> None:
+    for change in changes:
+        handle.write(json.dumps(change.__dict__, ensure_ascii=False, default=str) + '\n')
+
+
+def write_change_log(path: Path, changes: Iterable[ChangeEntry]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open('w', encoding='utf-8') as handle:
-        for change in changes:
-            handle.write(json.dumps(change.__dict__, ensure_ascii=False, default=str) + '\n')
+        append_change_log(handle, changes)
+
+
+def read_change_log(path: Path) -> Iterator[ChangeEntry]:
+    if not path.exists():
+        return
+    with path.open('r', encoding='utf-8') as handle:
+        for line in handle:
+            if line.strip():
+                yield ChangeEntry(**json.loads(line))
 
 
-def write_html_report(path: Path, *, run_id: str, changes: list[ChangeEntry], failures: list[FailureEntry]) -> None:
+def write_html_report(path: Path, *, run_id: str, changes: Iterable[ChangeEntry],
+                      failures: Iterable[FailureEntry]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    rows = []
-    for c in changes:
-        rows.append(
-            f"<tr><td>{c.user_email}</td><td>{c.stage}</td><td>{c.status}</td>"
-            f"<td><pre>{json.dumps(c.before, ensure_ascii=False, default=str)}</pre></td>"
-            f"<td><pre>{json.dumps(c.after, ensure_ascii=False, default=str)}</pre></td>"
-            f"<td>{c.details}</td></tr>"
+    with path.open('w', encoding='utf-8') as handle:
+        handle.write(
+            '<html><head><meta charset="utf-8"><title>V2 Bulk Report</title></head><body>'
+            f'<h1>V2 Bulk Report</h1><p>run_id={run_id}</p>'
+            '<h2>Changes (before/after)</h2>'
+            '<table border="1" cellspacing="0" cellpadding="4">'
+            '<tr><th>User</th><th>Stage</th><th>Status</th><th>Before</th><th>After</th><th>Details</th></tr>'
         )
-    failure_rows = ''.join(
-        f"<li>{f.user_email} | {f.stage} | {f.error_type} | {f.details}</li>" for f in failures
-    )
-    html = (
-        '<html><head><meta charset="utf-8"><title>V2 Bulk Report</title></head><body>'
-        f'<h1>V2 Bulk Report</h1><p>run_id={run_id}</p>'
-        '<h2>Changes (before/after)</h2>'
-        '<table border="1" cellspacing="0" cellpadding="4">'
-        '<tr><th>User</th><th>Stage</th><th>Status</th><th>Before</th><th>After</th><th>Details</th></tr>'
-        + ''.join(rows) + '</table>'
-        + '<h2>Failures</h2><ul>' + failure_rows + '</ul></body></html>'
-    )
-    path.write_text(html, encoding='utf-8')
+        for c in changes:
+            handle.write(
+                f"<tr><td>{c.user_email}</td><td>{c.stage}</td><td>{c.status}</td>"
+                f"<td><pre>{json.dumps(c.before, ensure_ascii=False, default=str)}</pre></td>"
+                f"<td><pre>{json.dumps(c.after, ensure_ascii=False, default=str)}</pre></td>"
+                f"<td>{c.details}</td></tr>"
+            )
+        handle.write('</table><h2>Failures</h2><ul>')
+        for f in failures:
+            handle.write(f"<li>{f.user_email} | {f.stage} | {f.error_type} | {f.details}</li>")
+        handle.write('</ul></body></html>')
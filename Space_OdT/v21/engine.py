@@ -58,6 +58,43 @@ class LocationBulkJob:
         )
 
 
+class LocationNameIndex:
+    """
+    Location name -> location ID per org, listed once per job and shared by all row workers.
+
+    Rows that create a location register it with :meth:`add`; :meth:`lock` serializes rows with the same name so
+    two rows never both create it.
+    """
+
+    def __init__(self, locations_api: AsLocationsApi, call_logged):
+        self._locations_api = locations_api
+        self._call_logged = call_logged
+        self._by_org: dict[str | None, asyncio.Future] = {}
+        self._locks: dict[tuple[str | None, str], asyncio.Lock] = {}
+
+    async def _load(self, org_id: str | None) -> dict[str, str]:
+        locations = await self._call_logged('locations_api.list', self._locations_api.list(org_id=org_id))
+        names: dict[str, str] = {}
+        for location in locations:
+            # same first-match semantics as locations_api.by_name
+            names.setdefault(location.name, location.location_id)
+        return names
+
+    async def _names(self, org_id: str | None) -> dict[str, str]:
+        if org_id not in self._by_org:
+            self._by_org[org_id] = asyncio.ensure_future(self._load(org_id))
+        return await self._by_org[org_id]
+
+    async def get(self, name: str, org_id: str | None = None) -> str | None:
+        return (await self._names(org_id)).get(name)
+
+    async def add(self, name: str, org_id: str | None, location_id: str) -> None:
+        (await self._names(org_id)).setdefault(name, location_id)
+
+    def lock(self, name: str, org_id: str | None = None) -> asyncio.Lock:
+        return self._locks.setdefault((org_id, name), asyncio.Lock())
+
+
 class V21Runner:
     def __init__(self, *, token: str, out_dir: Path):
         self.token = token
@@ -271,7 +308,7 @@ class V21Runner:
             'locations_class': 'AsLocationsApi',
             'awaited_calls': [
                 'api.people.me()',
-                'locations_api.by_name()',
+                'locations_api.list()',
                 'locations_api.create()',
                 'locations_api.details()',
                 'locations_api.update()',
@@ -300,7 +337,14 @@ class V21Runner:
         items = payload.get('remote_final_state', {}).get('items', [])
         return {'items': items, 'source': str(newest)}
 
-    async def process_location_job(self, job_id: str, *, chunk_size: int = 200, max_concurrency: int = 20) -> dict[str, Any]:
+    async def process_location_job(self, job_id: str, *, max_concurrency: int = 20) -> dict[str, Any]:
+        """
+        Process the rows of a job with up to ``max_concurrency`` rows in flight.
+
+        Each worker picks the next row as soon as its current one is done, and every finished row is appended to the
+        result files and checkpointed right away. ``cursor['offset']`` is the number of leading rows done;
+        ``cursor['completed_ahead']`` holds the rows done beyond it, so a resumed job skips exactly the finished rows.
+        """
         job = self.get_job(job_id)
         if job.entity_type not in {'location', 'location_webex_calling'}:
             raise ValueError('Solo location/location_webex_calling está habilitado en v21')
@@ -321,35 +365,49 @@ class V21Runner:
         self._init_result_files(results_csv, pending_csv, rejected_csv)
         snapshots: list[dict[str, Any]] = []
 
-        start_offset = int(job.cursor.get('offset', 0))
+        offset = int(job.cursor.get('offset', 0))
+        done_ahead = {int(i) for i in job.cursor.get('completed_ahead') or []}
+        todo = iter([i for i in range(offset, len(rows)) if i not in done_ahead])
+
+        def row_done(index: int, result: dict[str, Any]) -> None:
+            nonlocal offset
+            self._append_results(rows=[result], results_csv=results_csv, pending_csv=pending_csv, rejected_csv=rejected_csv)
+            self._update_totals(job, [result])
+            done_ahead.add(index)
+            while offset in done_ahead:
+                done_ahead.discard(offset)
+                offset += 1
+            job.cursor = {'offset': offset}
+            if done_ahead:
+                job.cursor['completed_ahead'] = sorted(done_ahead)
+            self.save_job(job)
+            self._write_checkpoint(job)
+
         async with AsWebexSimpleApi(tokens=self.token, concurrent_requests=max_concurrency) as api:
             locations_api = AsLocationsApi(session=api.session)
             await self._call_logged('api.people.me', api.people.me())
-
-            offset = start_offset
-            while offset < len(rows):
-                chunk = rows[offset : offset + chunk_size]
-                if job.entity_type == 'location':
-                    chunk_results = await self._process_chunk(
-                        locations_api=locations_api,
-                        rows=chunk,
-                        max_concurrency=max_concurrency,
-                        snapshots=snapshots,
-                    )
-                else:
-                    chunk_results = await self._process_chunk_enable_wbxc(
-                        api=api,
-                        locations_api=locations_api,
-                        rows=chunk,
-                        max_concurrency=max_concurrency,
-                        snapshots=snapshots,
-                    )
-                self._append_results(rows=chunk_results, results_csv=results_csv, pending_csv=pending_csv, rejected_csv=rejected_csv)
-                self._update_totals(job, chunk_results)
-                offset += len(chunk)
-                job.cursor = {'offset': offset}
-                self.save_job(job)
-                self._write_checkpoint(job)
+            index = LocationNameIndex(locations_api, self._call_logged)
+
+            async def worker() -> None:
+                # all workers share one row iterator: a slow row only holds up its own worker
+                for row_index in todo:
+                    row = rows[row_index]
+                    if job.entity_type == 'location':
+                        result = await self._upsert_location(locations_api, row, apply=True, index=index)
+                    else:
+                        result = await self._enable_location_for_webex_calling_direct(
+                            api=api,
+                            locations_api=locations_api,
+                            row=row,
+                            index=index,
+                        )
+                    if result.get('remote_id'):
+                        details = await self._safe_fetch_details(locations_api, result['remote_id'], row)
+                        if details is not None:
+                            snapshots.append(self._to_jsonable_location(details))
+                    row_done(row_index, result)
+
+            await asyncio.gather(*(worker() for _ in range(max(1, max_concurrency))))
 
         summary = {
             'job': job.to_dict(),
@@ -364,27 +422,6 @@ class V21Runner:
         summary['job'] = job.to_dict()
         return summary
 
-    async def _process_chunk(
-        self,
-        *,
-        locations_api: AsLocationsApi,
-        rows: list[LocationInput],
-        max_concurrency: int,
-        snapshots: list[dict[str, Any]],
-    ) -> list[dict[str, Any]]:
-        sem = asyncio.Semaphore(max_concurrency)
-
-        async def worker(row: LocationInput) -> dict[str, Any]:
-            async with sem:
-                result = await self._upsert_location(locations_api, row, apply=True)
-                if result.get('remote_id'):
-                    details = await self._safe_fetch_details(locations_api, result['remote_id'], row)
-                    if details is not None:
-                        snapshots.append(self._to_jsonable_location(details))
-                return result
-
-        return await asyncio.gather(*(worker(row) for row in rows), return_exceptions=False)
-
     async def _safe_fetch_details(self, locations_api: AsLocationsApi, remote_id: str, row: LocationInput) -> Any | None:
         try:
             return await self._call_logged(
@@ -400,47 +437,21 @@ class V21Runner:
             except Exception:
                 return None
 
-    async def _process_chunk_enable_wbxc(
-        self,
-        *,
-        api: AsWebexSimpleApi,
-        locations_api: AsLocationsApi,
-        rows: list[LocationInput],
-        max_concurrency: int,
-        snapshots: list[dict[str, Any]],
-    ) -> list[dict[str, Any]]:
-        sem = asyncio.Semaphore(max_concurrency)
-
-        async def worker(row: LocationInput) -> dict[str, Any]:
-            async with sem:
-                result = await self._enable_location_for_webex_calling_direct(
-                    api=api,
-                    locations_api=locations_api,
-                    row=row,
-                )
-                if result.get('remote_id'):
-                    details = await self._safe_fetch_details(locations_api, result['remote_id'], row)
-                    if details is not None:
-                        snapshots.append(self._to_jsonable_location(details))
-                return result
-
-        return await asyncio.gather(*(worker(row) for row in rows), return_exceptions=False)
-
     async def _enable_location_for_webex_calling_direct(
         self,
         *,
         api: AsWebexSimpleApi,
         locations_api: AsLocationsApi,
         row: LocationInput,
+        index: LocationNameIndex | None = None,
     ) -> dict[str, Any]:
         location_key = self._stable_location_key(row)
         try:
             location_id = row.location_id
             if not location_id:
-                existing = await self._call_logged('locations_api.by_name', locations_api.by_name(row.location_name, org_id=row.org_id))
-                if existing is None:
+                location_id = await self._location_id_by_name(locations_api, row, index)
+                if location_id is None:
                     raise ValueError(f'row {row.row_number}: location no existe para habilitar Webex Calling')
-                location_id = existing.location_id
 
             self._validate_required_fields(row)
             body = {
@@ -558,27 +569,43 @@ class V21Runner:
             'snapshot': result['remote_final_state'],
         }
 
-    async def _upsert_location(self, locations_api: AsLocationsApi, row: LocationInput, *, apply: bool) -> dict[str, Any]:
+    async def _location_id_by_name(self, locations_api: AsLocationsApi, row: LocationInput,
+                                   index: LocationNameIndex | None) -> str | None:
+        if index is not None:
+            return await index.get(row.location_name, row.org_id)
+        existing = await self._call_logged(
+            'locations_api.by_name',
+            locations_api.by_name(row.location_name, org_id=row.org_id),
+        )
+        return existing.location_id if existing else None
+
+    async def _upsert_location(self, locations_api: AsLocationsApi, row: LocationInput, *, apply: bool,
+                               index: LocationNameIndex | None = None) -> dict[str, Any]:
+        if index is None:
+            return await self._upsert_location_unlocked(locations_api, row, apply=apply, index=None)
+        # rows naming the same location run one after the other, so only the first one creates it
+        async with index.lock(row.location_name, row.org_id):
+            return await self._upsert_location_unlocked(locations_api, row, apply=apply, index=index)
+
+    async def _upsert_location_unlocked(self, locations_api: AsLocationsApi, row: LocationInput, *, apply: bool,
+                                        index: LocationNameIndex | None) -> dict[str, Any]:
         # Upsert idempotente por nombre de sede para permitir reintentos seguros.
         location_key = self._stable_location_key(row)
         try:
-            existing = await self._call_logged(
-                'locations_api.by_name',
-                locations_api.by_name(row.location_name, org_id=row.org_id),
-            )
+            existing_id = await self._location_id_by_name(locations_api, row, index)
             if not apply:
                 return {
                     'row_number': row.row_number,
                     'location_key': location_key,
                     'status': 'pending',
-                    'remote_id': existing.location_id if existing else None,
+                    'remote_id': existing_id,
                     'error_classification': None,
                     'error_type': None,
                     'error': None,
                 }
 
             remote_id: str | None = None
-            if existing is None:
+            if existing_id is None:
                 self._validate_required_fields(row)
                 remote_id = await self._call_logged(
                     'locations_api.create',
@@ -596,10 +623,12 @@ class V21Runner:
                         org_id=row.org_id,
                     ),
                 )
+                if index is not None:
+                    await index.add(row.location_name, row.org_id, remote_id)
             else:
                 settings = await self._call_logged(
                     'locations_api.details',
-                    locations_api.details(existing.location_id, org_id=row.org_id),
+                    locations_api.details(existing_id, org_id=row.org_id),
                 )
                 if row.payload.get('time_zone'):
                     settings.time_zone = row.payload.get('time_zone')
@@ -622,9 +651,9 @@ class V21Runner:
                         settings.address.country = row.payload.get('country')
                 await self._call_logged(
                     'locations_api.update',
-                    locations_api.update(existing.location_id, settings=settings, org_id=row.org_id),
+                    locations_api.update(existing_id, settings=settings, org_id=row.org_id),
                 )
-                remote_id = existing.location_id
+                remote_id = existing_id
 
             return {
                 'row_number': row.row_number,
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Any, Callable
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Any, Callable, Iterator
 
 OrderCallable = Callable[[int, list[dict[str, Any]]], tuple[list[dict[str, Any]], dict[str, Any]]]
+RowCallable = Callable[[int, dict[str, Any]], dict[str, Any]]
+SummaryCallable = Callable[[list[dict[str, Any]]], dict[str, Any]]
 
 
 def chunk_rows(rows: list[dict[str, Any]], chunk_size: int) -> list[list[dict[str, Any]]]:
@@ -38,3 +45,252 @@ def execute_bulk_orders(
     merged_rows.sort(key=lambda item: item.get('row_index', 0))
     orders.sort(key=lambda item: item['order_index'])
     return orders, merged_rows
+
+
+class AsyncRateLimiter:
+    """Presupuesto global de arranques por segundo compartido por todas las filas del engine."""
+
+    def __init__(self, rate_per_second: float | None):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        # Sin await entre lectura y reserva del hueco: el event loop serializa las reservas.
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def execute_bulk_rows_async(
+    *,
+    rows: list[dict[str, Any]],
+    chunk_size: int,
+    max_concurrency: int,
+    row_callable: RowCallable,
+    summarize: SummaryCallable,
+    rate_per_second: float | None = None,
+    on_row: Callable[[dict[str, Any]], None] | None = None,
+    on_order: Callable[[dict[str, Any]], None] | None = None,
+    should_stop: Callable[[], bool] | None = None,
+    executor: Executor | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Execute every row as a task under a global concurrency/rate budget.
+
+    Chunks are only the reporting unit: an order is summarised (and ``on_order`` called) as soon as its last row
+    finishes, whatever the order of completion. ``on_row`` receives each row result as it completes.
+
+    ``executor`` lets several runs share one thread pool; ``should_stop`` is checked before each row starts and
+    orders left incomplete are reported with status ``cancelled``.
+    """
+    size = max(int(chunk_size or 1), 1)
+    workers = max(int(max_concurrency or 1), 1)
+    limiter = AsyncRateLimiter(rate_per_second)
+    loop = asyncio.get_running_loop()
+    pending_rows = iter(enumerate(rows, start=1))
+    order_rows: dict[int, list[dict[str, Any]]] = {}
+    remaining = {index: len(chunk) for index, chunk in enumerate(chunk_rows(rows, size), start=1)}
+    merged_rows: list[dict[str, Any]] = []
+    orders: list[dict[str, Any]] = []
+
+    def _finish(row_index: int, result: dict[str, Any]) -> None:
+        order_index = ((row_index - 1) // size) + 1
+        merged_rows.append(result)
+        order_rows.setdefault(order_index, []).append(result)
+        if on_row is not None:
+            on_row(result)
+        remaining[order_index] -= 1
+        if not remaining[order_index]:
+            completed = sorted(order_rows.pop(order_index), key=lambda item: item.get('row_index', 0))
+            order = {'order_index': order_index, **summarize(completed)}
+            orders.append(order)
+            if on_order is not None:
+                on_order(order)
+
+    async def _worker(source: Iterator[tuple[int, dict[str, Any]]]) -> None:
+        # Los handlers son síncronos (SDK requests): cada fila ocupa un hilo del pool mientras está en vuelo.
+        for row_index, row in source:
+            if should_stop is not None and should_stop():
+                return
+            await limiter.acquire()
+            result = await loop.run_in_executor(pool, row_callable, row_index, row)
+            _finish(row_index, result)
+
+    owned = ThreadPoolExecutor(max_workers=workers) if executor is None else None
+    pool = owned or executor
+    with owned or nullcontext():
+        await asyncio.gather(*(_worker(pending_rows) for _ in range(min(workers, len(rows)))))
+
+    for order_index, partial in sorted(order_rows.items()):
+        completed = sorted(partial, key=lambda item: item.get('row_index', 0))
+        orders.append({'order_index': order_index, **summarize(completed), 'status': 'cancelled'})
+
+    merged_rows.sort(key=lambda item: item.get('row_index', 0))
+    orders.sort(key=lambda item: item['order_index'])
+    return orders, merged_rows
+
+
+def execute_bulk_rows(**kwargs: Any) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Synchronous entry point of :func:`execute_bulk_rows_async` for the threaded UI server."""
+    return asyncio.run(execute_bulk_rows_async(**kwargs))
+
+
+JOB_TERMINAL_STATES = ('completed', 'failed', 'cancelled')
+#: errores de fila que se conservan en el snapshot de un job
+JOB_RECENT_ERRORS = 20
+#: jobs que conserva la cola; al encolar uno nuevo se descartan los terminados más antiguos
+JOB_HISTORY_LIMIT = 50
+
+
+class BulkJob:
+    """Estado observable de una orden encolada: progreso por fila/orden, errores recientes y cancelación."""
+
+    def __init__(self, *, action_id: str, rows_total: int):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.action_id = action_id
+        self.rows_total = rows_total
+        self.status = 'queued'
+        self.rows_done = 0
+        self.rows_error = 0
+        self.orders: list[dict[str, Any]] = []
+        self.recent_errors: list[dict[str, Any]] = []
+        self.result: dict[str, Any] | None = None
+        self.result_released = False
+        self.error: str | None = None
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.version = 0
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+        self._touch()
+
+    def record_row(self, result: dict[str, Any]) -> None:
+        with self._changed:
+            self.rows_done += 1
+            if result.get('status') != 'ok':
+                self.rows_error += 1
+                error = {key: result[key] for key in ('row_index', 'status', 'error', 'missing') if key in result}
+                self.recent_errors = [*self.recent_errors[-(JOB_RECENT_ERRORS - 1):], error]
+            self._bump()
+
+    def record_order(self, order: dict[str, Any]) -> None:
+        with self._changed:
+            self.orders.append(order)
+            self._bump()
+
+    def set_status(self, status: str, **fields: Any) -> None:
+        with self._changed:
+            self.status = status
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self._bump()
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """Bloquea hasta que el job cambie respecto a ``version`` (o venza ``timeout``); devuelve la versión actual."""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+    def snapshot(self, *, include_result: bool = False, release_result: bool = False) -> dict[str, Any]:
+        """Estado del job; con ``release_result`` el resultado de un job terminado se entrega una vez y se libera."""
+        with self._changed:
+            end = self.finished_at or time.monotonic()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            payload = {
+                'job_id': self.job_id,
+                'action_id': self.action_id,
+                'status': self.status,
+                'cancel_requested': self.cancelled,
+                'rows_total': self.rows_total,
+                'rows_done': self.rows_done,
+                'rows_error': self.rows_error,
+                'rows_per_sec': round(self.rows_done / elapsed, 2) if elapsed > 0 else 0.0,
+                'elapsed_s': round(elapsed, 3),
+                'orders_done': len(self.orders),
+                'orders': list(self.orders),
+                'recent_errors': list(self.recent_errors),
+                'error': self.error,
+                'result_released': self.result_released,
+                'version': self.version,
+            }
+            if include_result:
+                payload['result'] = self.result
+                if release_result and self.status in JOB_TERMINAL_STATES and self.result is not None:
+                    self.result = None
+                    self.result_released = True
+            return payload
+
+    def _touch(self) -> None:
+        with self._changed:
+            self._bump()
+
+    def _bump(self) -> None:
+        self.version += 1
+        self._changed.notify_all()
+
+
+class BulkJobQueue:
+    """
+    Cola de jobs en memoria: ``max_jobs`` jobs en paralelo, todos sobre un único pool de filas compartido.
+
+    Se conservan como mucho ``max_history`` jobs: los terminados más antiguos se descartan al encolar uno nuevo.
+    """
+
+    def __init__(self, *, max_jobs: int = 2, row_workers: int = 16, max_history: int = JOB_HISTORY_LIMIT):
+        self.row_pool = ThreadPoolExecutor(max_workers=max(row_workers, 1), thread_name_prefix='bulk-rows')
+        self._job_pool = ThreadPoolExecutor(max_workers=max(max_jobs, 1), thread_name_prefix='bulk-jobs')
+        self._jobs: dict[str, BulkJob] = {}
+        self._max_history = max(max_history, 1)
+        self._lock = threading.Lock()
+
+    def submit(self, *, action_id: str, rows_total: int, run: Callable[[BulkJob], dict[str, Any]]) -> BulkJob:
+        job = BulkJob(action_id=action_id, rows_total=rows_total)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._evict_locked()
+        self._job_pool.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id: str) -> BulkJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[BulkJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _evict_locked(self) -> None:
+        # los jobs en cola o en curso nunca se descartan
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in JOB_TERMINAL_STATES]
+        for job_id in finished[:max(len(self._jobs) - self._max_history, 0)]:
+            del self._jobs[job_id]
+
+    def shutdown(self, *, cancel: bool = True) -> None:
+        if cancel:
+            for job in self.jobs():
+                job.cancel()
+        self._job_pool.shutdown(wait=True)
+        self.row_pool.shutdown(wait=True)
+
+    @staticmethod
+    def _run(job: BulkJob, run: Callable[[BulkJob], dict[str, Any]]) -> None:
+        if job.cancelled:
+            job.set_status('cancelled', finished_at=time.monotonic())
+            return
+        job.set_status('running', started_at=time.monotonic())
+        try:
+            result = run(job)
+        except Exception as exc:  # noqa: BLE001
+            job.set_status('failed', error=str(exc), finished_at=time.monotonic())
+            return
+        job.set_status('cancelled' if job.cancelled else 'completed', result=result, finished_at=time.monotonic())
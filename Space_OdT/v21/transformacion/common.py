@@ -2,16 +2,25 @@ from __future__ import annotations
 
 """Script v21 de transformación: incluye comentarios guía en secciones críticas."""
 
+import atexit
 import datetime as dt
 import csv
 import json
+import logging
 import os
+import threading
+import time
 from argparse import Namespace
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from dotenv import load_dotenv
+from requests import Response
 from wxc_sdk import WebexSimpleApi
+from wxc_sdk.rest import RestSession
+from wxc_sdk.tokens import Tokens
 
 
 def load_runtime_env() -> None:
@@ -36,22 +45,257 @@ def get_token(explicit_token: str | None = None) -> str:
     return token
 
 
+LOGGER = logging.getLogger(__name__)
+MAX_RETRIES_ON_RETRY_AFTER = 3
+
+
+def _retry_after_wait_seconds(retry_after_header: str | None) -> float | None:
+    if not retry_after_header:
+        return None
+    value = retry_after_header.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return max(float(value), 0.0)
+    try:
+        retry_dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = dt.datetime.now(dt.timezone.utc)
+    if retry_dt.tzinfo is None:
+        retry_dt = retry_dt.replace(tzinfo=dt.timezone.utc)
+    return max((retry_dt - now).total_seconds(), 0.0)
+
+
+class RateLimitGate:
+    """Compuerta de envío compartida por todos los workers del proceso.
+
+    Un 429 con Retry-After pausa el despacho de todos los workers hasta su deadline. Después, los envíos se espacian
+    con un intervalo adaptativo: se duplica con cada nuevo 429 y se reduce con cada éxito hasta desaparecer.
+    """
+
+    def __init__(self, *, initial_interval: float = 0.1, max_interval: float = 5.0, recovery: float = 0.8):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.recovery = recovery
+        self.interval = 0.0
+        self._paused_until = 0.0
+        self._next_send = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """Bloquea hasta el siguiente hueco de envío; devuelve los segundos esperados."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._paused_until, self._next_send)
+            self._next_send = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+    def throttled(self, wait_seconds: float | None) -> None:
+        with self._lock:
+            if wait_seconds:
+                self._paused_until = max(self._paused_until, time.monotonic() + wait_seconds)
+            self.interval = min(max(self.interval * 2, self.initial_interval), self.max_interval)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            if self.interval:
+                self.interval *= self.recovery
+                if self.interval < self.initial_interval / 4:
+                    self.interval = 0.0
+
+
+RATE_LIMIT_GATE = RateLimitGate()
+
+# Presupuesto de reintentos 429 del hilo actual: (max_retries, lista con la espera de cada reintento ya hecho).
+_RETRY_SCOPE = threading.local()
+
+
+@contextmanager
+def retry_429_scope(max_retries: int, retries: list[float]) -> Iterator[None]:
+    """Fija el presupuesto de reintentos 429 que comparten todas las peticiones hechas desde este hilo."""
+    previous = getattr(_RETRY_SCOPE, 'value', None)
+    _RETRY_SCOPE.value = (max_retries, retries)
+    try:
+        yield
+    finally:
+        _RETRY_SCOPE.value = previous
+
+
+class GatedRestSession(RestSession):
+    """RestSession cuyas peticiones pasan por ``RATE_LIMIT_GATE``.
+
+    El reintento 429 del SDK está desactivado: aquí cada 429 pausa la compuerta para todos los workers y solo se
+    reintenta la petición HTTP afectada, no el handler completo (muchos handlers capturan sus propias excepciones).
+    Agotado el presupuesto, la respuesta 429 llega al SDK, que la eleva como ``RestError``.
+    """
+
+    def __init__(self, *, tokens: Tokens, concurrent_requests: int = 10):
+        super().__init__(tokens=tokens, concurrent_requests=concurrent_requests, retry_429=False)
+
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Response:
+        max_retries, retries = getattr(_RETRY_SCOPE, 'value', None) or (MAX_RETRIES_ON_RETRY_AFTER, [])
+        while True:
+            gate = RATE_LIMIT_GATE
+            gate.wait()
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code != 429:
+                gate.succeeded()
+                return response
+            retry_after = response.headers.get('Retry-After')
+            wait_seconds = _retry_after_wait_seconds(retry_after)
+            gate.throttled(wait_seconds)
+            if wait_seconds is None or len(retries) >= max_retries:
+                return response
+            retries.append(wait_seconds)
+            LOGGER.warning('Recibido 429 (Retry-After=%s). Reintento %s/%s en %.2fs', retry_after, len(retries), max_retries, wait_seconds)
+            response.close()
+            # El worker que recibió el 429 agota la pausa y reintenta primero; el resto espera en gate.wait().
+            time.sleep(wait_seconds)
+
+
+_API_CACHE: dict[str, WebexSimpleApi] = {}
+_API_CACHE_LOCK = threading.Lock()
+
+
 def create_api(token: str) -> WebexSimpleApi:
-    return WebexSimpleApi(tokens=token)
+    # Un cliente por token y proceso: todas las filas/órdenes reutilizan el pool keep-alive
+    # de su RestSession en lugar de abrir una conexión TLS nueva por llamada al handler.
+    with _API_CACHE_LOCK:
+        api = _API_CACHE.get(token)
+        if api is None:
+            session = GatedRestSession(tokens=Tokens(access_token=token))
+            api = _API_CACHE[token] = WebexSimpleApi(tokens=token, session=session)
+        return api
+
+
+def clear_api_cache() -> None:
+    """Cierra y descarta los clientes cacheados (p.ej. tras rotar el token)."""
+    with _API_CACHE_LOCK:
+        apis = list(_API_CACHE.values())
+        _API_CACHE.clear()
+    for api in apis:
+        # la sesión la crea create_api, así que WebexSimpleApi.close() no la cierra
+        api.session.close()
+
+
+_REPORT_CACHE: dict[Path, tuple[tuple[int, int], Any]] = {}
+_REPORT_CACHE_LOCK = threading.Lock()
 
 
 def load_report_json(filename: str) -> dict[str, Any] | None:
-    report_file = Path(__file__).resolve().parents[2] / '.artifacts' / 'report' / filename
-    if not report_file.is_file():
+    """Lee un artifact de ``.artifacts/report``, memoizado hasta que cambie su mtime/tamaño.
+
+    El objeto devuelto se comparte entre llamadas: los handlers solo lo validan, no lo mutan.
+    """
+    return _load_json_cached(Path(__file__).resolve().parents[2] / '.artifacts' / 'report' / filename)
+
+
+def _load_json_cached(path: Path) -> Any:
+    try:
+        stat = path.stat()
+    except OSError:
         return None
-    with report_file.open('r', encoding='utf-8') as handle:
-        return json.load(handle)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _REPORT_CACHE_LOCK:
+        cached = _REPORT_CACHE.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+    with path.open('r', encoding='utf-8') as handle:
+        payload = json.load(handle)
+    with _REPORT_CACHE_LOCK:
+        _REPORT_CACHE[path] = (version, payload)
+    return payload
+
+
+# Verbosidad de consola: quiet (nada), events (solo nombre del evento), full (evento + payload).
+CONSOLE_LEVELS = ('quiet', 'events', 'full')
+_console_level = os.getenv('SPACE_ODT_V21_CONSOLE_LEVEL', 'full')
+if _console_level not in CONSOLE_LEVELS:
+    _console_level = 'full'
+
+AUDIT_FLUSH_INTERVAL_SECONDS = 0.5
+AUDIT_MAX_BUFFERED_LINES = 500
+
+
+def set_console_level(level: str) -> None:
+    global _console_level
+    if level not in CONSOLE_LEVELS:
+        raise ValueError(f'Nivel de consola no soportado: {level} (usa {", ".join(CONSOLE_LEVELS)})')
+    _console_level = level
+
+
+class _AuditLog:
+    """Fichero JSONL de auditoría con buffer en memoria; lo vacía el hilo de fondo o al llenarse."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lines: list[str] = []
+        self._lock = threading.Lock()
+
+    def append(self, line: str) -> None:
+        with self._lock:
+            self._lines.append(line)
+            if len(self._lines) < AUDIT_MAX_BUFFERED_LINES:
+                return
+            self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._lines:
+            return
+        with self.path.open('a', encoding='utf-8') as handle:
+            handle.write('\n'.join(self._lines) + '\n')
+        self._lines.clear()
+
+
+#: carpeta de los logs de auditoría por script; los tests la redirigen a un directorio temporal
+LOGS_DIR = Path(__file__).resolve().parent / 'logs'
+
+_AUDIT_LOGS: dict[Path, _AuditLog] = {}
+_AUDIT_LOCK = threading.Lock()
+_audit_flusher: threading.Thread | None = None
+
+
+def _audit_flush_loop() -> None:
+    while True:
+        time.sleep(AUDIT_FLUSH_INTERVAL_SECONDS)
+        flush_audit_logs()
+
+
+def _audit_log(path: Path) -> _AuditLog:
+    global _audit_flusher
+    with _AUDIT_LOCK:
+        audit = _AUDIT_LOGS.get(path)
+        if audit is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            audit = _AUDIT_LOGS[path] = _AuditLog(path)
+        if _audit_flusher is None:
+            _audit_flusher = threading.Thread(target=_audit_flush_loop, name='v21-audit-flush', daemon=True)
+            _audit_flusher.start()
+        return audit
+
+
+def flush_audit_logs() -> None:
+    """Vuelca a disco todas las líneas de auditoría pendientes (también se llama al salir del proceso)."""
+    with _AUDIT_LOCK:
+        audits = list(_AUDIT_LOGS.values())
+    for audit in audits:
+        audit.flush()
+
+
+atexit.register(flush_audit_logs)
 
 
 def action_logger(script_name: str):
     # Logger JSONL por script para auditoría de requests/responses funcionales.
-    log_file = Path(__file__).resolve().parent / 'logs' / f'{script_name}.log'
-    log_file.parent.mkdir(parents=True, exist_ok=True)
+    audit = _audit_log(LOGS_DIR / f'{script_name}.log')
 
     def _log(event: str, payload: dict[str, Any]) -> None:
         line = {
@@ -60,16 +304,17 @@ def action_logger(script_name: str):
             'event': event,
             'payload': payload,
         }
-        with log_file.open('a', encoding='utf-8') as handle:
-            handle.write(json.dumps(line, ensure_ascii=False, sort_keys=True) + '\n')
+        audit.append(json.dumps(line, ensure_ascii=False, sort_keys=True))
         log_console_step(script_name, event, payload)
 
     return _log
 
 
 def log_console_step(script_name: str, event: str, payload: dict[str, Any] | None = None) -> None:
+    if _console_level == 'quiet':
+        return
     message = f'[{script_name}] {event}'
-    if payload is not None:
+    if payload is not None and _console_level == 'full':
         message += f': {json.dumps(payload, ensure_ascii=False, sort_keys=True)}'
     print(message)
 
@@ -4,17 +4,24 @@ from __future__ import annotations
 
 import argparse
 import csv
-import datetime as dt
 import inspect
 import json
 import logging
 import time
 import traceback
-from email.utils import parsedate_to_datetime
 from pathlib import Path
 from typing import Any, Callable, get_args, get_origin, get_type_hints
 
-from .common import get_token, load_runtime_env
+from . import common
+from .common import (
+    CONSOLE_LEVELS,
+    MAX_RETRIES_ON_RETRY_AFTER,
+    _retry_after_wait_seconds,
+    get_token,
+    load_runtime_env,
+    retry_429_scope,
+    set_console_level,
+)
 from .generar_csv_candidatos_desde_artifacts import SCRIPT_DEPENDENCIES
 from .ubicacion_actualizar_cabecera import actualizar_cabecera_ubicacion
 from .ubicacion_alta_numeraciones_desactivadas import alta_numeraciones_desactivadas
@@ -78,47 +85,41 @@ LOCAL_SCRIPT_DEPENDENCIES: dict[str, list[str]] = {
 
 
 LOGGER = logging.getLogger(__name__)
-MAX_RETRIES_ON_RETRY_AFTER = 3
 
 
-def _retry_after_wait_seconds(retry_after_header: str | None) -> float | None:
-    if not retry_after_header:
-        return None
-    value = retry_after_header.strip()
-    if not value:
-        return None
-    if value.isdigit():
-        return max(float(value), 0.0)
-    try:
-        retry_dt = parsedate_to_datetime(value)
-    except (TypeError, ValueError):
-        return None
-    now = dt.datetime.now(dt.timezone.utc)
-    if retry_dt.tzinfo is None:
-        retry_dt = retry_dt.replace(tzinfo=dt.timezone.utc)
-    return max((retry_dt - now).total_seconds(), 0.0)
-
+def _invoke_with_retry_after(
+    *,
+    handler: ActionFn,
+    token: str,
+    params: dict[str, Any],
+    max_retries: int = MAX_RETRIES_ON_RETRY_AFTER,
+    retries: list[float] | None = None,
+) -> dict[str, Any]:
+    """Invoca el handler con un presupuesto de ``max_retries`` reintentos 429; ``retries`` recibe la espera de cada uno.
 
-def _invoke_with_retry_after(*, handler: ActionFn, token: str, params: dict[str, Any]) -> dict[str, Any]:
-    attempt = 0
+    Los 429 se gestionan petición a petición en la sesión de ``create_api`` (``common.GatedRestSession``), que pausa a
+    todos los workers vía ``RATE_LIMIT_GATE``. Un 429 que aun así escape del handler repite el handler completo mientras
+    quede presupuesto.
+    """
+    retries = retries if retries is not None else []
     while True:
         try:
-            return handler(token=token, **params)
+            with retry_429_scope(max_retries, retries):
+                return handler(token=token, **params)
         except Exception as exc:  # noqa: BLE001
-            attempt += 1
             response = getattr(exc, 'response', None)
             status_code = getattr(response, 'status_code', None)
             headers = getattr(response, 'headers', None) or {}
             retry_after = headers.get('Retry-After') or headers.get('retry-after')
             wait_seconds = _retry_after_wait_seconds(retry_after)
-            should_retry = status_code == 429 and wait_seconds is not None and attempt <= MAX_RETRIES_ON_RETRY_AFTER
-            if not should_retry:
+            if status_code != 429 or wait_seconds is None or len(retries) >= max_retries:
                 raise
-            LOGGER.warning('Recibido 429 (Retry-After=%s). Reintento %s/%s en %.2fs', retry_after, attempt, MAX_RETRIES_ON_RETRY_AFTER, wait_seconds)
+            common.RATE_LIMIT_GATE.throttled(wait_seconds)
+            retries.append(wait_seconds)
+            LOGGER.warning('Recibido 429 (Retry-After=%s). Reintento %s/%s en %.2fs', retry_after, len(retries), max_retries, wait_seconds)
             time.sleep(wait_seconds)
 
 
-
 def _setup_debug_logging() -> None:
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     logging.getLogger('wxc_sdk').setLevel(logging.DEBUG)
@@ -275,7 +276,7 @@ def _params_for_script(script_name: str, parameter_map: dict[str, Any]) -> tuple
     if missing:
         return {}, missing
 
-    accepted_params = set(inspect.signature(handler).parameters.keys()) - {'token'}
+    accepted_params = set(inspect.signature(handler).parameters.keys()) - {'token', 'api'}
     try:
         type_hints = get_type_hints(handler)
     except Exception:  # noqa: BLE001
@@ -296,6 +297,7 @@ def _run_script(
     auto_confirm: bool,
     dry_run: bool,
     precheck_workspace_permissions: bool = False,
+    max_retries: int = MAX_RETRIES_ON_RETRY_AFTER,
 ) -> dict[str, Any]:
     if script_name not in HANDLERS:
         return {'script_name': script_name, 'status': 'rejected', 'reason': 'unsupported_script'}
@@ -368,8 +370,11 @@ def _run_script(
     if dry_run:
         return {'script_name': script_name, 'status': 'dry_run', 'params': params, 'invocation': invocation_payload}
 
+    retries: list[float] = []
     try:
-        result = _invoke_with_retry_after(handler=HANDLERS[script_name], token=token, params=params)
+        result = _invoke_with_retry_after(
+            handler=HANDLERS[script_name], token=token, params=params, max_retries=max_retries, retries=retries
+        )
     except Exception as exc:  # noqa: BLE001
         LOGGER.exception('Fallo ejecutando %s con params=%s', script_name, json.dumps(params, ensure_ascii=False, sort_keys=True))
         error_type = getattr(exc, 'error_type', type(exc).__name__)
@@ -384,9 +389,17 @@ def _run_script(
             'invocation': invocation_payload,
             'traceback': traceback.format_exc(),
             'precheck': precheck_result,
+            'retries_429': len(retries),
         }
 
-    return {'script_name': script_name, 'status': 'executed', 'result': result, 'invocation': invocation_payload, 'precheck': precheck_result}
+    return {
+        'script_name': script_name,
+        'status': 'executed',
+        'result': result,
+        'invocation': invocation_payload,
+        'precheck': precheck_result,
+        'retries_429': len(retries),
+    }
 
 
 def main() -> None:
@@ -399,9 +412,13 @@ def main() -> None:
     parser.add_argument('--auto-confirm', action='store_true', help='Evita input() y confirma todo automáticamente')
     parser.add_argument('--dry-run', action='store_true', help='No llama API, solo valida y muestra payload a ejecutar')
     parser.add_argument('--precheck-workspace-permissions', action='store_true', help='Consulta y muestra permisos de workspace antes de ejecutar scripts workspaces_*')
+    parser.add_argument('--console-level', choices=CONSOLE_LEVELS, default=None, help='Verbosidad de consola de los handlers (quiet, events, full)')
+    parser.add_argument('--max-retries-429', type=int, default=MAX_RETRIES_ON_RETRY_AFTER, help='Reintentos máximos por 429 con Retry-After')
     args = parser.parse_args()
 
     _setup_debug_logging()
+    if args.console_level:
+        set_console_level(args.console_level)
 
     csv_paths = args.csv_path or [DEFAULT_CSV]
     parameter_map = _read_parameter_map_from_sources(csv_paths=csv_paths, input_data_dir=args.input_data_dir)
@@ -410,7 +427,7 @@ def main() -> None:
     token = '' if args.dry_run else get_token(args.token)
     report: list[dict[str, Any]] = []
     for script_name in scripts:
-        report.append(_run_script(script_name=script_name, parameter_map=parameter_map, token=token, auto_confirm=args.auto_confirm, dry_run=args.dry_run, precheck_workspace_permissions=args.precheck_workspace_permissions))
+        report.append(_run_script(script_name=script_name, parameter_map=parameter_map, token=token, auto_confirm=args.auto_confirm, dry_run=args.dry_run, precheck_workspace_permissions=args.precheck_workspace_permissions, max_retries=args.max_retries_429))
 
     print(json.dumps({
         'csv_paths': [str(path) for path in csv_paths],
@@ -22,6 +22,7 @@ SCRIPT_NAME = 'ubicacion_actualizar_cabecera'
 def actualizar_cabecera_ubicacion(
     *,
     token: str,
+    api: Any = None,
     location_id: str,
     phone_number: str,
     org_id: str | None = None,
@@ -34,7 +35,7 @@ def actualizar_cabecera_ubicacion(
         raise ValueError('phone_number es obligatorio')
 
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
     # 2) Actualizamos usando el método específico de ubicación con el objeto mínimo requerido.
     calling_line = CallingLineId(phone_number=phone_number)
     if calling_line_name:
@@ -24,6 +24,7 @@ SCRIPT_NAME = 'ubicacion_alta_numeraciones_desactivadas'
 def alta_numeraciones_desactivadas(
     *,
     token: str,
+    api: Any = None,
     location_id: str,
     phone_numbers: list[str],
     number_type: TelephoneNumberType = TelephoneNumberType.did,
@@ -34,7 +35,7 @@ def alta_numeraciones_desactivadas(
 
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
     # 2) Payload final: registramos exactamente qué se enviará al endpoint.
     request = {
         'location_id': location_id,
@@ -30,6 +30,7 @@ def _decode_hydra_resource_type(webex_id: str) -> str | None:
 def configurar_llamadas_internas_ubicacion(
     *,
     token: str,
+    api: Any = None,
     location_id: str,
     enable_unknown_extension_route_policy: bool,
     premise_route_id: str | None = None,
@@ -51,7 +52,7 @@ def configurar_llamadas_internas_ubicacion(
 
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     # 2) Leemos configuración actual para construir el update incremental.
     settings = api.telephony.location.internal_dialing.read(location_id=location_id, org_id=org_id)
@@ -43,6 +43,7 @@ def _normalize_location_id_for_telephony(location_id: str) -> str:
 def configurar_permisos_salientes_defecto_ubicacion(
     *,
     token: str,
+    api: Any = None,
     location_id: str,
     org_id: str | None = None,
 ) -> dict[str, Any]:
@@ -51,7 +52,7 @@ def configurar_permisos_salientes_defecto_ubicacion(
     """
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     normalized_location_id = _normalize_location_id_for_telephony(location_id)
 
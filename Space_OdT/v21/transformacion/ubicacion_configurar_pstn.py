@@ -84,6 +84,7 @@ def _enable_location_for_calling(*, api, location_id: str, org_id: str | None, l
 def configurar_pstn_ubicacion(
     *,
     token: str,
+    api: Any = None,
     location_id: str,
     premise_route_type: str = 'ROUTE_GROUP',
     premise_route_id: str,
@@ -95,7 +96,7 @@ def configurar_pstn_ubicacion(
 
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     enable_request = {'location_id': location_id, 'org_id': org_id}
     log('enable_calling_request', enable_request)
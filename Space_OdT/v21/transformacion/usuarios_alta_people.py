@@ -23,6 +23,7 @@ SCRIPT_NAME = 'usuarios_alta_people'
 def alta_usuario_people(
     *,
     token: str,
+    api: Any = None,
     email: str,
     first_name: str,
     last_name: str,
@@ -35,7 +36,7 @@ def alta_usuario_people(
 ) -> dict[str, Any]:
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
     people_api: PeopleApi = api.people
 
     existing = [model_to_dict(item) for item in people_api.list(email=email, org_id=org_id)]
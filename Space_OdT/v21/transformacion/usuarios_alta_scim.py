@@ -15,6 +15,7 @@ SCRIPT_NAME = 'usuarios_alta_scim'
 def alta_usuario_scim(
     *,
     token: str,
+    api: Any = None,
     org_id: str,
     email: str,
     first_name: str,
@@ -24,7 +25,7 @@ def alta_usuario_scim(
 ) -> dict[str, Any]:
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     filter_expr = f'userName eq "{email}"'
     search = api.scim.users.search(org_id=org_id, filter=filter_expr, count=1)
@@ -15,13 +15,14 @@ SCRIPT_NAME = 'usuarios_anadir_intercom_legacy'
 def anadir_intercom_legacy_usuario(
     *,
     token: str,
+    api: Any = None,
     person_id: str,
     legacy_phone_number: str,
     org_id: str | None = None,
 ) -> dict[str, Any]:
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     # 2) Lectura base para validar idempotencia (no duplicar número legacy).
     current_numbers = api.person_settings.numbers.read(person_id=person_id, org_id=org_id)
@@ -6,8 +6,10 @@ import argparse
 import csv
 import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from wxc_sdk.licenses import LicenseProperties, LicenseRequest, LicenseRequestOperation
 from wxc_sdk.telephony.jobs import MoveUser, MoveUsersList
@@ -31,6 +33,17 @@ CSV_HEADERS = [
     'target_location_id',
 ]
 
+#: ids por llamada a people.list(id_list=...)
+PEOPLE_ID_LIST_CHUNK = 85
+#: usuarios por job MoveUsers: la API documenta un máximo de un usuario de Calling por job (error 1026005).
+#: Lotes mayores solo con --batch-size; si el tenant los rechaza con 1026005 se baja a 1 para el resto.
+MOVE_USERS_BATCH_SIZE = 1
+MOVE_USERS_SINGLE_USER_ERROR = '1026005'
+MOVE_JOB_TERMINAL_STATUSES = ('COMPLETED', 'FAILED')
+MOVE_JOB_POLL_INTERVAL_SECONDS = 5.0
+MOVE_JOB_TIMEOUT_SECONDS = 900.0
+MOVE_USERS_PATH = 'telephony.jobs.move_users.validate_or_initiate'
+
 def _normalize_location_id(raw: str | None) -> str:
     """Normaliza IDs tipo Webex para comparación estable (con/sin padding base64)."""
     return (raw or '').strip().rstrip('=')
@@ -187,28 +200,171 @@ def _apply_with_license_assignment(api: Any, row: dict[str, str], *, calling_lic
     }
 
 
-def _apply_location_change(api: Any, row: dict[str, str]) -> dict[str, Any]:
-    person_id = row['person_id'].strip()
-    person = api.people.details(person_id=person_id, calling_data=True)
-    if _is_calling_user(person):
-        return _apply_with_move_users_job(api, row, person=person)
-    return _apply_with_people_update(api, row, person=person)
+def _fetch_people(api: Any, person_ids: list[str]) -> dict[str, Any]:
+    """Detalle (con calling data) de varias personas en bloques de ``PEOPLE_ID_LIST_CHUNK`` ids."""
+    unique_ids = list(dict.fromkeys(person_ids))
+    people: dict[str, Any] = {}
+    for start in range(0, len(unique_ids), PEOPLE_ID_LIST_CHUNK):
+        chunk = unique_ids[start:start + PEOPLE_ID_LIST_CHUNK]
+        for person in api.people.list(id_list=chunk, calling_data=True):
+            people[person.person_id] = person
+    # Ids que people.list no devuelve tal cual (otro formato de id): consulta individual como antes.
+    for person_id in unique_ids:
+        if person_id not in people:
+            people[person_id] = api.people.details(person_id=person_id, calling_data=True)
+    return people
+
+
+def _move_users_batches(
+    moves: list[tuple[dict[str, str], Any]], batch_size: int
+) -> list[tuple[str, list[tuple[dict[str, str], Any]]]]:
+    """Agrupa los movimientos por location destino y los trocea en lotes de ``batch_size`` usuarios."""
+    by_location: dict[str, list[tuple[dict[str, str], Any]]] = {}
+    for row, person in moves:
+        by_location.setdefault(row['target_location_id'].strip(), []).append((row, person))
+    size = max(batch_size, 1)
+    return [
+        (location_id, items[start:start + size])
+        for location_id, items in by_location.items()
+        for start in range(0, len(items), size)
+    ]
 
 
-def assign_users_to_locations(*, csv_path: Path, token: str | None = None, dry_run: bool = True) -> list[dict[str, Any]]:
+def _submit_move_users_job(api: Any, location_id: str, batch: list[tuple[dict[str, str], Any]]) -> Any:
+    users_list = [
+        MoveUsersList(
+            location_id=location_id,
+            validate_only=False,
+            users=[MoveUser(user_id=row['person_id'].strip(), extension=person.extension) for row, person in batch],
+        )
+    ]
+    return api.telephony.jobs.move_users.validate_or_initiate(users_list=users_list)
+
+
+def _row_error(exc: Exception) -> dict[str, Any]:
+    return {'status': 'error', 'error_type': type(exc).__name__, 'error': str(exc)}
+
+
+def _apply_move_users_jobs(
+    api: Any,
+    moves: list[tuple[dict[str, str], Any]],
+    *,
+    batch_size: int = MOVE_USERS_BATCH_SIZE,
+    log: Callable[[str, dict[str, Any]], None] | None = None,
+) -> tuple[dict[str, dict[str, Any]], list[str]]:
+    """
+    Lanza un job MoveUsers por location destino y lote; devuelve resultado por persona y los job ids lanzados.
+
+    Cada job (con su respuesta) y cada resultado se registran en ``log`` en cuanto se producen; un lote que falla
+    deja sus filas en error y no detiene el resto.
+    """
+    log = log or (lambda event, payload: None)
+    results: dict[str, dict[str, Any]] = {}
+    job_ids: list[str] = []
+    pending = _move_users_batches(moves, batch_size)
+    while pending:
+        location_id, batch = pending.pop(0)
+        error: dict[str, Any] = {}
+        try:
+            response = _submit_move_users_job(api, location_id, batch)
+        except Exception as exc:  # noqa: BLE001
+            if len(batch) > 1 and str(getattr(exc, 'code', '')) == MOVE_USERS_SINGLE_USER_ERROR:
+                # El tenant solo admite jobs de un usuario: se rehacen este lote y los pendientes de uno en uno.
+                batch_size = 1
+                pending = _move_users_batches(batch, 1) + [
+                    single for _, rest in pending for single in _move_users_batches(rest, 1)
+                ]
+                continue
+            response = None
+            error = _row_error(exc)
+        job_details = getattr(response, 'job_details', None)
+        job_id = getattr(job_details, 'id', None)
+        if job_id:
+            job_ids.append(job_id)
+        log('move_users_job', {
+            'location_id': location_id,
+            'person_ids': [row['person_id'].strip() for row, _ in batch],
+            'job_id': job_id,
+            'response': model_to_dict(response) if response is not None else None,
+            **error,
+        })
+        user_errors = {
+            item.user_id: model_to_dict(item.errors)
+            for item in (getattr(response, 'users_list', None) or [])
+            if getattr(item, 'errors', None)
+        }
+        for row, person in batch:
+            person_id = row['person_id'].strip()
+            result = {
+                'person_id': person_id,
+                'from_location_id': (person.location_id or '').strip(),
+                'to_location_id': location_id,
+                'extension': person.extension,
+                'path': MOVE_USERS_PATH,
+                'status': 'error' if person_id in user_errors else 'submitted',
+                'job_id': job_id,
+                'batch_size': len(batch),
+            }
+            if person_id in user_errors:
+                result['errors'] = user_errors[person_id]
+            result.update(error)
+            results[person_id] = result
+            log('user_location_updated', result)
+    return results, job_ids
+
+
+def _wait_for_move_jobs(
+    api: Any,
+    job_ids: list[str],
+    *,
+    poll_interval: float = MOVE_JOB_POLL_INTERVAL_SECONDS,
+    timeout: float = MOVE_JOB_TIMEOUT_SECONDS,
+) -> dict[str, str]:
+    """Sondea todos los jobs a la vez en cada ronda hasta que terminen o venza ``timeout``; job_id -> estado."""
+    statuses = {job_id: 'STARTING' for job_id in job_ids}
+    pending = list(job_ids)
+    deadline = time.monotonic() + timeout
+
+    def _status(job_id: str) -> str:
+        details = api.telephony.jobs.move_users.status(job_id=job_id)
+        return (getattr(details, 'latest_execution_status', None) or 'UNKNOWN').upper()
+
+    with ThreadPoolExecutor(max_workers=min(max(len(pending), 1), 16)) as pool:
+        while pending:
+            for job_id, status in zip(pending, pool.map(_status, pending)):
+                statuses[job_id] = status
+            pending = [job_id for job_id in pending if statuses[job_id] not in MOVE_JOB_TERMINAL_STATUSES]
+            if not pending or time.monotonic() >= deadline:
+                break
+            time.sleep(poll_interval)
+    return statuses
+
+
+def assign_users_to_locations(
+    *,
+    csv_path: Path,
+    token: str | None = None,
+    dry_run: bool = True,
+    api: Any = None,
+    batch_size: int = MOVE_USERS_BATCH_SIZE,
+    wait_jobs: bool = True,
+) -> list[dict[str, Any]]:
     rows = _load_selected_rows(csv_path)
     if not rows:
         print(f'No hay filas seleccionadas en {csv_path}. Marca selected=1 para aplicar cambios.')
         return []
 
     load_runtime_env()
-    api = create_api(get_token(token))
+    if api is None:
+        api = create_api(get_token(token))
+
+    people = _fetch_people(api, [row['person_id'].strip() for row in rows])
 
     if dry_run:
         preview = []
         for row in rows:
-            person = api.people.details(person_id=row['person_id'].strip(), calling_data=True)
-            sdk_path = 'telephony.jobs.move_users.validate_or_initiate' if _is_calling_user(person) else 'people.update'
+            person = people[row['person_id'].strip()]
+            sdk_path = MOVE_USERS_PATH if _is_calling_user(person) else 'people.update'
             preview.append(
                 {
                     'person_id': row['person_id'].strip(),
@@ -220,11 +376,51 @@ def assign_users_to_locations(*, csv_path: Path, token: str | None = None, dry_r
         return preview
 
     log = action_logger(SCRIPT_NAME)
-    results: list[dict[str, Any]] = []
+    results_by_person: dict[str, dict[str, Any]] = {}
+    moves: dict[str, tuple[dict[str, str], Any]] = {}
     for row in rows:
-        payload = _apply_location_change(api, row)
-        log('user_location_updated', payload)
-        results.append(payload)
+        person_id = row['person_id'].strip()
+        person = people[person_id]
+        if person_id in results_by_person or person_id in moves:
+            continue
+        if _is_calling_user(person) and _normalize_location_id(person.location_id) != _normalize_location_id(
+            row['target_location_id']
+        ):
+            moves[person_id] = (row, person)
+            continue
+        try:
+            if _is_calling_user(person):
+                # Sin cambio: _apply_with_move_users_job devuelve 'unchanged' sin llamar a la API.
+                result = _apply_with_move_users_job(api, row, person=person)
+            else:
+                result = _apply_with_people_update(api, row, person=person)
+        except Exception as exc:  # noqa: BLE001
+            result = {
+                'person_id': person_id,
+                'from_location_id': person.location_id,
+                'to_location_id': row['target_location_id'].strip(),
+                'path': 'people.update',
+                **_row_error(exc),
+            }
+        # Cada resultado queda auditado en cuanto se produce, aunque falle una fila posterior.
+        log('user_location_updated', result)
+        results_by_person[person_id] = result
+
+    # Usuarios de Calling: un job MoveUsers por location destino y lote, en vez de uno por persona.
+    moved, job_ids = _apply_move_users_jobs(api, list(moves.values()), batch_size=batch_size, log=log)
+    if wait_jobs and job_ids:
+        job_statuses = _wait_for_move_jobs(api, job_ids)
+        for job_id, job_status in job_statuses.items():
+            log('move_users_job_status', {'job_id': job_id, 'job_status': job_status})
+        for payload in moved.values():
+            job_status = job_statuses.get(payload.get('job_id'))
+            if job_status is None or payload['status'] == 'error':
+                continue
+            payload['job_status'] = job_status
+            payload['status'] = {'COMPLETED': 'updated', 'FAILED': 'error'}.get(job_status, 'submitted')
+    results_by_person.update(moved)
+
+    results = [results_by_person[row['person_id'].strip()] for row in rows]
 
     print(json.dumps({'dry_run': False, 'updated': len(results), 'results': model_to_dict(results)}, indent=2, ensure_ascii=False))
     return results
@@ -238,6 +434,8 @@ def main() -> None:
     parser.add_argument('--overwrite-csv', action='store_true', help='Sobrescribe CSV aunque ya exista')
     parser.add_argument('--generate-only', action='store_true', help='Solo genera el CSV y termina')
     parser.add_argument('--apply', action='store_true', help='Aplica cambios reales (sin este flag se hace dry-run)')
+    parser.add_argument('--batch-size', type=int, default=MOVE_USERS_BATCH_SIZE, help='Usuarios por job MoveUsers (la API documenta 1; valores mayores solo si el tenant los admite)')
+    parser.add_argument('--no-wait', action='store_true', help='No espera a que terminen los jobs MoveUsers')
     args = parser.parse_args()
 
     should_generate_csv = args.generate_only or args.overwrite_csv or not args.csv.exists()
@@ -254,7 +452,13 @@ def main() -> None:
     if args.generate_only:
         return
 
-    assign_users_to_locations(csv_path=csv_path, token=args.token, dry_run=not args.apply)
+    assign_users_to_locations(
+        csv_path=csv_path,
+        token=args.token,
+        dry_run=not args.apply,
+        batch_size=args.batch_size,
+        wait_jobs=not args.no_wait,
+    )
 
 
 if __name__ == '__main__':
@@ -144,6 +144,7 @@ def _configure_forwarding_with_fallback(*, api, person_id: str, org_id: str | No
 def configurar_desvio_prefijo53_usuario(
     *,
     token: str,
+    api: Any = None,
     person_id: str,
     extension: str,
     destination: str | None = None,
@@ -154,7 +155,7 @@ def configurar_desvio_prefijo53_usuario(
     """
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     # 1.1) Pre-chequeo obligatorio: corta temprano si token/usuario no habilitan Calling.
     _assert_person_calling_eligibility(api=api, person_id=person_id, org_id=org_id, log=log)
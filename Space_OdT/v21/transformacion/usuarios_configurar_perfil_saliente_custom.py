@@ -34,6 +34,7 @@ def _normalize_call_types(raw_values: list[str] | None) -> set[OutgoingPermissio
 def configurar_perfil_saliente_custom_usuario(
     *,
     token: str,
+    api: Any = None,
     person_id: str,
     allow_call_types: list[str] | None = None,
     block_call_types: list[str] | None = None,
@@ -45,7 +46,7 @@ def configurar_perfil_saliente_custom_usuario(
     """
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     profile_payload = load_report_json('workspace_profile.json')
 
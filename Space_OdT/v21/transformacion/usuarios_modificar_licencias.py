@@ -15,6 +15,7 @@ SCRIPT_NAME = 'usuarios_modificar_licencias'
 def modificar_licencias_usuario(
     *,
     token: str,
+    api: Any = None,
     person_id: str,
     add_license_ids: list[str] | None = None,
     remove_license_ids: list[str] | None = None,
@@ -30,7 +31,7 @@ def modificar_licencias_usuario(
 
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
     assign_fn = getattr(getattr(api, 'licenses', None), 'assign_licenses_to_users', None)
     if assign_fn is None:
         raise RuntimeError('El cliente SDK no expone api.licenses.assign_licenses_to_users()')
@@ -14,6 +14,7 @@ SCRIPT_NAME = 'usuarios_remover_licencias'
 def remover_licencias_usuario(
     *,
     token: str,
+    api: Any = None,
     person_id: str,
     remove_license_ids: list[str],
     org_id: str | None = None,
@@ -23,6 +24,7 @@ def remover_licencias_usuario(
 
     return modificar_licencias_usuario(
         token=token,
+        api=api,
         person_id=person_id,
         remove_license_ids=remove_license_ids,
         org_id=org_id,
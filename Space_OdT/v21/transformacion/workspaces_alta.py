@@ -25,6 +25,7 @@ SCRIPT_NAME = 'workspaces_alta'
 def alta_workspace(
     *,
     token: str,
+    api: Any = None,
     display_name: str | None = None,
     location_id: str | None = None,
     org_id: str | None = None,
@@ -41,6 +42,7 @@ def alta_workspace(
     if workspaces_lote_json is not None:
         return alta_workspaces_lote(
             token=token,
+            api=api,
             workspaces_lote_json=workspaces_lote_json,
             org_id=org_id,
             continue_on_error=continue_on_error,
@@ -51,7 +53,7 @@ def alta_workspace(
         raise ValueError('display_name es requerido cuando no se usa workspaces_lote_json')
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     existing = list(api.workspaces.list(display_name=display_name, location_id=location_id, org_id=org_id))
     existing_payload = model_to_dict(existing)
@@ -84,6 +86,7 @@ def alta_workspace(
 def alta_workspaces_lote(
     *,
     token: str,
+    api: Any = None,
     workspaces_lote_json: list[dict[str, Any]],
     org_id: str | None = None,
     continue_on_error: bool = True,
@@ -100,7 +103,7 @@ def alta_workspaces_lote(
         raise ValueError('workspaces_lote_json debe ser una lista JSON de objetos')
 
     log = action_logger('workspaces_alta_lote')
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
     report: list[dict[str, Any]] = []
     failures = 0
 
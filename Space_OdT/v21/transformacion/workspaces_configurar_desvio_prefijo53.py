@@ -46,6 +46,7 @@ def _fallback_payload(destination: str) -> dict[str, Any]:
 def configurar_desvio_prefijo53_workspace(
     *,
     token: str,
+    api: Any = None,
     workspace_id: str,
     extension: str,
     destination: str | None = None,
@@ -56,7 +57,7 @@ def configurar_desvio_prefijo53_workspace(
     """
     # 1) Inicialización: logger por acción y cliente API autenticado.
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     read_strategy = 'not_used'
 
@@ -50,6 +50,7 @@ def _destination_is_available(*, api, workspace_id: str, org_id: str | None, des
 def configurar_desvio_prefijo53_workspace_telephony(
     *,
     token: str,
+    api: Any = None,
     workspace_id: str,
     extension: str,
     destination: str | None = None,
@@ -60,7 +61,7 @@ def configurar_desvio_prefijo53_workspace_telephony(
     Configura desvío incondicional del workspace con endpoint telephony/config/workspaces.
     """
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     target_destination = destination or f'53{extension}'
     request = {
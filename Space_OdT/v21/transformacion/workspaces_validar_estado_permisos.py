@@ -44,10 +44,12 @@ def _run_check(*, name: str, reader: Callable[[], Any]) -> dict[str, Any]:
     return result
 
 
-def validar_estado_permisos_workspace(*, token: str, workspace_id: str, org_id: str | None = None) -> dict[str, Any]:
+def validar_estado_permisos_workspace(
+    *, token: str, workspace_id: str, org_id: str | None = None, api: Any = None
+) -> dict[str, Any]:
     """Visualiza si el token/tenant puede leer callForwarding y outgoingPermission del workspace."""
     log = action_logger(SCRIPT_NAME)
-    api = create_api(token)
+    api = api if api is not None else create_api(token)
 
     checks = [
         _run_check(
@@ -149,7 +149,7 @@ def _run_job_background(runner: V21Runner, job_id: str) -> None:
     import asyncio
 
     try:
-        asyncio.run(runner.process_location_job(job_id, chunk_size=200, max_concurrency=20))
+        asyncio.run(runner.process_location_job(job_id, max_concurrency=20))
     except Exception as exc:  # noqa: BLE001
         failure = {
             'failed_at': dt.datetime.now(dt.timezone.utc).isoformat(),
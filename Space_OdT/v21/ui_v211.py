@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import inspect
 import json
+import time
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from pathlib import Path
+from concurrent.futures import Executor
 from typing import Any
 
 from .transformacion.generar_csv_candidatos_desde_artifacts import SCRIPT_DEPENDENCIES
-from .transformacion.launcher_csv_dependencias import HANDLERS
-from .transformacion.bulk_runner import execute_bulk_orders
+from .transformacion.launcher_csv_dependencias import HANDLERS, MAX_RETRIES_ON_RETRY_AFTER, _invoke_with_retry_after
+from .transformacion.bulk_runner import JOB_TERMINAL_STATES, BulkJob, BulkJobQueue, execute_bulk_orders, execute_bulk_rows
+from .transformacion import common
+from .transformacion.common import create_api, flush_audit_logs
 
 CANONICAL_PARAMS = [
     'location_id',
@@ -102,9 +105,19 @@ DATASET_NAMES = {
     'numbers': 'CSV 3 · Numeraciones',
 }
 
+# orders: un hilo por chunk (filas del chunk en serie); rows: cada fila es una tarea con presupuesto global.
+BULK_MODES = ('orders', 'rows')
+
+# Jobs de aplicación: cuántos corren a la vez y cuántas filas en vuelo suman entre todos (pool compartido).
+JOB_MAX_CONCURRENT = 2
+JOB_ROW_WORKERS = 16
+JOB_EVENTS_HEARTBEAT_SECONDS = 5.0
+JOB_EVENTS_MIN_INTERVAL_SECONDS = 0.25
+
 
 def launch_v211_ui(*, token: str, host: str = '127.0.0.1', port: int = 8771) -> None:
     state: dict[str, Any] = {'datasets': {k: [] for k in DATASET_NAMES}, 'mapping': {}}
+    jobs = BulkJobQueue(max_jobs=JOB_MAX_CONCURRENT, row_workers=JOB_ROW_WORKERS)
 
     class Handler(BaseHTTPRequestHandler):
         def _send(self, payload: dict[str, Any], status: int = 200) -> None:
@@ -130,8 +143,42 @@ def launch_v211_ui(*, token: str, host: str = '127.0.0.1', port: int = 8771) ->
             if self.path == '/api/menu':
                 self._send({'sections': ACTION_CATALOG, 'descriptions': ACTION_DESCRIPTIONS})
                 return
+            if self.path == '/api/jobs':
+                self._send({'jobs': [job.snapshot() for job in jobs.jobs()]})
+                return
+            job_route = _job_route(self.path)
+            if job_route is not None:
+                job = jobs.get(job_route[0])
+                if job is None:
+                    self._send({'error': 'job no encontrado'}, status=404)
+                elif job_route[1] == 'events':
+                    self._stream_job(job)
+                elif job_route[1] == '':
+                    self._send(job.snapshot(include_result=True, release_result=True))
+                else:
+                    self._send({'error': 'not found'}, status=404)
+                return
             self._send({'error': 'not found'}, status=404)
 
+        def _stream_job(self, job: BulkJob) -> None:
+            # SSE: un evento por cambio del job (como mucho cada JOB_EVENTS_MIN_INTERVAL_SECONDS) hasta que termina.
+            self.send_response(HTTPStatus.OK)
+            self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            try:
+                while True:
+                    terminal = job.status in JOB_TERMINAL_STATES
+                    snapshot = job.snapshot(include_result=terminal, release_result=terminal)
+                    self.wfile.write(f'data: {json.dumps(snapshot, ensure_ascii=False)}\n\n'.encode('utf-8'))
+                    self.wfile.flush()
+                    if terminal:
+                        return
+                    job.wait_for_change(snapshot['version'], timeout=JOB_EVENTS_HEARTBEAT_SECONDS)
+                    time.sleep(JOB_EVENTS_MIN_INTERVAL_SECONDS)
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
         def do_POST(self) -> None:  # noqa: N802
             try:
                 payload = self._read_json()
@@ -170,25 +217,41 @@ def launch_v211_ui(*, token: str, host: str = '127.0.0.1', port: int = 8771) ->
                 return
 
             if self.path == '/api/action/apply':
+                # La orden se encola y se responde con el job_id; el progreso se consulta en /api/jobs/<id>[/events].
                 action_id = payload.get('action_id')
                 try:
-                    rows = _rows_for_action(action_id=action_id, state=state)
-                    bulk_settings = payload.get('bulk') or {}
-                    self._send(
-                        _apply_action(
+                    rows = list(_rows_for_action(action_id=action_id, state=state))
+                    _ensure_action_available(action_id)
+                    options = _apply_options(payload.get('bulk') or {})
+                    mapping = dict(state['mapping'])
+                    job = jobs.submit(
+                        action_id=action_id,
+                        rows_total=len(rows),
+                        run=lambda job: _apply_action(
                             action_id=action_id,
                             rows=rows,
-                            mapping=state['mapping'],
+                            mapping=mapping,
                             token=token,
-                            bulk=bool(bulk_settings.get('enabled')),
-                            chunk_size=int(bulk_settings.get('chunk_size', 200) or 200),
-                            max_workers=int(bulk_settings.get('max_workers', 4) or 4),
-                        )
+                            job=job,
+                            executor=jobs.row_pool,
+                            **options,
+                        ),
                     )
+                    self._send(job.snapshot(), status=HTTPStatus.ACCEPTED)
                 except Exception as exc:  # noqa: BLE001
                     self._send({'error': str(exc)}, status=400)
                 return
 
+            job_route = _job_route(self.path)
+            if job_route is not None and job_route[1] == 'cancel':
+                job = jobs.get(job_route[0])
+                if job is None:
+                    self._send({'error': 'job no encontrado'}, status=404)
+                    return
+                job.cancel()
+                self._send(job.snapshot())
+                return
+
             self._send({'error': 'not found'}, status=404)
 
         def _read_json(self) -> dict[str, Any]:
@@ -201,7 +264,32 @@ def launch_v211_ui(*, token: str, host: str = '127.0.0.1', port: int = 8771) ->
 
     server = ThreadingHTTPServer((host, port), Handler)
     print(f'V2.1.1 UI listening on http://{host}:{port}')
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    finally:
+        jobs.shutdown()
+
+
+def _job_route(path: str) -> tuple[str, str] | None:
+    """``/api/jobs/<id>[/<accion>]`` -> (id, accion); ``None`` si la ruta no es de un job."""
+    parts = path.split('?', 1)[0].strip('/').split('/')
+    if len(parts) not in (3, 4) or parts[:2] != ['api', 'jobs'] or not parts[2]:
+        return None
+    return parts[2], parts[3] if len(parts) == 4 else ''
+
+
+def _apply_options(bulk_settings: dict[str, Any]) -> dict[str, Any]:
+    bulk_mode = str(bulk_settings.get('mode') or 'orders')
+    if bulk_mode not in BULK_MODES:
+        raise ValueError(f'bulk_mode no soportado: {bulk_mode}')
+    return {
+        'bulk': bool(bulk_settings.get('enabled')),
+        'chunk_size': int(bulk_settings.get('chunk_size', 200) or 200),
+        'max_workers': int(bulk_settings.get('max_workers', 4) or 4),
+        'bulk_mode': bulk_mode,
+        'rate_per_second': float(bulk_settings.get('rate_per_second') or 0) or None,
+        'max_retries': int(bulk_settings.get('max_retries', MAX_RETRIES_ON_RETRY_AFTER)),
+    }
 
 
 def _master_state(state: dict[str, Any]) -> dict[str, Any]:
@@ -258,7 +346,7 @@ def _normalize_for_param(param: str, value: Any) -> Any:
 
 def _build_params(action_id: str, row: dict[str, Any], mapping: dict[str, str]) -> tuple[dict[str, Any], list[str]]:
     required = SCRIPT_DEPENDENCIES[action_id]
-    accepted = set(inspect.signature(HANDLERS[action_id]).parameters.keys()) - {'token'}
+    accepted = set(inspect.signature(HANDLERS[action_id]).parameters.keys()) - {'token', 'api'}
 
     params: dict[str, Any] = {}
     missing: list[str] = []
@@ -295,7 +383,23 @@ def _preview_action(action_id: str, rows: list[dict[str, Any]], mapping: dict[st
     }
 
 
-def _execute_row(*, action_id: str, row: dict[str, Any], row_index: int, mapping: dict[str, str], token: str) -> dict[str, Any]:
+def _shared_api(action_id: str, token: str) -> Any:
+    # Cliente compartido por todas las filas de la orden si el handler admite inyección.
+    if 'api' not in inspect.signature(HANDLERS[action_id]).parameters:
+        return None
+    return create_api(token)
+
+
+def _execute_row(
+    *,
+    action_id: str,
+    row: dict[str, Any],
+    row_index: int,
+    mapping: dict[str, str],
+    token: str,
+    api: Any = None,
+    max_retries: int = MAX_RETRIES_ON_RETRY_AFTER,
+) -> dict[str, Any]:
     params, missing = _build_params(action_id, row, mapping)
     if missing:
         return {
@@ -306,14 +410,24 @@ def _execute_row(*, action_id: str, row: dict[str, Any], row_index: int, mapping
             'params': params,
         }
 
+    # Todas las filas pasan por la compuerta 429 del launcher: un Retry-After pausa a todos los workers.
+    retries: list[float] = []
     try:
-        api_response = HANDLERS[action_id](token=token, **params)
+        injected = {'api': api} if api is not None else {}
+        api_response = _invoke_with_retry_after(
+            handler=HANDLERS[action_id],
+            token=token,
+            params={**injected, **params},
+            max_retries=max_retries,
+            retries=retries,
+        )
         return {
             'row_index': row_index,
             'status': 'ok',
             'http_status': _extract_status_code(api_response),
             'params': params,
             'api_response': api_response,
+            'retries_429': len(retries),
         }
     except Exception as exc:  # noqa: BLE001
         return {
@@ -322,9 +436,29 @@ def _execute_row(*, action_id: str, row: dict[str, Any], row_index: int, mapping
             'http_status': _extract_status_code(exc),
             'params': params,
             'error': str(exc),
+            'retries_429': len(retries),
         }
 
 
+class _RunHooks:
+    """Enlace opcional entre una ejecución y el ``BulkJob`` que la observa (progreso, cancelación, pool compartido)."""
+
+    def __init__(self, job: BulkJob | None = None, executor: Executor | None = None):
+        self.job = job
+        self.executor = executor
+
+    def on_row(self, row_result: dict[str, Any]) -> None:
+        if self.job is not None:
+            self.job.record_row(row_result)
+
+    def on_order(self, order: dict[str, Any]) -> None:
+        if self.job is not None:
+            self.job.record_order(order)
+
+    def should_stop(self) -> bool:
+        return self.job is not None and self.job.cancelled
+
+
 def _run_bulk_orders(
     *,
     action_id: str,
@@ -333,25 +467,32 @@ def _run_bulk_orders(
     token: str,
     chunk_size: int,
     max_workers: int,
+    max_retries: int = MAX_RETRIES_ON_RETRY_AFTER,
+    hooks: _RunHooks | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    api = _shared_api(action_id, token)
+    hooks = hooks or _RunHooks()
+
     def _run_order(order_index: int, chunk: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], dict[str, Any]]:
-        order_rows = [
-            _execute_row(
+        order_rows = []
+        for offset, row in enumerate(chunk, start=1):
+            if hooks.should_stop():
+                break
+            row_result = _execute_row(
                 action_id=action_id,
                 row=row,
                 row_index=((order_index - 1) * chunk_size) + offset,
                 mapping=mapping,
                 token=token,
+                api=api,
+                max_retries=max_retries,
             )
-            for offset, row in enumerate(chunk, start=1)
-        ]
-        summary = {
-            'status': 'completed',
-            'rows_total': len(order_rows),
-            'rows_ok': sum(1 for item in order_rows if item['status'] == 'ok'),
-            'rows_error': sum(1 for item in order_rows if item['status'] == 'error'),
-            'rows_missing': sum(1 for item in order_rows if item['status'] == 'missing_dependencies'),
-        }
+            hooks.on_row(row_result)
+            order_rows.append(row_result)
+        summary = _summarize_order(order_rows)
+        if len(order_rows) < len(chunk):
+            summary['status'] = 'cancelled'
+        hooks.on_order({'order_index': order_index, **summary})
         return order_rows, summary
 
     return execute_bulk_orders(
@@ -362,13 +503,100 @@ def _run_bulk_orders(
     )
 
 
-def _apply_action(*, action_id: str, rows: list[dict[str, Any]], mapping: dict[str, str], token: str, bulk: bool = False, chunk_size: int = 200, max_workers: int = 4) -> dict[str, Any]:
-    _ensure_action_available(action_id)
-    logs_dir = Path(__file__).resolve().parent / 'transformacion' / 'logs'
-    logs_dir.mkdir(parents=True, exist_ok=True)
-    log_path = logs_dir / f'{action_id}.log'
+def _summarize_order(order_rows: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        'status': 'completed',
+        'rows_total': len(order_rows),
+        'rows_ok': sum(1 for item in order_rows if item['status'] == 'ok'),
+        'rows_error': sum(1 for item in order_rows if item['status'] == 'error'),
+        'rows_missing': sum(1 for item in order_rows if item['status'] == 'missing_dependencies'),
+    }
+
 
-    if bulk:
+def _run_bulk_rows(
+    *,
+    action_id: str,
+    rows: list[dict[str, Any]],
+    mapping: dict[str, str],
+    token: str,
+    chunk_size: int,
+    max_workers: int,
+    rate_per_second: float | None,
+    on_row: Any = None,
+    max_retries: int = MAX_RETRIES_ON_RETRY_AFTER,
+    hooks: _RunHooks | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    # Modo filas: cada fila es una tarea del engine async; el chunk solo agrupa el reporte por orden.
+    api = _shared_api(action_id, token)
+    hooks = hooks or _RunHooks()
+
+    def _run_row(row_index: int, row: dict[str, Any]) -> dict[str, Any]:
+        return _execute_row(
+            action_id=action_id, row=row, row_index=row_index, mapping=mapping, token=token, api=api, max_retries=max_retries
+        )
+
+    def _on_row(row_result: dict[str, Any]) -> None:
+        if on_row is not None:
+            on_row(row_result)
+        hooks.on_row(row_result)
+
+    return execute_bulk_rows(
+        rows=rows,
+        chunk_size=chunk_size,
+        max_concurrency=max_workers,
+        row_callable=_run_row,
+        summarize=_summarize_order,
+        rate_per_second=rate_per_second,
+        on_row=_on_row,
+        on_order=hooks.on_order,
+        should_stop=hooks.should_stop,
+        executor=hooks.executor,
+    )
+
+
+def _apply_action(
+    *,
+    action_id: str,
+    rows: list[dict[str, Any]],
+    mapping: dict[str, str],
+    token: str,
+    bulk: bool = False,
+    chunk_size: int = 200,
+    max_workers: int = 4,
+    bulk_mode: str = 'orders',
+    rate_per_second: float | None = None,
+    max_retries: int = MAX_RETRIES_ON_RETRY_AFTER,
+    job: BulkJob | None = None,
+    executor: Executor | None = None,
+) -> dict[str, Any]:
+    _ensure_action_available(action_id)
+    if bulk_mode not in BULK_MODES:
+        raise ValueError(f'bulk_mode no soportado: {bulk_mode}')
+    common.LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = common.LOGS_DIR / f'{action_id}.log'
+    streamed = bulk and bulk_mode == 'rows'
+    hooks = _RunHooks(job, executor)
+
+    if streamed:
+        # Cada resultado se vuelca al log en cuanto termina su fila, sin esperar al resto de la orden.
+        with log_path.open('a', encoding='utf-8') as handle:
+            def _stream_row(row_result: dict[str, Any]) -> None:
+                handle.write(json.dumps(row_result, ensure_ascii=False) + '\n')
+                handle.flush()
+
+            orders, results = _run_bulk_rows(
+                action_id=action_id,
+                rows=rows,
+                mapping=mapping,
+                token=token,
+                chunk_size=chunk_size,
+                max_workers=max_workers,
+                rate_per_second=rate_per_second,
+                on_row=_stream_row,
+                max_retries=max_retries,
+                hooks=hooks,
+            )
+    elif bulk:
         orders, results = _run_bulk_orders(
             action_id=action_id,
             rows=rows,
@@ -376,17 +604,28 @@ def _apply_action(*, action_id: str, rows: list[dict[str, Any]], mapping: dict[s
             token=token,
             chunk_size=chunk_size,
             max_workers=max_workers,
+            max_retries=max_retries,
+            hooks=hooks,
         )
     else:
         orders = []
-        results = [
-            _execute_row(action_id=action_id, row=row, row_index=idx, mapping=mapping, token=token)
-            for idx, row in enumerate(rows, start=1)
-        ]
+        api = _shared_api(action_id, token)
+        results = []
+        for idx, row in enumerate(rows, start=1):
+            if hooks.should_stop():
+                break
+            row_result = _execute_row(
+                action_id=action_id, row=row, row_index=idx, mapping=mapping, token=token, api=api, max_retries=max_retries
+            )
+            hooks.on_row(row_result)
+            results.append(row_result)
 
-    with log_path.open('a', encoding='utf-8') as handle:
-        for row_result in results:
-            handle.write(json.dumps(row_result, ensure_ascii=False) + '\n')
+    if not streamed:
+        with log_path.open('a', encoding='utf-8') as handle:
+            for row_result in results:
+                handle.write(json.dumps(row_result, ensure_ascii=False) + '\n')
+    # Las auditorías de los handlers quedan en disco antes de responder a la UI.
+    flush_audit_logs()
 
     ui_rows = [
         {
@@ -394,6 +633,7 @@ def _apply_action(*, action_id: str, rows: list[dict[str, Any]], mapping: dict[s
             'status': item['status'],
             'http_status': item.get('http_status', 'UNKNOWN'),
             'missing': item.get('missing', []),
+            'retries_429': item.get('retries_429', 0),
         }
         for item in results
     ]
@@ -402,12 +642,15 @@ def _apply_action(*, action_id: str, rows: list[dict[str, Any]], mapping: dict[s
         'script': HANDLERS[action_id].__name__,
         'description': ACTION_DESCRIPTIONS.get(action_id, ''),
         'total_rows': len(ui_rows),
+        'cancelled': hooks.should_stop(),
         'rows_preview': ui_rows[:10] if len(ui_rows) > 5 else ui_rows,
         'log_path': str(log_path),
         'bulk': {
             'enabled': bool(bulk),
             'chunk_size': chunk_size if bulk else None,
             'max_workers': max_workers if bulk else None,
+            'mode': bulk_mode if bulk else None,
+            'rate_per_second': rate_per_second if streamed else None,
             'orders': orders if bulk else [],
             'orders_total': len(orders) if bulk else 0,
         },
@@ -511,6 +754,7 @@ def _html_page() -> str:
         <div class="row">
           <button onclick="previewAction()">Preview parámetros</button>
           <button onclick="applyAction()">Aplicar</button>
+          <button class="secondary" id="cancel-job" onclick="cancelJob()" disabled>Cancelar job</button>
         </div>
         <div class="bulk-box">
           <h3>Tema bulk v2.1.1</h3>
@@ -525,6 +769,15 @@ def _html_page() -> str:
             <label>Workers
               <input id="bulk-max-workers" type="number" value="4" min="1" />
             </label>
+            <label>
+              <span><input type="checkbox" id="bulk-rows" /> Concurrencia por fila</span>
+            </label>
+            <label>Peticiones/s (0 = sin límite)
+              <input id="bulk-rate" type="number" value="0" min="0" step="0.5" />
+            </label>
+            <label>Reintentos 429
+              <input id="bulk-max-retries" type="number" value="3" min="0" />
+            </label>
           </div>
           <p class="hint" id="bulk-summary">Bulk desactivado.</p>
         </div>
@@ -756,7 +1009,9 @@ function updateBulkSummary(){
     return;
   }
   const estimatedOrders = totalRows > 0 ? Math.ceil(totalRows / chunkSize) : 0;
-  summary.textContent = `Bulk activado: ${estimatedOrders} lotes estimados para ${totalRows} filas · chunk=${chunkSize} · workers=${maxWorkers}.`;
+  const rowsMode = !!document.getElementById('bulk-rows')?.checked;
+  const mode = rowsMode ? `filas en vuelo=${maxWorkers}` : `workers=${maxWorkers}`;
+  summary.textContent = `Bulk activado: ${estimatedOrders} lotes estimados para ${totalRows} filas · chunk=${chunkSize} · ${mode}.`;
 }
 
 async function previewAction(){
@@ -770,17 +1025,72 @@ async function applyAction(){
   const bulkEnabled = !!document.getElementById('bulk-enabled')?.checked;
   const chunkSize = readPositiveInt('bulk-chunk-size', 200);
   const maxWorkers = readPositiveInt('bulk-max-workers', 4);
+  const mode = document.getElementById('bulk-rows')?.checked ? 'rows' : 'orders';
+  const ratePerSecond = Number(document.getElementById('bulk-rate')?.value || 0);
+  const maxRetries = Math.max(Number(document.getElementById('bulk-max-retries')?.value || 0), 0);
   const res = await api('/api/action/apply', 'POST', {
     action_id: selectedAction,
-    bulk: {enabled: bulkEnabled, chunk_size: chunkSize, max_workers: maxWorkers}
+    bulk: {enabled: bulkEnabled, chunk_size: chunkSize, max_workers: maxWorkers, mode, rate_per_second: ratePerSecond, max_retries: maxRetries}
   });
   document.getElementById('response-box').textContent = JSON.stringify(res, null, 2);
   updateBulkSummary();
+  if(res.job_id){ watchJob(res.job_id); }
+}
+
+let currentJob = null;
+let currentJobEvents = null;
+
+function renderJob(job){
+  const view = {
+    job_id: job.job_id,
+    status: job.status,
+    progreso: `${job.rows_done}/${job.rows_total} filas · ${job.rows_per_sec} filas/s · ${job.rows_error} errores`,
+    orders_done: job.orders_done,
+    orders: job.orders,
+    recent_errors: job.recent_errors,
+    error: job.error,
+    result: job.result,
+  };
+  document.getElementById('response-box').textContent = JSON.stringify(view, null, 2);
+}
+
+function watchJob(jobId){
+  // SSE con fallback a polling si el navegador no soporta EventSource.
+  if(currentJobEvents){ currentJobEvents.close(); }
+  currentJob = jobId;
+  document.getElementById('cancel-job').disabled = false;
+  const finished = (job) => ['completed', 'failed', 'cancelled'].includes(job.status);
+  const done = () => {
+    document.getElementById('cancel-job').disabled = true;
+    if(currentJobEvents){ currentJobEvents.close(); currentJobEvents = null; }
+  };
+  if(window.EventSource){
+    currentJobEvents = new EventSource(`/api/jobs/${jobId}/events`);
+    currentJobEvents.onmessage = (event) => {
+      const job = JSON.parse(event.data);
+      renderJob(job);
+      if(finished(job)){ done(); }
+    };
+    return;
+  }
+  const poll = async () => {
+    const job = await api(`/api/jobs/${jobId}`);
+    renderJob(job);
+    if(finished(job)){ done(); } else { setTimeout(poll, 1000); }
+  };
+  poll();
+}
+
+async function cancelJob(){
+  if(!currentJob){ return; }
+  const res = await api(`/api/jobs/${currentJob}/cancel`, 'POST', {});
+  renderJob(res);
 }
 
 document.getElementById('bulk-enabled').addEventListener('change', updateBulkSummary);
 document.getElementById('bulk-chunk-size').addEventListener('input', updateBulkSummary);
 document.getElementById('bulk-max-workers').addEventListener('input', updateBulkSummary);
+document.getElementById('bulk-rows').addEventListener('change', updateBulkSummary);
 
 buildMenu();
 refreshState();
@@ -4,20 +4,25 @@
 from __future__ import annotations
 
 import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
+import csv
 from datetime import datetime
 import json
 import logging
 import os
 import sys
 import string
+import threading
+import time
 from urllib.parse import quote
 from dataclasses import dataclass
 from pathlib import Path
 import tempfile
-from typing import Any
+from typing import Any, Callable
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 
 LOG_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
 
@@ -106,19 +111,54 @@ def _help_epilog(spec: ActionSpec) -> str:
     )
 
 
+class RateLimiter:
+    """Global request rate shared by every thread using the same client."""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
 class SimpleApiClient:
-    def __init__(self, base_url: str, token: str, timeout: int, retries: int, verify: bool):
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        timeout: int,
+        retries: int,
+        verify: bool,
+        *,
+        pool_size: int = 10,
+        rate_limiter: RateLimiter | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.retries = retries
         self.verify = verify
+        self.rate_limiter = rate_limiter
         self.session = requests.Session()
+        # connection pool sized for the concurrent workers of matrix mode
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({"Authorization": f"Bearer {token}", "Content-Type": "application/json"})
 
     def request(self, method: str, path: str, *, params: dict[str, Any] | None, json_payload: dict[str, Any] | None) -> Response:
         url = f"{self.base_url}/{path.lstrip('/')}"
         last_error: Exception | None = None
         for attempt in range(1, self.retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait()
             try:
                 response = self.session.request(
                     method=method,
@@ -227,7 +267,60 @@ def _load_snapshot(path: Path) -> dict[str, Any]:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def _preflight_snapshot(client: SimpleApiClient, spec: ActionSpec, variables: dict[str, Any], logger: logging.Logger) -> dict[str, Any]:
+class SnapshotCache:
+    """Preflight GETs shared by every variable set of a matrix run.
+
+    Variable sets that resolve to the same path and params (e.g. the settings of a
+    shared location) reuse one GET; concurrent requests for the same key wait for the
+    first one instead of issuing their own.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: str, params: dict[str, Any] | None) -> str:
+        return json.dumps([path, params], sort_keys=True, default=str)
+
+    def get(self, path: str, params: dict[str, Any] | None, fetch: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        key = self._key(path, params)
+        with self._lock:
+            future = self._entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[key] = future
+                self.misses += 1
+            else:
+                self.hits += 1
+        if owner:
+            try:
+                future.set_result(fetch())
+            except Exception as err:
+                future.set_exception(err)
+        return future.result()
+
+
+def _snapshot_get(client: SimpleApiClient, path: str, params: dict[str, Any] | None) -> dict[str, Any]:
+    response = client.request("GET", path, params=params, json_payload=None)
+    json_body: dict[str, Any] | list[Any] | None
+    try:
+        json_body = response.json()
+    except ValueError:
+        json_body = None
+    return {"status": response.status_code, "body": json_body, "text": response.text[:2000]}
+
+
+def _preflight_snapshot(
+    client: SimpleApiClient,
+    spec: ActionSpec,
+    variables: dict[str, Any],
+    logger: logging.Logger,
+    cache: SnapshotCache | None = None,
+) -> dict[str, Any]:
     entries: list[dict[str, Any]] = []
     for call in spec.probe_calls:
         try:
@@ -242,22 +335,12 @@ def _preflight_snapshot(client: SimpleApiClient, spec: ActionSpec, variables: di
             continue
         logger.info("Preflight snapshot GET start", extra={"step": call.name, "path": path})
         try:
-            response = client.request("GET", path, params=params, json_payload=None)
-            json_body: dict[str, Any] | list[Any] | None
-            try:
-                json_body = response.json()
-            except ValueError:
-                json_body = None
-            entries.append(
-                {
-                    "name": call.name,
-                    "path": path,
-                    "status": response.status_code,
-                    "body": json_body,
-                    "text": response.text[:2000],
-                }
-            )
-            logger.info("Preflight snapshot GET done", extra={"step": call.name, "status": response.status_code})
+            if cache is None:
+                result = _snapshot_get(client, path, params)
+            else:
+                result = cache.get(path, params, lambda: _snapshot_get(client, path, params))
+            entries.append({"name": call.name, "path": path, **result})
+            logger.info("Preflight snapshot GET done", extra={"step": call.name, "status": result["status"]})
         except Exception as err:  # pragma: no cover - runtime guard
             logger.exception("Preflight snapshot GET failed", extra={"step": call.name, "error": str(err)})
             entries.append({"name": call.name, "path": path, "error": str(err)})
@@ -285,6 +368,73 @@ def _calls_from_snapshot(snapshot: dict[str, Any], logger: logging.Logger) -> li
     return calls
 
 
+def _load_matrix(csv_path: Path, base_variables: dict[str, Any]) -> list[dict[str, Any]]:
+    """One variable set per CSV row; empty cells fall back to ``--vars``."""
+    with csv_path.open(encoding="utf-8-sig", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    variable_sets: list[dict[str, Any]] = []
+    for row in rows:
+        values = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        if values:
+            variable_sets.append({**base_variables, **values})
+    return variable_sets
+
+
+def _merge_snapshots(spec: ActionSpec, snapshots: list[dict[str, Any]]) -> dict[str, Any]:
+    """Single revert snapshot for a matrix run; shared resources appear once."""
+    entries: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for snapshot in snapshots:
+        for entry in snapshot.get("entries", []):
+            path = entry.get("path")
+            if path:
+                if path in seen:
+                    continue
+                seen.add(path)
+            entries.append(entry)
+    return {"action_key": spec.key, "captured_at": datetime.now().isoformat(), "entries": entries}
+
+
+def run_action_matrix(
+    client: SimpleApiClient,
+    spec: ActionSpec,
+    mode: str,
+    variable_sets: list[dict[str, Any]],
+    logger: logging.Logger,
+    *,
+    workers: int = 4,
+    cache: SnapshotCache | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Run one spec for every variable set concurrently.
+
+    Returns the per-row results (in input order) and the preflight snapshots taken in
+    apply mode. Preflight GETs are deduplicated across rows through ``cache``.
+    """
+    calls = spec.probe_calls if mode == "probe" else spec.apply_calls
+    required_vars, _ = _required_optional_vars(spec)
+    cache = cache if cache is not None else SnapshotCache()
+
+    def run_row(index: int, variables: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any] | None]:
+        row_logger = logger.getChild(f"row{index}")
+        missing_required = [name for name in required_vars if name not in variables]
+        if missing_required and mode == "apply":
+            row_logger.error("Missing required vars for apply mode: %s", ", ".join(missing_required))
+            return {"row": index, "failures": 1, "missing_vars": missing_required}, None
+        snapshot = None
+        if mode == "apply":
+            snapshot = _preflight_snapshot(client, spec, variables, row_logger, cache)
+        failures = _run_calls(client, calls, variables, row_logger)
+        row_logger.info("Matrix row done with %s failure(s)", failures)
+        return {"row": index, "failures": failures, "missing_vars": []}, snapshot
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        outcomes = list(executor.map(lambda item: run_row(*item), enumerate(variable_sets, start=1)))
+    results = [result for result, _ in outcomes]
+    snapshots = [snapshot for _, snapshot in outcomes if snapshot is not None]
+    logger.info("Preflight snapshot cache: %s GET(s), %s reused", cache.misses, cache.hits)
+    return results, snapshots
+
+
 def run_action_spec(spec: ActionSpec) -> int:
     parser = argparse.ArgumentParser(
         description=spec.title,
@@ -300,6 +450,9 @@ def run_action_spec(spec: ActionSpec) -> int:
     parser.add_argument("--retries", type=int, default=2)
     parser.add_argument("--insecure", action="store_true", help="Disable TLS cert validation")
     parser.add_argument("--log-file", default=None, help="Write action logs to this file")
+    parser.add_argument("--matrix-csv", default=None, help="CSV with one variable set per row (columns = --vars keys); runs the action for every row")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent variable sets in --matrix-csv mode")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Max requests per second shared by all workers")
     args = parser.parse_args()
 
     handlers: list[logging.Handler] = [logging.StreamHandler(sys.stdout)]
@@ -331,22 +484,47 @@ def run_action_spec(spec: ActionSpec) -> int:
     if not isinstance(variables, dict):
         logger.error("--vars must be a JSON object (dictionary)")
         return 2
-    required_vars, _ = _required_optional_vars(spec)
-    missing_required = [name for name in required_vars if name not in variables]
-    if missing_required and args.mode == "apply":
-        logger.error("Missing required --vars for apply mode: %s", ", ".join(missing_required))
-        return 2
+    matrix = args.matrix_csv is not None and args.mode != "revert"
+    if matrix:
+        matrix_path = Path(args.matrix_csv)
+        if not matrix_path.exists():
+            logger.error("Matrix CSV not found: %s", matrix_path)
+            return 2
+        variable_sets = _load_matrix(matrix_path, variables)
+        if not variable_sets:
+            logger.error("Matrix CSV has no variable sets: %s", matrix_path)
+            return 2
+        logger.info("Matrix mode: %s variable set(s), %s worker(s)", len(variable_sets), args.workers)
+    else:
+        required_vars, _ = _required_optional_vars(spec)
+        missing_required = [name for name in required_vars if name not in variables]
+        if missing_required and args.mode == "apply":
+            logger.error("Missing required --vars for apply mode: %s", ", ".join(missing_required))
+            return 2
     client = SimpleApiClient(
         base_url=args.base_url,
         token=args.token,
         timeout=args.timeout,
         retries=args.retries,
         verify=not args.insecure,
+        pool_size=max(10, args.workers),
+        rate_limiter=RateLimiter(args.rate_limit) if args.rate_limit else None,
     )
 
     logger.info("No server-side dry-run endpoint is documented for these APIs. probe mode uses controlled invalid or read-only calls.")
     calls = spec.probe_calls if args.mode == "probe" else spec.apply_calls
 
+    if matrix:
+        results, snapshots = run_action_matrix(client, spec, args.mode, variable_sets, logger, workers=args.workers)
+        if args.mode == "apply":
+            snapshot_meta = _snapshot_meta(spec.key, args.snapshot_dir)
+            _save_snapshot(snapshot_meta, _merge_snapshots(spec, snapshots))
+            logger.info("Preflight snapshot saved", extra={"latest": str(snapshot_meta.latest_path), "timestamped": str(snapshot_meta.timestamped_path)})
+        failures = sum(result["failures"] for result in results)
+        failed_rows = sum(1 for result in results if result["failures"])
+        logger.info("Completed matrix with %s failure(s) in %s of %s row(s)", failures, failed_rows, len(results))
+        return 1 if failures else 0
+
     if args.mode == "apply":
         snapshot_meta = _snapshot_meta(spec.key, args.snapshot_dir)
         snapshot_payload = _preflight_snapshot(client, spec, variables, logger)
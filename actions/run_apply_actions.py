@@ -87,6 +87,14 @@ def _parse_api_calls(action_log: Path) -> list[dict[str, Any]]:
     return calls
 
 
+def _matrix_csv(matrix_dir: Path | None, script_name: str) -> Path | None:
+    """CSV de variables para el modo matriz de una accion (``<matrix_dir>/<script>.csv``)."""
+    if matrix_dir is None:
+        return None
+    candidate = matrix_dir / script_name.replace(".py", ".csv")
+    return candidate if candidate.exists() else None
+
+
 def _load_token_env_files(repo_root: Path) -> None:
     """Carga variables de token desde .env sin sobreescribir el entorno existente."""
     dotenv_candidates = (repo_root / ".env", repo_root / "actions" / ".env")
@@ -121,6 +129,9 @@ def main() -> int:
     parser.add_argument("--log-file", default=None, help="Custom path for consolidated log file")
     parser.add_argument("--report-file", default=None, help="Custom path for JSON report with per-action call status")
     parser.add_argument("--context-file", default="actions/lab_context.json", help="Context JSON to replace MISSING_* values")
+    parser.add_argument("--matrix-dir", default=None, help="Directorio con <accion>.csv; si existe, la accion se aplica a cada fila (modo matriz)")
+    parser.add_argument("--workers", type=int, default=4, help="Filas concurrentes por accion en modo matriz")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Max requests/segundo por accion (compartido por sus workers)")
     args = parser.parse_args()
 
     token = _resolve_token(args)
@@ -145,6 +156,7 @@ def main() -> int:
     repo_root = Path(__file__).resolve().parents[1]
     action_logs_dir = repo_root / "actions" / "logs"
     action_logs_dir.mkdir(parents=True, exist_ok=True)
+    matrix_dir = Path(args.matrix_dir) if args.matrix_dir else None
 
     for script_name, payload in ACTIONS:
         resolved_payload, unresolved_keys = _replace_missing_vars(payload, context)
@@ -161,6 +173,12 @@ def main() -> int:
             "--log-file",
             str(action_log),
         ]
+        matrix_csv = _matrix_csv(matrix_dir, script_name)
+        if matrix_csv:
+            cmd += ["--matrix-csv", str(matrix_csv), "--workers", str(args.workers)]
+            logger.info("Modo matriz para %s: %s", script_name, matrix_csv)
+        if args.rate_limit:
+            cmd += ["--rate-limit", str(args.rate_limit)]
         logger.info("ACTION START: %s", script_name)
         if unresolved_keys:
             logger.warning("Unresolved vars en payload (%s): %s", script_name, ", ".join(unresolved_keys))
@@ -177,6 +195,7 @@ def main() -> int:
             "script": script_name,
             "exit_code": proc.returncode,
             "payload": resolved_payload,
+            "matrix_csv": str(matrix_csv) if matrix_csv else None,
             "unresolved_vars": unresolved_keys,
             "action_log": str(action_log),
             "calls_total": len(calls),
@@ -108,3 +108,76 @@ def test_run_calls_logs_full_response_body_and_headers(caplog):
     assert len(done_records) == 1
     assert "response_headers={'X-Test': 'header-value'}" in done_records[0].message
     assert f"response_body={'x' * 1200}" in done_records[0].message
+
+
+def test_load_matrix_merges_base_vars_and_skips_empty_rows(tmp_path: Path):
+    csv_path = tmp_path / "matrix.csv"
+    csv_path.write_text("location_id,extension\nloc-a,5101\n,\nloc-b,\n", encoding="utf-8")
+
+    variable_sets = _shared._load_matrix(csv_path, {"extension": "9999", "queue_name": "Q"})
+
+    assert variable_sets == [
+        {"extension": "5101", "queue_name": "Q", "location_id": "loc-a"},
+        {"extension": "9999", "queue_name": "Q", "location_id": "loc-b"},
+    ]
+
+
+def test_run_action_matrix_deduplicates_shared_preflight_gets():
+    class DummyResponse:
+        status_code = 200
+        text = "{}"
+        headers: dict = {}
+
+        def json(self):
+            return {"enabled": True}
+
+    class DummyClient:
+        def __init__(self):
+            self.calls: list[tuple[str, str]] = []
+
+        def request(self, method, path, **kwargs):
+            self.calls.append((method, path))
+            return DummyResponse()
+
+    spec = _shared.ActionSpec(
+        key="action_call_profiles",
+        title="Perfiles",
+        objective="Test",
+        pre_post_notes=[],
+        probe_calls=[_shared.ApiCall(name="probe_location", method="GET", path="locations/{location_id}")],
+        apply_calls=[
+            _shared.ApiCall(name="update_person", method="PUT", path="people/{person_id}", payload={"location": "{location_id}"})
+        ],
+    )
+    variable_sets = [
+        {"location_id": "loc-a", "person_id": "p1"},
+        {"location_id": "loc-a", "person_id": "p2"},
+        {"location_id": "loc-b", "person_id": "p3"},
+        {"location_id": "loc-a"},
+    ]
+    client = DummyClient()
+    logger = logging.getLogger("test_actions_shared")
+
+    results, snapshots = _shared.run_action_matrix(client, spec, "apply", variable_sets, logger, workers=3)
+
+    gets = sorted(path for method, path in client.calls if method == "GET")
+    puts = sorted(path for method, path in client.calls if method == "PUT")
+    assert gets == ["locations/loc-a", "locations/loc-b"]
+    assert puts == ["people/p1", "people/p2", "people/p3"]
+    assert [result["failures"] for result in results] == [0, 0, 0, 1]
+    assert results[3]["missing_vars"] == ["person_id"]
+    merged = _shared._merge_snapshots(spec, snapshots)
+    assert sorted(entry["path"] for entry in merged["entries"]) == ["locations/loc-a", "locations/loc-b"]
+
+
+def test_rate_limiter_spaces_requests(monkeypatch):
+    now = [100.0]
+    sleeps: list[float] = []
+    monkeypatch.setattr(_shared.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(_shared.time, "sleep", sleeps.append)
+    limiter = _shared.RateLimiter(4)
+
+    for _ in range(3):
+        limiter.wait()
+
+    assert sleeps == [0.25, 0.5]
@@ -1,6 +1,10 @@
+import pytest
 import responses
 
-from wxc_sdk.bulk_provision.connection_client import ConnectionClient
+from wxc_sdk.bulk_provision.connection_client import CircuitOpenError, CircuitState, ConnectionClient, endpoint_key
+from wxc_sdk.bulk_provision.error_handling import ReasonCode, map_exception
+from wxc_sdk import WebexSimpleApi
+from wxc_sdk.rest import RestError, RestSession
 
 
 @responses.activate
@@ -20,3 +24,78 @@ def test_connection_client_request_success() -> None:
     )
     result = client.request("GET", "test")
     assert result.data["ok"] is True
+
+
+def _client(**kwargs) -> ConnectionClient:
+    values = dict(
+        base_url="https://webexapis.com/v1",
+        token="token",
+        timeout_seconds=5,
+        max_retries=1,
+        verify=True,
+        breaker_failure_threshold=2,
+        breaker_reset_seconds=60,
+    )
+    values.update(kwargs)
+    return ConnectionClient(**values)
+
+
+@responses.activate
+def test_circuit_opens_after_consecutive_5xx() -> None:
+    responses.add(responses.GET, "https://webexapis.com/v1/people/Y2lzY29zcGFyazovL3VzL1BFT1BMRS8x", status=503)
+    responses.add(responses.GET, "https://webexapis.com/v1/people/Y2lzY29zcGFyazovL3VzL1BFT1BMRS8y", status=503)
+    client = _client()
+    for person_id in ("Y2lzY29zcGFyazovL3VzL1BFT1BMRS8x", "Y2lzY29zcGFyazovL3VzL1BFT1BMRS8y"):
+        with pytest.raises(RestError):
+            client.request("GET", f"people/{person_id}")
+    with pytest.raises(CircuitOpenError):
+        client.request("GET", "people/Y2lzY29zcGFyazovL3VzL1BFT1BMRS8z")
+    assert len(responses.calls) == 2
+    # other endpoints are not affected
+    responses.add(responses.GET, "https://webexapis.com/v1/locations", json={"items": []}, status=200)
+    assert client.request("GET", "locations").data == {"items": []}
+    assert map_exception(CircuitOpenError("GET /people/{id}")).reason_code == ReasonCode.circuit_open
+
+
+@responses.activate
+def test_circuit_half_open_probe_closes_circuit() -> None:
+    responses.add(responses.GET, "https://webexapis.com/v1/test", status=500)
+    responses.add(responses.GET, "https://webexapis.com/v1/test", json={"ok": True}, status=200)
+    client = _client(breaker_failure_threshold=1, breaker_reset_seconds=0)
+    with pytest.raises(RestError):
+        client.request("GET", "test")
+    assert client.request("GET", "test").data["ok"] is True
+    breaker = client.session.breakers.for_endpoint("GET", "https://webexapis.com/v1/test")
+    assert breaker.state == CircuitState.closed
+
+
+def test_endpoint_key_replaces_ids() -> None:
+    assert endpoint_key("get", "https://webexapis.com/v1/people/Y2lzY29zcGFyazovL3VzL1BFT1BMRS8x?callingData=true") == (
+        "GET /v1/people/{id}"
+    )
+
+
+def test_unexpected_error_in_half_open_probe_reopens_circuit(monkeypatch) -> None:
+    client = _client(breaker_failure_threshold=1, breaker_reset_seconds=0)
+    breaker = client.session.breakers.for_endpoint("GET", "https://webexapis.com/v1/test")
+    breaker.record_failure()
+
+    def broken_request(*args, **kwargs):
+        raise ValueError("token refresh failed")
+
+    monkeypatch.setattr(RestSession, "request", broken_request)
+    with pytest.raises(ValueError):
+        client.request("GET", "test")
+    assert breaker.state == CircuitState.open
+
+
+@responses.activate
+def test_sdk_calls_on_client_session_use_retry_policy() -> None:
+    responses.add(responses.GET, "https://webexapis.com/v1/locations", status=503)
+    responses.add(responses.GET, "https://webexapis.com/v1/locations", json={"items": []}, status=200)
+    client = _client(max_retries=2)
+    client.session.retrying.wait = lambda retry_state: 0
+    api = WebexSimpleApi(tokens="token", session=client.session)
+    assert list(api.locations.list()) == []
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.req_kwargs["timeout"] == 5
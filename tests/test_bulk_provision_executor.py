@@ -0,0 +1,218 @@
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from wxc_sdk.bulk_provision.config import Config
+from wxc_sdk.bulk_provision.data_pipeline import DeviceRow, SiteBundle, UserRow
+from wxc_sdk.bulk_provision.executor import Executor, ExecutorContext
+from wxc_sdk.bulk_provision.state_store import CheckpointStore
+from wxc_sdk.bulk_provision.writers import Writers
+from wxc_sdk.devices import Device
+from wxc_sdk.locations import Location
+from wxc_sdk.people import Person
+from wxc_sdk.telephony.devices import MACValidationResponse
+
+LOCATION_PAYLOAD = {
+    "location_key": "LOC1",
+    "name": "Location One",
+    "time_zone": "UTC",
+    "preferred_language": "en_US",
+    "announcement_language": "en_US",
+    "address1": "Main St",
+    "city": "Test",
+    "state": "TS",
+    "postal_code": "12345",
+    "country": "US",
+}
+
+
+def _config(tmp_path: Path, **kwargs) -> Config:
+    values = dict(
+        environment="test",
+        webex_base_url="https://webexapis.com/v1",
+        webex_token="token",
+        input_dir=tmp_path,
+        output_dir=tmp_path,
+        org_id=None,
+        pipeline_version="1",
+        batch_size_users=10,
+        max_rows_users=100,
+        request_timeout_seconds=5,
+        max_retries=1,
+        enable_safe_compensation=False,
+        log_level="INFO",
+        http_proxy=None,
+        https_proxy=None,
+        no_proxy=None,
+        ssl_verify=True,
+        requests_ca_bundle=None,
+    )
+    values.update(kwargs)
+    return Config(**values)
+
+
+def _context(tmp_path: Path, config: Config, api: MagicMock) -> ExecutorContext:
+    return ExecutorContext(
+        config=config,
+        api=api,
+        site_bundle=SiteBundle(
+            payload={"profiles": {"licenses": {"LIC_CALLING_PRO": ["lic1"]}}},
+            input_hash="hash",
+            locations={"LOC1": LOCATION_PAYLOAD},
+        ),
+        writers=Writers(
+            results_path=tmp_path / "results.csv",
+            pending_path=tmp_path / "pending.csv",
+            rejected_path=tmp_path / "rejected.csv",
+            plan_path=tmp_path / "plan.csv",
+        ),
+        checkpoint=CheckpointStore(tmp_path / "checkpoint.json"),
+        run_dir=tmp_path,
+        location_cache={},
+    )
+
+
+def _remote_person(**kwargs) -> Person:
+    values = dict(
+        person_id="p1",
+        emails=["ana@example.com"],
+        display_name="Ana",
+        location_id="loc1",
+        licenses=["lic1"],
+    )
+    values.update(kwargs)
+    return Person(**values)
+
+
+def test_unchanged_user_is_not_updated(tmp_path: Path) -> None:
+    api = MagicMock()
+    api.locations.list.return_value = [Location(location_id="loc1", name="Location One")]
+    api.people.list.return_value = [
+        _remote_person(display_name="Ana", emails=["ana@example.com"])]
+    config = _config(tmp_path)
+    context = _context(tmp_path, config, api)
+    row = UserRow(row_id=2, entity_key="ana@example.com", location_key="LOC1",
+                  data={"licenses": "LIC_CALLING_PRO"})
+    Executor(config)._process_user_row(context, 1, row)
+    api.people.update.assert_not_called()
+    api.people.create.assert_not_called()
+    assert "noop" in (tmp_path / "plan.csv").read_text()
+    assert "unchanged" in (tmp_path / "results.csv").read_text()
+
+
+def test_plan_only_does_not_write(tmp_path: Path) -> None:
+    api = MagicMock()
+    api.locations.list.return_value = [Location(location_id="loc1", name="Location One")]
+    api.people.list.return_value = []
+    config = _config(tmp_path, plan_only=True)
+    context = _context(tmp_path, config, api)
+    row = UserRow(row_id=2, entity_key="ana@example.com", location_key="LOC1", data={})
+    Executor(config)._process_user_row(context, 1, row)
+    api.people.create.assert_not_called()
+    assert "create" in (tmp_path / "plan.csv").read_text()
+    assert not (tmp_path / "results.csv").exists()
+
+
+def _device_row(row_id: int, owner_key: str, mac: str, action: str = "create") -> DeviceRow:
+    return DeviceRow(
+        row_id=row_id,
+        entity_key=f"MPP:{owner_key}",
+        location_key="LOC1",
+        data={"device_type": "MPP", "owner_key": owner_key, "model": "DMS Cisco 8845", "action": action,
+              "mac": mac},
+    )
+
+
+def test_devices_validated_in_bulk_and_changes_applied_once(tmp_path: Path) -> None:
+    api = MagicMock()
+    api.telephony.devices.validate_macs.return_value = MACValidationResponse.model_validate(
+        {
+            "status": "ERRORS",
+            "macStatus": [
+                {"mac": "AABBCCDDEE01", "state": "AVAILABLE"},
+                {"mac": "AABBCCDDEE02", "state": "UNAVAILABLE", "message": "in use"},
+            ],
+        }
+    )
+    api.devices.create_by_mac_address.return_value = Device.model_construct(device_id="d1", calling_device_id=None)
+    config = _config(tmp_path)
+    context = _context(tmp_path, config, api)
+    context.person_index["ana@example.com"] = "p1"
+    rows = [
+        _device_row(2, "ana@example.com", "aa:bb:cc:dd:ee:01"),
+        _device_row(3, "ana@example.com", "aa:bb:cc:dd:ee:02"),
+        _device_row(4, "ana@example.com", "aa:bb:cc:dd:ee:03", action="delete"),
+    ]
+    Executor(config)._process_devices(context, rows)
+    api.telephony.devices.validate_macs.assert_called_once_with(
+        macs=["AABBCCDDEE01", "AABBCCDDEE02"], org_id=None
+    )
+    api.devices.create_by_mac_address.assert_called_once_with(
+        mac="AABBCCDDEE01", model="DMS Cisco 8845", org_id=None, person_id="p1"
+    )
+    api.people.list.assert_not_called()
+    api.telephony.devices.apply_changes.assert_called_once_with(device_id="d1", org_id=None)
+    pending = (tmp_path / "pending.csv").read_text()
+    assert "in use" in pending
+    assert "out_of_scope" in pending
+
+
+def test_device_owner_falls_back_to_workspace_lookup(tmp_path: Path) -> None:
+    api = MagicMock()
+    api.telephony.devices.validate_macs.return_value = MACValidationResponse.model_validate(
+        {"status": "OK", "macStatus": [{"mac": "AABBCCDDEE01", "state": "AVAILABLE"}]}
+    )
+    api.workspaces.list.return_value = []
+    config = _config(tmp_path)
+    context = _context(tmp_path, config, api)
+    Executor(config)._process_devices(context, [_device_row(2, "Lobby", "AABBCCDDEE01")])
+    api.devices.create_by_mac_address.assert_not_called()
+    assert "Unknown owner_key Lobby" in (tmp_path / "pending.csv").read_text()
+
+
+def test_location_update_does_not_send_nulls_for_missing_fields(tmp_path: Path) -> None:
+    api = MagicMock()
+    api.locations.list.return_value = [Location(location_id="loc1", name="Location One", time_zone="Europe/Madrid")]
+    config = _config(tmp_path)
+    context = _context(tmp_path, config, api)
+    Executor(config)._process_locations(context)
+    api.locations.update.assert_called_once()
+    body = api.locations.update.call_args.kwargs["settings"].update()
+    assert body["timeZone"] == "UTC"
+    assert None not in body.values()
+    assert None not in body["address"].values()
+    for missing in ("notes", "latitude", "longitude", "address2"):
+        assert missing not in body and missing not in body["address"]
+
+
+def test_device_checkpoint_only_covers_contiguous_finished_rows(tmp_path: Path) -> None:
+    api = MagicMock()
+    macs = [f"AABBCCDDEE0{index}" for index in range(1, 4)]
+    api.telephony.devices.validate_macs.return_value = MACValidationResponse.model_validate(
+        {"status": "OK", "macStatus": [{"mac": mac, "state": "AVAILABLE"} for mac in macs]}
+    )
+    first_started = threading.Event()
+    release_first = threading.Event()
+    checkpoints: list[int] = []
+
+    def create_by_mac_address(*, mac, **kwargs):
+        if mac == macs[0]:
+            first_started.set()
+            release_first.wait(5)
+        else:
+            first_started.wait(5)
+        return Device.model_construct(device_id=f"d-{mac}", calling_device_id=None)
+
+    api.devices.create_by_mac_address.side_effect = create_by_mac_address
+    config = _config(tmp_path, device_concurrency=3)
+    context = _context(tmp_path, config, api)
+    context.person_index["ana@example.com"] = "p1"
+    executor = Executor(config)
+
+    executor._write_checkpoint = lambda context, phase, last_item_id: checkpoints.append(last_item_id)
+    # the first row only finishes after the other two
+    threading.Timer(0.2, release_first.set).start()
+    executor._process_devices(context, [_device_row(row_id, "ana@example.com", mac)
+                                        for row_id, mac in zip((2, 3, 4), macs)])
+    # row 2 finished last: nothing is checkpointed before it, then the whole prefix at once
+    assert checkpoints == [4]
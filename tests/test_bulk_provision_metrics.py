@@ -0,0 +1,57 @@
+import json
+from pathlib import Path
+
+from wxc_sdk.bulk_provision.data_pipeline import stream_pipeline
+from wxc_sdk.bulk_provision.metrics import RunMetrics
+
+
+def test_metrics_snapshot() -> None:
+    metrics = RunMetrics()
+    metrics.set_total("user", 10)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.record_step("user", "lookup", seconds)
+    metrics.on_response(None, 0)
+    metrics.on_response(None, 0)
+    metrics.record_rows("user", 2)
+    snapshot = metrics.snapshot()
+    assert snapshot["rows_done"] == 2
+    assert snapshot["api_calls_per_row"] == 1.0
+    assert snapshot["entities"]["user"] == {"rows_done": 2, "rows_rejected": 0, "rows_total": 10}
+    assert snapshot["steps"]["user.lookup"]["count"] == 4
+    assert snapshot["steps"]["user.lookup"]["p95_ms"] == 400.0
+    assert snapshot["eta_seconds"] is not None
+
+
+def test_rejected_rows_complete_the_eta() -> None:
+    metrics = RunMetrics()
+    metrics.set_total("user", 5)
+    metrics.record_rows("user", 3)
+    assert metrics.eta_seconds() > 0
+    metrics.record_rejected("user", 2)
+    snapshot = metrics.snapshot()
+    assert snapshot["eta_seconds"] == 0
+    assert snapshot["rows_done"] == 3
+    assert snapshot["entities"]["user"] == {"rows_done": 3, "rows_rejected": 2, "rows_total": 5}
+
+
+def test_metrics_written_periodically(tmp_path: Path) -> None:
+    metrics = RunMetrics(path=tmp_path / "metrics.json", interval_seconds=0)
+    with metrics.timed("device", "create"):
+        pass
+    metrics.record_rows("device")
+    payload = json.loads((tmp_path / "metrics.json").read_text())
+    assert payload["rows_done"] == 1
+    assert "device.create" in payload["steps"]
+
+
+def test_row_estimates_from_bundle_hash(tmp_path: Path) -> None:
+    (tmp_path / "site.json").write_text(json.dumps({"locations": []}))
+    header = (
+        "email,location_key,licenses,extension,phone_number_primary,phone_number_secondary,"
+        "permissions_out_profile,caller_id_profile,recording_profile,forwarding_legacy_mode,"
+        "forwarding_legacy_destination,groups_access,groups_features,feature_access_profile,"
+        "monitoring_targets,monitoring_barge,exec_assistant_role,executive_for,assistants_for\n"
+    )
+    rows = "\n".join(f"user{i}@example.com,LOC1" + "," * 17 for i in range(3))
+    (tmp_path / "users.csv").write_text(header + rows)
+    assert stream_pipeline(tmp_path).row_estimates == {"user": 3}
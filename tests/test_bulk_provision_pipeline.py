@@ -1,9 +1,11 @@
+import hashlib
 import json
 from pathlib import Path
 
 import pytest
 
-from wxc_sdk.bulk_provision.data_pipeline import build_pipeline
+from wxc_sdk.bulk_provision.data_pipeline import build_pipeline, stream_pipeline
+from wxc_sdk.bulk_provision.error_handling import ReasonCode
 
 
 def _write_site(tmp_path: Path) -> None:
@@ -73,3 +75,39 @@ def test_pipeline_missing_users_csv(tmp_path: Path) -> None:
     _write_site(tmp_path)
     with pytest.raises(AssertionError):
         build_pipeline(tmp_path)
+
+
+def test_stream_pipeline_is_lazy(tmp_path: Path) -> None:
+    _write_site(tmp_path)
+    _write_users(
+        tmp_path,
+        [
+            ["ana@example.com", "LOC1", "LIC_CALLING_PRO"] + [""] * 16,
+            ["", "LOC1", ""] + [""] * 16,
+            ["ana@example.com", "LOC1", "LIC_CALLING_PRO"] + [""] * 16,
+            ["bob@example.com", "LOC1", "LIC_CALLING_PRO"] + [""] * 16,
+        ],
+    )
+    stream = stream_pipeline(tmp_path)
+    rejected = []
+    users = stream.users(rejected.append)
+    first = next(users)
+    assert first.entity_key == "ana@example.com"
+    assert rejected == []
+    assert [row.entity_key for row in users] == ["bob@example.com"]
+    assert [row.reason_code for row in rejected] == [ReasonCode.invalid_input_schema, ReasonCode.duplicate_key]
+    assert list(stream.workspaces(rejected.append)) == []
+
+
+def test_stream_pipeline_checks_header_upfront(tmp_path: Path) -> None:
+    _write_site(tmp_path)
+    (tmp_path / "users.csv").write_text("email,location_key\nana@example.com,LOC1\n")
+    with pytest.raises(AssertionError):
+        stream_pipeline(tmp_path)
+
+
+def test_stream_pipeline_bundle_hash(tmp_path: Path) -> None:
+    _write_site(tmp_path)
+    _write_users(tmp_path, [["ana@example.com", "LOC1", "LIC_CALLING_PRO"] + [""] * 16])
+    expected = hashlib.sha256((tmp_path / "users.csv").read_bytes() + (tmp_path / "site.json").read_bytes())
+    assert stream_pipeline(tmp_path).site_bundle.input_hash == expected.hexdigest()
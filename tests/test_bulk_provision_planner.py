@@ -0,0 +1,83 @@
+from wxc_sdk.bulk_provision.action_helpers import build_location, build_person, person_for_create
+from wxc_sdk.bulk_provision.planner import PlanAction, changed_fields, merge_update, plan_entity
+from wxc_sdk.locations import Location
+from wxc_sdk.people import Person
+
+LOCATION_PAYLOAD = {
+    "location_key": "LOC1",
+    "name": "Location One",
+    "time_zone": "UTC",
+    "preferred_language": "en_US",
+    "announcement_language": "en_US",
+    "address1": "Main St",
+    "city": "Test",
+    "state": "TS",
+    "postal_code": "12345",
+    "country": "US",
+}
+
+
+def _remote_person(**kwargs) -> Person:
+    values = dict(
+        person_id="p1",
+        emails=["ana@example.com"],
+        display_name="Ana",
+        location_id="loc1",
+        licenses=["lic1"],
+        nick_name="ana",
+    )
+    values.update(kwargs)
+    return Person(**values)
+
+
+def test_plan_create_without_remote() -> None:
+    desired = build_person(email="ana@example.com", location_id="loc1", licenses=["lic1"])
+    decision = plan_entity(entity_type="user", entity_key="ana@example.com", desired=desired, remote=None,
+                           remote_id=None)
+    assert decision.action == PlanAction.create
+
+
+def test_plan_noop_ignores_unmanaged_fields_and_order() -> None:
+    desired = build_person(email="ana@example.com", location_id="loc1", licenses=["lic2", "lic1"])
+    remote = _remote_person(licenses=["lic1", "lic2"])
+    assert changed_fields(desired, remote) == ()
+
+
+def test_plan_update_lists_changed_fields() -> None:
+    desired = build_person(email="ana@example.com", location_id="loc2", licenses=["lic1"])
+    decision = plan_entity(entity_type="user", entity_key="ana@example.com", desired=desired,
+                           remote=_remote_person(), remote_id="p1")
+    assert decision.action == PlanAction.update
+    assert decision.changed_fields == ("location_id",)
+
+
+def test_plan_location_compares_nested_address() -> None:
+    desired = build_location(LOCATION_PAYLOAD)
+    remote = Location.model_validate(desired.model_dump(mode="json", by_alias=True) | {"id": "loc1"})
+    assert changed_fields(desired, remote) == ()
+    remote.address.city = "Other"
+    assert changed_fields(desired, remote) == ("address",)
+
+
+def test_merge_update_keeps_remote_details() -> None:
+    desired = build_person(email="ana@example.com", location_id="loc2", licenses=["lic1"])
+    merged = merge_update(_remote_person(), desired)
+    assert merged.person_id == "p1"
+    assert merged.nick_name == "ana"
+    assert merged.location_id == "loc2"
+
+
+def test_plan_keeps_remote_licenses_and_name_when_csv_has_no_profile() -> None:
+    desired = build_person(email="ana.g@example.com", location_id="loc1", licenses=[])
+    remote = _remote_person(emails=["ana.g@example.com"], display_name="Ana García", licenses=["lic1", "lic2"])
+    assert changed_fields(desired, remote) == ()
+    merged = merge_update(remote, desired.model_copy(update={"location_id": "loc2"}))
+    assert merged.display_name == "Ana García"
+    assert merged.licenses == ["lic1", "lic2"]
+    assert merged.location_id == "loc2"
+
+
+def test_person_for_create_defaults_display_name_from_email() -> None:
+    desired = build_person(email="ana.g@example.com", location_id="loc1")
+    assert desired.display_name is None
+    assert person_for_create(desired).display_name == "Ana G"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+from Space_OdT.config import Settings
+from Space_OdT.export_runner import run_exports
+from Space_OdT.io.checkpoints import CheckpointStore
+
+
+class _FakeError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f'error {code}')
+        self.code = code
+
+
+def test_partial_checkpoint_round_trip_and_fingerprint_mismatch(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path)
+    partial = store.open_partial('artifact-x', 'fp1', keep=False)
+    partial.add('k1', [{'id': 1}])
+    partial.flush()
+
+    assert store.load_partial('artifact-x', 'fp1') == {'k1': [{'id': 1}]}
+    assert store.load_partial('artifact-x', 'fp2') == {}
+
+    store.open_partial('artifact-x', 'fp2', keep=True)
+    assert store.load_partial('artifact-x', 'fp1') == {}
+
+
+def test_save_done_replaces_partial(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path)
+    store.open_partial('artifact-x', 'fp', keep=False).flush()
+
+    store.save_done('artifact-x', 'fp', method='a.b', count=1, elapsed_ms=3)
+
+    assert store.load_done('artifact-x', 'fp')['count'] == 1
+    assert store.load_done('artifact-x', 'other') is None
+    assert store.load_partial('artifact-x', 'fp') == {}
+
+
+def test_checkpoint_logs_keep_offsets_and_read_rows_on_lookup(tmp_path: Path) -> None:
+    store = CheckpointStore(tmp_path)
+    partial = store.open_partial('artifact-x', 'fp', keep=False)
+    partial.add('k1', [{'id': 1}], 's1')
+    partial.add('k2', [{'id': 2, 'name': 'Ñandú'}], 's2')
+    partial.flush()
+    with partial.path.open('a', encoding='utf-8') as f:
+        f.write('{"key": "torn"')
+
+    loaded = store.load_partial('artifact-x', 'fp')
+
+    assert sorted(loaded) == ['k1', 'k2']
+    assert all(isinstance(offset, int) for offset in loaded._offsets.values())
+    assert loaded['k2'] == [{'id': 2, 'name': 'Ñandú'}]
+    assert loaded.get('missing') is None
+
+    store.save_done('artifact-x', 'fp', method='a.b', count=2, elapsed_ms=1)
+    assert list(store.iter_calls('artifact-x')) == [('k1', 's1', [{'id': 1}]),
+                                                    ('k2', 's2', [{'id': 2, 'name': 'Ñandú'}])]
+
+
+def _api(calls: list[str], fail_on: set[str]):
+    def people_list(**kwargs):
+        calls.append('people.list')
+        return [{'id': 'p1', 'callingData': {'locationId': 'l1'}}, {'id': 'p2', 'callingData': {'locationId': 'l1'}}]
+
+    def numbers_read(*, person_id: str):
+        calls.append(person_id)
+        if person_id in fail_on:
+            raise _FakeError(500)
+        return [{'id': f'n-{person_id}', 'directNumber': '+34'}]
+
+    return SimpleNamespace(
+        people=SimpleNamespace(list=people_list, details=lambda **kwargs: {'id': 'p1'}),
+        person_settings=SimpleNamespace(numbers=SimpleNamespace(read=numbers_read)),
+    )
+
+
+def test_resume_completes_partial_fan_out_and_skips_finished_steps(tmp_path: Path) -> None:
+    settings = Settings(out_dir=tmp_path, enabled_modules=['people', 'person_numbers'], write_report=False)
+    calls: list[str] = []
+
+    first = run_exports(_api(calls, fail_on={'p2'}), settings)
+
+    assert first['module_counts']['person_numbers'] == 0
+    assert calls == ['people.list', 'p1', 'p2']
+
+    calls.clear()
+    second = run_exports(_api(calls, fail_on=set()), replace(settings, resume=True))
+
+    assert calls == ['p2']
+    assert second['module_counts'] == {'people': 2, 'person_numbers': 2, 'licenses_no_pstn': 0,
+                                       'v1_requirements_status': 20}
+
+    calls.clear()
+    run_exports(_api(calls, fail_on=set()), replace(settings, resume=True, refresh_modules=('people',)))
+
+    # people is fetched again, but its rows are unchanged so person_numbers is reused
+    assert calls == ['people.list']
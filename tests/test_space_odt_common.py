@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from Space_OdT.modules import common
+from Space_OdT.modules.common import accepted_kwargs, bind_call, call_with_supported_kwargs
+
+
+class _Numbers:
+    def read(self, person_id: str, org_id: str | None = None):
+        return person_id, org_id
+
+
+def test_bound_call_drops_unsupported_and_none_kwargs() -> None:
+    api = SimpleNamespace(person_settings=SimpleNamespace(numbers=_Numbers()))
+
+    call = bind_call(api, 'person_settings.numbers.read')
+
+    assert call.accepted == frozenset({'person_id', 'org_id'})
+    assert call(person_id='p1', org_id=None, location_id='l1') == ('p1', None)
+    assert call_with_supported_kwargs(api.person_settings.numbers.read, person_id='p2', x=1) == ('p2', None)
+
+
+def test_signature_is_introspected_once_per_function(monkeypatch) -> None:
+    calls = []
+    signature = common.inspect.signature
+
+    def counting_signature(fn):
+        calls.append(fn)
+        return signature(fn)
+
+    common._parameter_names.cache_clear()
+    monkeypatch.setattr(common.inspect, 'signature', counting_signature)
+
+    for _ in range(3):
+        # a new instance every time: bound methods share the cache entry of the underlying function
+        assert accepted_kwargs(_Numbers().read) == frozenset({'person_id', 'org_id'})
+
+    assert calls == [_Numbers.read]
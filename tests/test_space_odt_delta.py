@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from dataclasses import replace
+from pathlib import Path
+from types import SimpleNamespace
+
+from Space_OdT.config import Settings
+from Space_OdT.delta import diff_module
+from Space_OdT.export_runner import run_exports
+
+
+def _read(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_diff_module_reports_added_removed_and_changed_rows(tmp_path: Path) -> None:
+    previous = tmp_path / 'people.ndjson'
+    previous.write_text('\n'.join(json.dumps(row) for row in [
+        {'person_id': 'p1', 'display_name': 'Ana', 'source_method': 'old'},
+        {'person_id': 'p2', 'display_name': 'Luis'},
+        {'person_id': 'p3', 'display_name': 'Eva'},
+    ]) + '\n', encoding='utf-8')
+    current = [
+        {'person_id': 'p1', 'display_name': 'Ana', 'source_method': 'new'},
+        {'person_id': 'p2', 'display_name': 'Luisa'},
+        {'person_id': 'p4', 'display_name': 'Marta'},
+    ]
+
+    counts = diff_module('people', previous, current, ['person_id', 'display_name'], tmp_path)
+
+    assert counts == {'added': 1, 'removed': 1, 'changed': 1, 'unchanged': 1}
+    assert _read(tmp_path / 'people.added.ndjson') == [current[2]]
+    assert _read(tmp_path / 'people.removed.ndjson') == [{'person_id': 'p3', 'display_name': 'Eva'}]
+    assert _read(tmp_path / 'people.changed.ndjson')[0]['changed_fields'] == 'display_name'
+
+
+def _api(calls: list[str], people: list[dict]):
+    def people_list(**kwargs):
+        calls.append('people.list')
+        return people
+
+    def numbers_read(*, person_id: str):
+        calls.append(person_id)
+        return [{'id': f'n-{person_id}', 'directNumber': '+34'}]
+
+    for person in people:
+        person['callingData'] = {'locationId': 'l1'}
+    return SimpleNamespace(
+        people=SimpleNamespace(list=people_list, details=lambda **kwargs: {}),
+        person_settings=SimpleNamespace(numbers=SimpleNamespace(read=numbers_read)),
+    )
+
+
+def test_delta_run_only_refetches_changed_entities(tmp_path: Path) -> None:
+    settings = Settings(out_dir=tmp_path, enabled_modules=['people', 'person_numbers'], write_report=False,
+                        delta=True)
+    people = [{'id': 'p1', 'displayName': 'Ana'}, {'id': 'p2', 'displayName': 'Luis'}]
+    calls: list[str] = []
+
+    first = run_exports(_api(calls, people), settings)
+
+    assert first['delta'] is None
+    assert calls == ['people.list', 'p1', 'p2']
+
+    calls.clear()
+    changed = [{'id': 'p1', 'displayName': 'Ana'}, {'id': 'p2', 'displayName': 'Luisa'},
+               {'id': 'p3', 'displayName': 'Eva'}]
+    second = run_exports(_api(calls, changed), replace(settings, write_report=True))
+
+    assert calls == ['people.list', 'p2', 'p3']
+    assert second['module_counts']['person_numbers'] == 3
+    assert second['delta']['people'] == {'added': 1, 'removed': 0, 'changed': 1, 'unchanged': 1}
+    assert second['delta']['person_numbers']['added'] == 1
+    summary = json.loads((tmp_path / 'delta' / 'summary.json').read_text(encoding='utf-8'))
+    assert summary == second['delta']
+    assert 'Changes since previous run' in Path(second['report_path']).read_text(encoding='utf-8')
+
+
+def test_diff_module_keys_people_by_person_id_not_location(tmp_path: Path) -> None:
+    previous = tmp_path / 'people.ndjson'
+    previous.write_text('\n'.join(json.dumps(row) for row in [
+        {'person_id': 'p1', 'location_id': 'l1', 'display_name': 'Ana'},
+        {'person_id': 'p2', 'location_id': 'l1', 'display_name': 'Luis'},
+    ]) + '\n', encoding='utf-8')
+    current = [
+        {'person_id': 'p1', 'location_id': 'l2', 'display_name': 'Ana'},
+        {'person_id': 'p2', 'location_id': 'l1', 'display_name': 'Luis'},
+    ]
+
+    counts = diff_module('people', previous, current, ['person_id', 'location_id', 'display_name'], tmp_path)
+
+    assert counts == {'added': 0, 'removed': 0, 'changed': 1, 'unchanged': 1}
+    assert _read(tmp_path / 'people.changed.ndjson')[0]['changed_fields'] == 'location_id'
+
+
+def test_diff_module_keys_location_children_by_their_own_id(tmp_path: Path) -> None:
+    previous = tmp_path / 'auto_attendants.ndjson'
+    previous.write_text('\n'.join(json.dumps(row) for row in [
+        {'id': 'aa1', 'location_id': 'l1', 'name': 'Main'},
+        {'id': 'aa2', 'location_id': 'l1', 'name': 'Night'},
+    ]) + '\n', encoding='utf-8')
+    current = [{'id': 'aa2', 'location_id': 'l1', 'name': 'Night'}]
+
+    counts = diff_module('auto_attendants', previous, current, ['location_id', 'id', 'name'], tmp_path)
+
+    assert counts == {'added': 0, 'removed': 1, 'changed': 0, 'unchanged': 1}
+    assert _read(tmp_path / 'auto_attendants.removed.ndjson') == [{'id': 'aa1', 'location_id': 'l1', 'name': 'Main'}]
+
+
+def test_diff_module_keys_memberships_by_parent_and_member(tmp_path: Path) -> None:
+    previous = tmp_path / 'group_members.ndjson'
+    previous.write_text('\n'.join(json.dumps(row) for row in [
+        {'group_id': 'g1', 'member_id': 'm1', 'person_id': 'm1'},
+        {'group_id': 'g2', 'member_id': 'm1', 'person_id': 'm1'},
+    ]) + '\n', encoding='utf-8')
+    current = [{'group_id': 'g2', 'member_id': 'm1', 'person_id': 'm1'}]
+
+    counts = diff_module('group_members', previous, current, ['group_id', 'member_id', 'person_id'], tmp_path)
+
+    assert counts == {'added': 0, 'removed': 1, 'changed': 0, 'unchanged': 1}
+    assert _read(tmp_path / 'group_members.removed.ndjson') == [{'group_id': 'g1', 'member_id': 'm1', 'person_id': 'm1'}]
+
+
+def test_diff_module_keys_rows_without_key_value_by_content(tmp_path: Path) -> None:
+    previous = tmp_path / 'person_available_numbers_secondary.ndjson'
+    previous.write_text('\n'.join(json.dumps(row) for row in [
+        {'person_id': None, 'direct_number': None, 'name': 'a'},
+        {'person_id': None, 'direct_number': None, 'name': 'b'},
+    ]) + '\n', encoding='utf-8')
+    current = [{'person_id': None, 'direct_number': None, 'name': 'b'}]
+
+    counts = diff_module('person_available_numbers_secondary', previous, current,
+                         ['person_id', 'direct_number', 'name'], tmp_path)
+
+    assert counts == {'added': 0, 'removed': 1, 'changed': 0, 'unchanged': 1}
+    assert _read(tmp_path / 'person_available_numbers_secondary.removed.ndjson')[0]['name'] == 'a'
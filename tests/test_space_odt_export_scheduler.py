@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+from Space_OdT.config import Settings
+from Space_OdT.export_runner import ExportNode, build_export_plan, compile_export_plan, run_dag, run_exports
+
+
+def _plan_by_key(settings: Settings) -> dict[str, ExportNode]:
+    return {node.key: node for node in build_export_plan(settings)}
+
+
+def test_plan_links_artifacts_to_their_param_sources() -> None:
+    plan = _plan_by_key(Settings())
+
+    assert plan['module:people'].depends_on == ()
+    assert plan['artifact:person_numbers'].depends_on == ('module:people',)
+    assert plan['artifact:calling_locations'].depends_on == ()
+    assert plan['artifact:call_queue_details'].depends_on == ('artifact:call_queues',)
+
+
+def test_plan_orders_rewrites_of_the_same_module_after_previous_readers() -> None:
+    plan = _plan_by_key(Settings(enabled_modules=['call_queues', 'call_queue_details']))
+
+    assert plan['artifact:call_queues'].depends_on == ('module:call_queues',)
+    assert plan['artifact:call_queue_details'].depends_on == ('artifact:call_queues',)
+
+
+def test_plan_skips_disabled_modules() -> None:
+    plan = _plan_by_key(Settings(enabled_modules=['people_details']))
+
+    assert list(plan) == ['artifact:people_details']
+    assert plan['artifact:people_details'].depends_on == ()
+
+
+def test_run_dag_starts_nodes_once_dependencies_finish_and_runs_siblings_concurrently() -> None:
+    nodes = [
+        ExportNode('a', 'a', 'm', 'module', None),
+        ExportNode('b', 'b', 'm', 'module', None),
+        ExportNode('c', 'c', 'm', 'artifact', None, ('a',)),
+    ]
+    finished: list[str] = []
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def run_node(node: ExportNode) -> str:
+        nonlocal active, peak
+        with lock:
+            if node.key == 'c':
+                assert 'a' in finished
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+            finished.append(node.key)
+        return node.key.upper()
+
+    results = run_dag(nodes, run_node, max_workers=4)
+
+    assert results == {'a': 'A', 'b': 'B', 'c': 'C'}
+    assert peak == 2
+    assert finished.index('a') < finished.index('c')
+
+
+def test_compiled_plan_binds_methods_once_and_records_timings(tmp_path) -> None:
+    def groups_list(**kwargs):
+        return [{'id': 'g1', 'displayName': 'G'}]
+
+    api = SimpleNamespace(groups=SimpleNamespace(list=groups_list, details=lambda **kwargs: {}))
+    settings = Settings(out_dir=tmp_path, enabled_modules=['groups'], write_report=False)
+    plan = compile_export_plan(api, settings)
+
+    assert [(step['key'], step['accepted_kwargs']) for step in plan.describe()] == [('module:groups', ['kwargs'])]
+
+    # runs call the method bound at compile time instead of resolving the path again
+    api.groups.list = lambda **kwargs: []
+    first = run_exports(api, settings, plan)
+    second = run_exports(api, settings, plan)
+
+    assert first['module_counts']['groups'] == second['module_counts']['groups'] == 1
+    assert plan.describe()[0]['elapsed_ms'] is not None
+
+
+def test_concurrent_artifact_nodes_share_one_async_session(tmp_path, monkeypatch) -> None:
+    import wxc_sdk.as_api
+
+    sessions: list[SimpleNamespace] = []
+    calls: list[tuple[str, str]] = []
+
+    class FakeAsApi:
+        def __init__(self, *, tokens: str, concurrent_requests: int):
+            self.session = SimpleNamespace(register_response_callback=lambda callback: 'id', closed=False)
+            sessions.append(self.session)
+
+            async def numbers_read(*, person_id: str):
+                calls.append(('numbers', person_id))
+                return [{'id': f'n-{person_id}'}]
+
+            async def permissions_in_read(*, entity_id: str):
+                calls.append(('permissions_in', entity_id))
+                return {'id': entity_id}
+
+            self.person_settings = SimpleNamespace(numbers=SimpleNamespace(read=numbers_read),
+                                                   permissions_in=SimpleNamespace(read=permissions_in_read))
+
+        async def close(self) -> None:
+            self.session.closed = True
+
+    monkeypatch.setattr(wxc_sdk.as_api, 'AsWebexSimpleApi', FakeAsApi)
+    people = [{'id': f'p{i}', 'callingData': {'locationId': 'l1'}} for i in range(3)]
+    api = SimpleNamespace(access_token='tkn', people=SimpleNamespace(list=lambda **kwargs: people,
+                                                                      details=lambda **kwargs: {}))
+    settings = Settings(out_dir=tmp_path, enabled_modules=['people', 'person_numbers', 'person_permissions_in'],
+                        write_report=False, artifact_concurrency=2, max_parallel_exports=4)
+
+    result = run_exports(api, settings)
+
+    assert len(sessions) == 1 and sessions[0].closed
+    assert sorted(calls) == sorted([(kind, f'p{i}') for kind in ('numbers', 'permissions_in') for i in range(3)])
+    assert result['module_counts']['person_numbers'] == 3
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from Space_OdT.io.row_store import RowStore
+
+
+def _store(tmp_path: Path, **kwargs) -> RowStore:
+    return RowStore(tmp_path, columns_for=lambda name: ['id', 'name'], **kwargs)
+
+
+def test_writer_streams_ndjson_csv_and_json_with_legacy_layout(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    rows = [{'id': 'a', 'name': 'Ñu', 'extra': [1, 2]}, {'id': 'b', 'name': 'line\u2028sep'}]
+
+    with store.writer('things') as writer:
+        writer.write(rows[:1])
+        writer.write(rows[1:])
+
+    assert (tmp_path / 'things.json').read_text(encoding='utf-8') == json.dumps(rows, indent=2, ensure_ascii=False)
+    assert (tmp_path / 'things.csv').read_text(encoding='utf-8').splitlines()[0] == 'id,name'
+    assert list(store['things']) == rows
+    assert len(store['things']) == 2
+
+
+def test_failed_writer_keeps_previous_version(tmp_path: Path) -> None:
+    store = _store(tmp_path)
+    store['things'] = [{'id': 'old'}]
+
+    with pytest.raises(RuntimeError):
+        with store.writer('things') as writer:
+            writer.write([{'id': 'new'}])
+            raise RuntimeError('boom')
+
+    assert list(store['things']) == [{'id': 'old'}]
+    assert not list(tmp_path.glob('.*.tmp'))
+
+
+def test_indexed_modules_are_read_from_compact_index(tmp_path: Path) -> None:
+    store = _store(tmp_path, indexed_modules=['people'])
+    store['people'] = [{'person_id': 'p1', 'raw_json': '{"big": true}', 'raw_keys': 'big'}]
+
+    assert list(store['people']) == [{'person_id': 'p1'}]
+    assert list(store.full_rows('people'))[0]['raw_json'] == '{"big": true}'
+    # assignment only updates the store, not the export files
+    assert not (tmp_path / 'people.json').exists()
+
+
+def test_adopt_requires_all_files_and_matching_count(tmp_path: Path) -> None:
+    _store(tmp_path)['x'] = [{'id': 1}]
+    with _store(tmp_path).writer('y') as writer:
+        writer.write([{'id': 1}])
+
+    store = _store(tmp_path)
+    assert not store.adopt('x', 1)
+    assert not store.adopt('y', 2)
+    assert store.adopt('y', 1)
+    assert list(store) == ['y']
+
+
+def test_unknown_export_format_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        _store(tmp_path, formats=('xml',))
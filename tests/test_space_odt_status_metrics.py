@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from Space_OdT.config import Settings
+from Space_OdT.export_runner import run_exports
+from Space_OdT.modules.catalog import ModuleSpec, run_spec
+from Space_OdT.modules.v1_manifest import ArtifactSpec, ParamSource, run_artifact
+from Space_OdT.status import CallMetrics, collect_metrics
+
+
+def test_call_metrics_summary() -> None:
+    metrics = CallMetrics()
+    for elapsed in (10, 20, 30, 40):
+        metrics.add_call(elapsed)
+    metrics.add_response(429, 0)
+    metrics.add_response(200, 100)
+
+    summary = metrics.summary(elapsed_ms=2000, count=2)
+
+    assert summary == {'calls': 4, 'requests': 2, 'bytes': 100, 'throttled': 1, 'p50_ms': 30, 'p95_ms': 40,
+                       'calls_per_sec': 2.0, 'calls_per_row': 2.0}
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.callbacks = {}
+
+    def register_response_callback(self, callback) -> str:
+        self.callbacks['id'] = callback
+        return 'id'
+
+    def unregister_response_callback(self, callback_id: str) -> None:
+        self.callbacks.pop(callback_id)
+
+    def respond(self, status: int, body: bytes) -> None:
+        response = SimpleNamespace(status_code=status, headers={}, content=body)
+        for callback in self.callbacks.values():
+            callback(response, 0)
+
+
+def test_status_and_report_carry_per_step_metrics(tmp_path: Path) -> None:
+    session = _Session()
+
+    def people_list(**kwargs):
+        session.respond(429, b'')
+        session.respond(200, b'{"items": []}')
+        return [{'id': 'p1', 'callingData': {'locationId': 'l1'}}, {'id': 'p2', 'callingData': {'locationId': 'l1'}}]
+
+    def numbers_read(*, person_id: str):
+        session.respond(200, b'{}')
+        return [{'id': f'n-{person_id}'}]
+
+    api = SimpleNamespace(
+        session=session,
+        people=SimpleNamespace(list=people_list, details=lambda **kwargs: {}),
+        person_settings=SimpleNamespace(numbers=SimpleNamespace(read=numbers_read)),
+    )
+
+    result = run_exports(api, Settings(out_dir=tmp_path, enabled_modules=['people', 'person_numbers']))
+
+    status = {row['module']: row for row in json.loads((tmp_path / 'exports' / 'status.json').read_text())}
+    assert status['people']['calls'] == 2  # list plus the detail sample
+    assert status['people']['throttled'] == 1
+    assert status['people']['bytes'] == 13
+    assert status['person_numbers']['calls'] == 2
+    assert status['person_numbers']['requests'] == 2
+    assert status['person_numbers']['calls_per_row'] == 1.0
+    assert status['person_numbers']['p95_ms'] is not None
+    assert session.callbacks == {}
+    report = Path(result['report_path']).read_text(encoding='utf-8')
+    assert 'Slowest steps' in report and 'Highest fan-out' in report
+
+
+def _paged(ids: list[str], page_seconds: float = 0.05):
+    # lazy like the SDK list methods: every page is fetched while the generator is consumed
+    for item_id in ids:
+        time.sleep(page_seconds)
+        yield {'id': item_id}
+
+
+def test_call_latency_covers_every_page_of_a_lazy_list() -> None:
+    api = SimpleNamespace(
+        people=SimpleNamespace(list=lambda **kwargs: _paged(['p1', 'p2'])),
+        groups=SimpleNamespace(members=lambda *, group_id: _paged(['m1', 'm2'])),
+    )
+    spec = ModuleSpec('people', 'people.list', None, 'id', {}, lambda row: dict(row), lambda row: {})
+    artifact = ArtifactSpec('group_members', 'groups.members', {}, (ParamSource('group_id', 'groups', 'group_id'),))
+
+    with collect_metrics() as metrics:
+        run_spec(api, spec)
+        run_artifact(api, artifact, {'groups': [{'group_id': 'g1'}]})
+
+    assert metrics.calls == 2
+    assert min(metrics.latencies_ms) >= 90
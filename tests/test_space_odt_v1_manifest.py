@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
 from types import SimpleNamespace
 
 import pytest
@@ -8,8 +11,10 @@ from Space_OdT.modules.v1_manifest import (
     ParamSource,
     ParamSourceValidationError,
     _iter_kwargs,
+    _row_from_item,
     required_source_ids_per_artifact,
     run_artifact,
+    run_artifact_async,
     hydrate_lookup_sources,
     validate_param_sources,
     V1_ARTIFACT_SPECS,
@@ -43,6 +48,42 @@ def test_iter_kwargs_filters_by_required_field() -> None:
     assert kwargs == [{'entity_id': 'p1'}]
 
 
+def test_iter_kwargs_binds_sources_from_the_same_row() -> None:
+    cache = {
+        'call_queues': [
+            {'id': 'q1', 'location_id': 'l1'},
+            {'id': 'q2', 'location_id': 'l2'},
+            {'id': 'q2', 'location_id': 'l2'},
+            {'id': 'q3', 'location_id': ''},
+        ]
+    }
+    spec = ArtifactSpec(
+        module='call_queue_details',
+        method_path='telephony.callqueue.details',
+        static_kwargs={},
+        param_sources=(ParamSource('location_id', 'call_queues', 'location_id'), ParamSource('queue_id', 'call_queues', 'id')),
+    )
+
+    assert _iter_kwargs(cache, spec) == [
+        {'location_id': 'l1', 'queue_id': 'q1'},
+        {'location_id': 'l2', 'queue_id': 'q2'},
+    ]
+
+
+def test_cross_module_sources_require_explicit_cross_product() -> None:
+    sources = (ParamSource('location_id', 'locations', 'location_id'), ParamSource('person_id', 'people', 'person_id'))
+    with pytest.raises(ValueError):
+        ArtifactSpec('x', 'a.b', {}, sources)
+
+    spec = ArtifactSpec('x', 'a.b', {}, sources, cross_product=True)
+    cache = {'locations': [{'location_id': 'l1'}, {'location_id': 'l2'}], 'people': [{'person_id': 'p1'}]}
+
+    assert _iter_kwargs(cache, spec) == [
+        {'location_id': 'l1', 'person_id': 'p1'},
+        {'location_id': 'l2', 'person_id': 'p1'},
+    ]
+
+
 def test_iter_kwargs_adds_diagnostics_for_empty_sources() -> None:
     cache = {
         'people': [
@@ -144,6 +185,104 @@ def test_run_artifact_skips_resterror_4003() -> None:
     assert result.rows[0]['source_method'] == 'person_settings.permissions_in.read'
 
 
+def test_run_artifact_async_keeps_order_skips_4003_and_bounds_concurrency() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def read(*, entity_id: str):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # later IDs finish first
+        await asyncio.sleep(0.01 * (5 - int(entity_id[1:])))
+        in_flight -= 1
+        if entity_id == 'p2':
+            raise _FakeError(4003)
+        return {'id': f'row-{entity_id}'}
+
+    api = SimpleNamespace(person_settings=SimpleNamespace(permissions_in=SimpleNamespace(read=read)))
+    spec = ArtifactSpec(
+        module='person_permissions_in',
+        method_path='person_settings.permissions_in.read',
+        static_kwargs={},
+        param_sources=(ParamSource('entity_id', 'people', 'person_id'),),
+    )
+    cache = {'people': [{'person_id': f'p{i}'} for i in range(5)]}
+
+    result = asyncio.run(run_artifact_async(api, spec, cache, concurrency=2))
+
+    assert [row['id'] for row in result.rows] == ['row-p0', 'row-p1', 'row-p3', 'row-p4']
+    assert peak == 2
+
+
+def test_run_artifact_async_propagates_other_errors() -> None:
+    async def read(*, entity_id: str):
+        raise _FakeError(500)
+
+    api = SimpleNamespace(person_settings=SimpleNamespace(permissions_in=SimpleNamespace(read=read)))
+    spec = ArtifactSpec(
+        module='person_permissions_in',
+        method_path='person_settings.permissions_in.read',
+        static_kwargs={},
+        param_sources=(ParamSource('entity_id', 'people', 'person_id'),),
+    )
+
+    with pytest.raises(_FakeError):
+        asyncio.run(run_artifact_async(api, spec, {'people': [{'person_id': 'p1'}]}))
+
+
+def test_run_artifact_only_calls_details_for_rows_missing_required_fields() -> None:
+    calls: list[str] = []
+
+    def details(*, person_id: str, calling_data: bool = False):
+        calls.append(person_id)
+        return {'id': person_id, 'displayName': 'Remote', 'firstName': 'R', 'lastName': 'Emote'}
+
+    api = SimpleNamespace(people=SimpleNamespace(details=details))
+    spec = ArtifactSpec(
+        module='people_details',
+        method_path='people.details',
+        static_kwargs={'calling_data': True},
+        param_sources=(ParamSource('person_id', 'people', 'person_id'),),
+        required_fields=('person_id', 'name', 'first_name', 'last_name'),
+    )
+    cache = {
+        'people': [
+            {'person_id': 'p1', 'display_name': 'Ana Diaz', 'first_name': 'Ana', 'last_name': 'Diaz'},
+            {'person_id': 'p2', 'display_name': 'Solo'},
+        ]
+    }
+
+    result = run_artifact(api, spec, cache)
+
+    assert calls == ['p2']
+    assert [row['person_id'] for row in result.rows] == ['p1', 'p2']
+    assert result.rows[0]['name'] == 'Ana Diaz'
+    assert result.rows[0]['source_method'] == 'cache:people'
+    assert result.rows[0]['raw_keys'] == ''
+    assert result.rows[0]['raw_json'] == ''
+    assert result.rows[1]['source_method'] == 'people.details'
+    assert 'firstName' in result.rows[1]['raw_json']
+
+
+def test_workspace_details_are_fetched_when_list_rows_lack_detail_fields() -> None:
+    calls: list[str] = []
+
+    def details(*, workspace_id: str):
+        calls.append(workspace_id)
+        return {'id': workspace_id, 'displayName': 'Sala', 'locationId': 'loc-1', 'phoneNumber': '+3491'}
+
+    api = SimpleNamespace(workspaces=SimpleNamespace(details=details))
+    spec = {spec.module: spec for spec in V1_ARTIFACT_SPECS}['workspace_details']
+    cache = {'workspaces': [{'id': 'w1', 'workspace_id': 'w1', 'displayName': 'Sala'}]}
+
+    result = run_artifact(api, spec, cache)
+
+    assert calls == ['w1']
+    assert result.rows[0]['source_method'] == 'workspaces.details'
+    assert (result.rows[0]['location_id'], result.rows[0]['direct_number']) == ('loc-1', '+3491')
+
+
 def test_hydrate_lookup_sources_populates_people_cache_with_calling_data() -> None:
     def people_list(*, calling_data: bool = False):
         assert calling_data is True
@@ -166,6 +305,35 @@ def test_hydrate_lookup_sources_populates_people_cache_with_calling_data() -> No
     assert cache['people'][0]['location_id'] == 'loc-1'
 
 
+def test_hydrate_lookup_sources_fetches_a_shared_lookup_once_across_threads() -> None:
+    calls: list[str] = []
+
+    def people_list(*, calling_data: bool = False):
+        calls.append('people.list')
+        time.sleep(0.05)
+        return [{'id': 'p1', 'callingData': {'locationId': 'loc-1'}}]
+
+    api = SimpleNamespace(people=SimpleNamespace(list=people_list))
+    specs = [
+        ArtifactSpec(module, method_path, {}, (ParamSource(name, 'people', 'person_id'),))
+        for module, method_path, name in (
+            ('people_details', 'people.details', 'person_id'),
+            ('person_numbers', 'person_settings.numbers.read', 'person_id'),
+            ('person_call_forwarding', 'person_settings.forwarding.read', 'entity_id'),
+        )
+    ]
+    cache: dict[str, list[dict]] = {}
+
+    threads = [threading.Thread(target=hydrate_lookup_sources, args=(api, spec, cache)) for spec in specs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ['people.list']
+    assert [row['person_id'] for row in cache['people']] == ['p1']
+
+
 def test_run_artifact_auto_hydrates_lookup_sources_before_validating() -> None:
     def people_list(*, calling_data: bool = False):
         return [{'id': 'p1', 'callingData': {'locationId': 'loc-1'}}]
@@ -264,3 +432,27 @@ def test_model_to_dict_prefers_alias_dump_for_sdk_models() -> None:
     assert payload['id'] == 'p1'
     assert payload['displayName'] == 'Ana'
     assert payload['emails'] == ['ana@example.com']
+
+
+def test_row_from_item_raw_json_modes() -> None:
+    item = {'name': 'Q', 'id': 'q1', 'callingData': {'locationId': 'l1'}}
+
+    full = _row_from_item(item, 'a.b', {}, 'call_queues')
+    compact = _row_from_item(item, 'a.b', {}, 'call_queues', raw_json='compact')
+    off = _row_from_item(item, 'a.b', {}, 'call_queues', raw_json='off')
+
+    assert full['raw_json'] == '{"callingData": {"locationId": "l1"}, "id": "q1", "name": "Q"}'
+    assert compact['raw_json'] == '{"name":"Q","id":"q1","callingData":{"locationId":"l1"}}'
+    assert off['raw_json'] == ''
+    assert full['location_id'] == compact['location_id'] == off['location_id'] == 'l1'
+    assert off['raw_keys'] == 'callingData,id,name'
+
+
+def test_row_from_item_keeps_present_fields_and_falls_back_across_variants() -> None:
+    first = _row_from_item({'memberId': 'm1', 'memberType': 'PEOPLE', 'name': ''}, 'a.b', {}, 'group_members')
+    second = _row_from_item({'memberId': 'w1', 'type': 'PLACE', 'displayName': 'W'}, 'a.b', {}, 'group_members')
+
+    assert first['person_id'] == 'm1'
+    assert first['name'] == ''
+    assert second['workspace_id'] == 'w1'
+    assert second['name'] == 'W'
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
-from Space_OdT.v21.transformacion.bulk_runner import chunk_rows, execute_bulk_orders
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from Space_OdT.v21.transformacion.bulk_runner import (
+    JOB_TERMINAL_STATES,
+    AsyncRateLimiter,
+    BulkJobQueue,
+    chunk_rows,
+    execute_bulk_orders,
+    execute_bulk_rows,
+)
 
 
 def test_chunk_rows_splits_consistently():
@@ -23,3 +36,177 @@ def test_execute_bulk_orders_merges_and_orders_results():
 
     assert [order['order_index'] for order in orders] == [1, 2]
     assert [item['row_index'] for item in merged] == [1, 2, 3, 4]
+
+
+def test_execute_bulk_rows_runs_rows_of_one_chunk_concurrently():
+    rows = [{'id': str(i)} for i in range(6)]
+    lock = threading.Lock()
+    in_flight = {'now': 0, 'max': 0}
+    streamed = []
+    completed_orders = []
+
+    def _row_callable(row_index, row):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        time.sleep(0.02)
+        with lock:
+            in_flight['now'] -= 1
+        return {'row_index': row_index, 'status': 'ok', 'value': row['id']}
+
+    orders, merged = execute_bulk_rows(
+        rows=rows,
+        chunk_size=6,
+        max_concurrency=3,
+        row_callable=_row_callable,
+        summarize=lambda order_rows: {'rows_total': len(order_rows)},
+        on_row=streamed.append,
+        on_order=completed_orders.append,
+    )
+
+    # un único chunk, pero las filas no se ejecutan en serie
+    assert in_flight['max'] == 3
+    assert [item['row_index'] for item in merged] == [1, 2, 3, 4, 5, 6]
+    assert sorted(item['row_index'] for item in streamed) == [1, 2, 3, 4, 5, 6]
+    assert orders == completed_orders == [{'order_index': 1, 'rows_total': 6}]
+
+
+def test_execute_bulk_rows_reports_each_order_once_complete():
+    rows = [{'id': str(i)} for i in range(5)]
+
+    orders, _ = execute_bulk_rows(
+        rows=rows,
+        chunk_size=2,
+        max_concurrency=4,
+        row_callable=lambda row_index, row: {'row_index': row_index},
+        summarize=lambda order_rows: {'rows': [item['row_index'] for item in order_rows]},
+    )
+
+    assert orders == [
+        {'order_index': 1, 'rows': [1, 2]},
+        {'order_index': 2, 'rows': [3, 4]},
+        {'order_index': 3, 'rows': [5]},
+    ]
+
+
+def test_async_rate_limiter_spaces_acquisitions():
+    async def _run():
+        limiter = AsyncRateLimiter(50)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(limiter.acquire() for _ in range(5)))
+        return loop.time() - start
+
+    # 5 arranques a 50/s: el último espera al menos 4 intervalos de 20 ms
+    assert asyncio.run(_run()) >= 0.075
+
+
+def test_execute_bulk_rows_stops_and_reports_partial_orders_as_cancelled():
+    rows = [{'id': str(i)} for i in range(6)]
+    done = []
+
+    orders, merged = execute_bulk_rows(
+        rows=rows,
+        chunk_size=4,
+        max_concurrency=1,
+        row_callable=lambda row_index, row: {'row_index': row_index},
+        summarize=lambda order_rows: {'status': 'completed', 'rows_total': len(order_rows)},
+        on_row=done.append,
+        should_stop=lambda: len(done) >= 3,
+    )
+
+    assert [item['row_index'] for item in merged] == [1, 2, 3]
+    assert orders == [{'order_index': 1, 'status': 'cancelled', 'rows_total': 3}]
+
+
+def test_execute_bulk_rows_uses_shared_executor():
+    thread_names = set()
+
+    def _row_callable(row_index, row):
+        thread_names.add(threading.current_thread().name)
+        return {'row_index': row_index}
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix='shared-rows') as shared:
+        execute_bulk_rows(
+            rows=[{}] * 4,
+            chunk_size=2,
+            max_concurrency=4,
+            row_callable=_row_callable,
+            summarize=lambda order_rows: {},
+            executor=shared,
+        )
+
+    assert thread_names and all(name.startswith('shared-rows') for name in thread_names)
+
+
+def test_bulk_job_queue_tracks_progress_and_result():
+    queue = BulkJobQueue(max_jobs=1, row_workers=2)
+
+    def _run(job):
+        job.record_row({'row_index': 1, 'status': 'ok'})
+        job.record_row({'row_index': 2, 'status': 'error', 'error': 'boom'})
+        job.record_order({'order_index': 1, 'rows_total': 2})
+        return {'total_rows': 2}
+
+    job = queue.submit(action_id='accion', rows_total=2, run=_run)
+    version = 0
+    while job.status not in ('completed', 'failed', 'cancelled'):
+        version = job.wait_for_change(version, timeout=1.0)
+    queue.shutdown()
+
+    snapshot = job.snapshot(include_result=True)
+    assert snapshot['status'] == 'completed'
+    assert (snapshot['rows_done'], snapshot['rows_error'], snapshot['orders_done']) == (2, 1, 1)
+    assert snapshot['recent_errors'] == [{'row_index': 2, 'status': 'error', 'error': 'boom'}]
+    assert snapshot['result'] == {'total_rows': 2}
+
+
+def test_bulk_job_queue_cancel_and_failure():
+    queue = BulkJobQueue(max_jobs=1, row_workers=1)
+    release = threading.Event()
+
+    def _blocking(job):
+        release.wait(timeout=5)
+        return {}
+
+    first = queue.submit(action_id='a', rows_total=0, run=_blocking)
+    queued = queue.submit(action_id='b', rows_total=0, run=lambda job: {})
+    failing = queue.submit(action_id='c', rows_total=0, run=lambda job: 1 / 0)
+    queued.cancel()
+    first.cancel()
+    release.set()
+    queue.shutdown(cancel=False)
+
+    assert first.status == 'cancelled'
+    assert queued.status == 'cancelled'
+    assert failing.status == 'failed' and 'division' in failing.error
+
+
+def test_bulk_job_queue_caps_history_and_releases_read_results():
+    queue = BulkJobQueue(max_jobs=1, row_workers=1, max_history=2)
+    release = threading.Event()
+
+    def _blocking(job):
+        release.wait(timeout=5)
+        return {'rows': ['big']}
+
+    done = [queue.submit(action_id=f'a{index}', rows_total=0, run=lambda job: {'rows': ['big']})
+            for index in range(3)]
+    for job in done:
+        version = 0
+        while job.status not in JOB_TERMINAL_STATES:
+            version = job.wait_for_change(version, timeout=1.0)
+    running = queue.submit(action_id='b', rows_total=0, run=_blocking)
+    queued = queue.submit(action_id='c', rows_total=0, run=lambda job: {})
+
+    # solo se descartan jobs terminados, empezando por los más antiguos
+    assert [job.action_id for job in queue.jobs()] == ['b', 'c']
+    assert queue.get(done[0].job_id) is None
+    release.set()
+    queue.shutdown(cancel=False)
+    assert running.status == queued.status == 'completed'
+
+    first = running.snapshot(include_result=True, release_result=True)
+    second = running.snapshot(include_result=True, release_result=True)
+    assert first['result'] == {'rows': ['big']} and not first['result_released']
+    assert second['result'] is None and second['result_released']
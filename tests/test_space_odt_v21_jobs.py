@@ -54,7 +54,7 @@ def test_run_job_background_marks_failed_on_exception(monkeypatch, tmp_path: Pat
     runner = V21Runner(token='token', out_dir=tmp_path)
     job = runner.create_location_job(rows=[{'location_name': 'Bilbao'}])
 
-    async def boom(*args, **kwargs):
+    async def boom(job_id, *, max_concurrency):
         raise RuntimeError('network down')
 
     monkeypatch.setattr(runner, 'process_location_job', boom)
@@ -155,3 +155,69 @@ def test_list_location_ids_requires_org_id(tmp_path: Path):
         assert 'orgId es obligatorio' in str(exc)
     else:
         raise AssertionError('expected ValueError')
+
+
+def test_process_location_job_uses_shared_index_and_checkpoints_every_row(monkeypatch, tmp_path: Path):
+    import asyncio
+    from types import SimpleNamespace
+
+    import Space_OdT.v21.engine as engine_mod
+
+    calls: list[str] = []
+    checkpoints: list[dict] = []
+
+    class DummyAsApi:
+        def __init__(self, **kwargs):
+            self.session = object()
+            self.people = SimpleNamespace(me=self._me)
+
+        async def _me(self):
+            return None
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    class DummyLocationsApi:
+        def __init__(self, session):
+            pass
+
+        async def list(self, org_id=None):
+            calls.append('list')
+            return [SimpleNamespace(name='Madrid', location_id='loc-madrid')]
+
+        async def create(self, name, **kwargs):
+            calls.append(f'create:{name}')
+            # the first row is slow; the others must not wait for it
+            await asyncio.sleep(0.05 if name == 'Bilbao' else 0)
+            return f'loc-{name.lower()}'
+
+        async def details(self, location_id, org_id=None):
+            return SimpleNamespace(address=None, model_dump=lambda **kwargs: {'id': location_id})
+
+        async def update(self, location_id, settings, org_id=None):
+            calls.append(f'update:{location_id}')
+
+    monkeypatch.setattr(engine_mod, 'AsWebexSimpleApi', DummyAsApi)
+    monkeypatch.setattr(engine_mod, 'AsLocationsApi', DummyLocationsApi)
+
+    base = {'time_zone': 'Europe/Madrid', 'preferred_language': 'es_ES', 'announcement_language': 'es_ES',
+            'address1': 'Calle 1', 'city': 'X', 'state': 'X', 'postal_code': '1', 'country': 'ES'}
+    names = ['Bilbao', 'Madrid', 'Sevilla', 'Sevilla', 'Cadiz']
+    runner = V21Runner(token='token', out_dir=tmp_path)
+    job = runner.create_location_job(rows=[{**base, 'location_name': name} for name in names])
+    save_job = runner.save_job
+    monkeypatch.setattr(runner, 'save_job', lambda j: (checkpoints.append(dict(j.cursor)), save_job(j)))
+
+    result = asyncio.run(runner.process_location_job(job.job_id, max_concurrency=2))
+
+    assert result['totals']['success'] == 5
+    # one listing for the whole job; the second Sevilla row finds the location the first one created
+    assert calls.count('list') == 1
+    assert sorted(c for c in calls if c.startswith('create')) == ['create:Bilbao', 'create:Cadiz', 'create:Sevilla']
+    assert 'update:loc-madrid' in calls and 'update:loc-sevilla' in calls
+    # rows behind the slow first one finished while it was in flight, then the cursor caught up
+    assert {'offset': 0, 'completed_ahead': [1, 2, 3, 4]} in checkpoints
+    assert runner.get_job(job.job_id).cursor == {'offset': 5}
@@ -2,9 +2,15 @@ from __future__ import annotations
 
 from types import SimpleNamespace
 import csv
+import io
+import threading
+import time
 
 import pytest
+import requests
+from wxc_sdk.rest import RestError
 
+from Space_OdT.v21.transformacion import common
 from Space_OdT.v21.transformacion import launcher_csv_dependencias as launcher
 from Space_OdT.v21.transformacion import usuarios_asignar_location_desde_csv as users_csv
 
@@ -15,6 +21,11 @@ class _ThrottledError(Exception):
         self.response = SimpleNamespace(status_code=429, headers={'Retry-After': retry_after})
 
 
+@pytest.fixture(autouse=True)
+def _fresh_rate_limit_gate(monkeypatch):
+    monkeypatch.setattr(common, 'RATE_LIMIT_GATE', common.RateLimitGate())
+
+
 def test_retry_after_wait_seconds_accepts_numeric():
     assert launcher._retry_after_wait_seconds('5') == 5.0
 
@@ -38,6 +49,110 @@ def test_invoke_with_retry_after_retries_once(monkeypatch):
     assert sleep_calls == [2.0]
 
 
+def test_invoke_with_retry_after_honours_max_retries_and_reports_retries(monkeypatch):
+    monkeypatch.setattr(launcher.time, 'sleep', lambda _: None)
+    retries: list[float] = []
+
+    def handler(*, token: str, **params):
+        raise _ThrottledError('1')
+
+    with pytest.raises(_ThrottledError):
+        launcher._invoke_with_retry_after(handler=handler, token='tkn', params={}, max_retries=2, retries=retries)
+
+    assert retries == [1.0, 1.0]
+
+
+def test_retry_after_pauses_every_worker_until_deadline():
+    gate = common.RateLimitGate()
+    gate.throttled(0.2)
+    started = time.monotonic()
+    waits: list[float] = []
+
+    threads = [threading.Thread(target=lambda: waits.append(gate.wait())) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - started >= 0.15
+    assert all(wait > 0 for wait in waits)
+    # tras la pausa los envíos se espacian con el intervalo adaptativo
+    assert gate.interval == gate.initial_interval
+
+
+def test_rate_limit_gate_adapts_interval():
+    gate = common.RateLimitGate(initial_interval=0.1, max_interval=0.3)
+    gate.throttled(None)
+    gate.throttled(None)
+    gate.throttled(None)
+    assert gate.interval == 0.3
+
+    for _ in range(20):
+        gate.succeeded()
+    assert gate.interval == 0.0
+
+
+def _http_response(status_code: int, headers: dict[str, str] | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update({'Content-Type': 'application/json', **(headers or {})})
+    response._content = b'{"items": []}' if status_code == 200 else b'{"message": "too many requests"}'
+    response.url = 'https://webexapis.com/v1/people'
+    response.raw = io.BytesIO()
+    return response
+
+
+def test_gated_session_retries_429_and_throttles_gate(monkeypatch):
+    statuses = iter([429, 429, 200])
+    sent: list[str] = []
+    sleeps: list[float] = []
+
+    def fake_request(self, method, url, *args, **kwargs):
+        sent.append(url)
+        status = next(statuses)
+        return _http_response(status, {'Retry-After': '2'} if status == 429 else None)
+
+    monkeypatch.setattr(requests.Session, 'request', fake_request)
+    monkeypatch.setattr(common.time, 'sleep', sleeps.append)
+    api = common.WebexSimpleApi(tokens='tkn', session=common.GatedRestSession(tokens=common.Tokens(access_token='tkn')))
+    retries: list[float] = []
+
+    def handler(*, token: str, **params):
+        return api.session.rest_get('https://webexapis.com/v1/people')
+
+    result = launcher._invoke_with_retry_after(handler=handler, token='tkn', params={}, max_retries=3, retries=retries)
+
+    assert result == {'items': []}
+    assert len(sent) == 3
+    assert retries == [2.0, 2.0]
+    assert 2.0 in sleeps
+    assert common.RATE_LIMIT_GATE.interval > 0
+
+
+def test_gated_session_raises_rest_error_when_retry_budget_is_spent(monkeypatch):
+    sent: list[str] = []
+
+    def fake_request(self, method, url, *args, **kwargs):
+        sent.append(url)
+        return _http_response(429, {'Retry-After': '1'})
+
+    monkeypatch.setattr(requests.Session, 'request', fake_request)
+    monkeypatch.setattr(common.time, 'sleep', lambda _: None)
+    session = common.GatedRestSession(tokens=common.Tokens(access_token='tkn'))
+    retries: list[float] = []
+
+    def handler(*, token: str, **params):
+        return session.rest_get('https://webexapis.com/v1/people')
+
+    with pytest.raises(RestError) as exc_info:
+        launcher._invoke_with_retry_after(handler=handler, token='tkn', params={}, max_retries=2, retries=retries)
+
+    assert exc_info.value.response.status_code == 429
+    # 1 envío + 2 reintentos en la sesión; el handler no se repite con el presupuesto agotado
+    assert len(sent) == 3
+    assert retries == [1.0, 1.0]
+
+
 def test_invoke_with_retry_after_does_not_retry_without_header(monkeypatch):
     monkeypatch.setattr(launcher.time, 'sleep', lambda _: None)
 
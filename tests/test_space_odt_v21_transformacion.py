@@ -5,12 +5,20 @@ from types import SimpleNamespace
 
 import pytest
 
+from Space_OdT.v21.transformacion import common
 from Space_OdT.v21.transformacion.ubicacion_actualizar_cabecera import actualizar_cabecera_ubicacion
 from Space_OdT.v21.transformacion.ubicacion_alta_numeraciones_desactivadas import alta_numeraciones_desactivadas
 from Space_OdT.v21.transformacion.ubicacion_configurar_pstn import configurar_pstn_ubicacion
 from Space_OdT.v21.transformacion.usuarios_alta_people import alta_usuario_people
 
 
+@pytest.fixture(autouse=True)
+def _logs_in_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(common, 'LOGS_DIR', tmp_path / 'logs')
+    yield
+    common.flush_audit_logs()
+
+
 class _Model:
     def __init__(self, payload):
         self._payload = payload
@@ -109,6 +117,109 @@ def test_actualizar_cabecera_ubicacion_updates_calling_line(monkeypatch):
     assert captured['settings'].calling_line_id.name == 'Cabecera Central'
 
 
+def test_actualizar_cabecera_ubicacion_uses_injected_api(monkeypatch):
+    captured = {}
+
+    class LocationApi:
+        def update(self, location_id, settings, org_id=None):
+            captured['location_id'] = location_id
+            return 'batch-1'
+
+    def _unexpected(token):
+        raise AssertionError('create_api no debe llamarse con api inyectada')
+
+    monkeypatch.setattr('Space_OdT.v21.transformacion.ubicacion_actualizar_cabecera.create_api', _unexpected)
+
+    result = actualizar_cabecera_ubicacion(
+        token='tkn',
+        api=SimpleNamespace(telephony=SimpleNamespace(location=LocationApi())),
+        location_id='loc1',
+        phone_number='+34918887777',
+    )
+
+    assert result['status'] == 'success'
+    assert captured['location_id'] == 'loc1'
+
+
+def test_create_api_reuses_one_client_per_token(monkeypatch):
+    closed = []
+
+    class FakeSession:
+        def __init__(self, tokens):
+            self.tokens = tokens
+
+        def close(self):
+            closed.append(self.tokens.access_token)
+
+    class FakeApi:
+        def __init__(self, tokens, session):
+            assert isinstance(session, common.GatedRestSession)
+            self.session = FakeSession(session._tokens)
+
+    monkeypatch.setattr(common, 'WebexSimpleApi', FakeApi)
+    common.clear_api_cache()
+
+    first = common.create_api('tkn-a')
+    assert common.create_api('tkn-a') is first
+    assert common.create_api('tkn-b') is not first
+
+    common.clear_api_cache()
+    assert sorted(closed) == ['tkn-a', 'tkn-b']
+    assert common.create_api('tkn-a') is not first
+    common.clear_api_cache()
+
+
+def test_load_json_cached_reuses_payload_until_file_changes(tmp_path):
+    report = tmp_path / 'profile.json'
+    report.write_text('{"a": 1}', encoding='utf-8')
+
+    first = common._load_json_cached(report)
+    assert common._load_json_cached(report) is first
+
+    report.write_text('{"a": 22}', encoding='utf-8')
+    assert common._load_json_cached(report) == {'a': 22}
+    assert common._load_json_cached(tmp_path / 'missing.json') is None
+
+
+def test_audit_log_buffers_lines_until_flush(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, 'AUDIT_MAX_BUFFERED_LINES', 3)
+    # instancia sin registrar: el hilo de fondo no la vacía durante el test
+    audit = common._AuditLog(tmp_path / 'script.log')
+
+    audit.append('{"n": 1}')
+    audit.append('{"n": 2}')
+    assert not audit.path.exists()
+
+    audit.append('{"n": 3}')
+    audit.append('{"n": 4}')
+    assert audit.path.read_text(encoding='utf-8').splitlines() == ['{"n": 1}', '{"n": 2}', '{"n": 3}']
+
+    audit.flush()
+    assert audit.path.read_text(encoding='utf-8').splitlines()[-1] == '{"n": 4}'
+
+
+def test_flush_audit_logs_writes_registered_logs(tmp_path):
+    audit = common._audit_log(tmp_path / 'logs' / 'script.log')
+    audit.append('{"n": 1}')
+
+    common.flush_audit_logs()
+
+    assert audit.path.read_text(encoding='utf-8') == '{"n": 1}\n'
+
+
+def test_console_level_controls_step_output(capsys, monkeypatch):
+    monkeypatch.setattr(common, '_console_level', 'full')
+
+    common.set_console_level('events')
+    common.log_console_step('script', 'configure_request', {'a': 1})
+    common.set_console_level('quiet')
+    common.log_console_step('script', 'configure_request', {'a': 1})
+
+    assert capsys.readouterr().out == '[script] configure_request\n'
+    with pytest.raises(ValueError):
+        common.set_console_level('verbose')
+
+
 def test_actualizar_cabecera_ubicacion_requires_mandatory_params():
     with pytest.raises(ValueError, match='location_id es obligatorio'):
         actualizar_cabecera_ubicacion(token='tkn', location_id='', phone_number='+34918887777')
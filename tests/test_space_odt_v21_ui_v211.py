@@ -7,6 +7,14 @@ from Space_OdT.v21.ui_v211 import (
     _preview_action,
     ACTION_DESCRIPTIONS,
 )
+from Space_OdT.v21.transformacion import common
+
+
+@pytest.fixture(autouse=True)
+def _logs_in_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(common, 'LOGS_DIR', tmp_path / 'logs')
+    yield
+    common.flush_audit_logs()
 
 
 def test_build_params_uses_default_column_when_mapping_missing():
@@ -49,3 +57,103 @@ def test_apply_action_bulk_returns_orders(monkeypatch):
     assert result['bulk']['enabled'] is True
     assert result['bulk']['orders_total'] == 2
     assert result['total_rows'] == 3
+
+
+def test_apply_action_bulk_rows_mode_streams_rows(monkeypatch):
+    from Space_OdT.v21 import ui_v211
+
+    monkeypatch.setitem(ui_v211.HANDLERS, 'usuarios_modificar_licencias', lambda token, **kwargs: {'status_code': 200, 'payload': kwargs})
+
+    rows = [{'person_id': f'p{i}', 'add_license_ids': 'lic-a'} for i in range(5)]
+    result = ui_v211._apply_action(
+        action_id='usuarios_modificar_licencias',
+        rows=rows,
+        mapping={},
+        token='tkn',
+        bulk=True,
+        chunk_size=2,
+        max_workers=8,
+        bulk_mode='rows',
+    )
+
+    assert result['bulk']['mode'] == 'rows'
+    assert [order['rows_ok'] for order in result['bulk']['orders']] == [2, 2, 1]
+    assert [row['row_index'] for row in result['rows_preview']] == [1, 2, 3, 4, 5]
+
+
+def test_apply_action_rejects_unknown_bulk_mode():
+    from Space_OdT.v21 import ui_v211
+
+    with pytest.raises(ValueError, match='bulk_mode'):
+        ui_v211._apply_action(action_id='usuarios_modificar_licencias', rows=[], mapping={}, token='tkn', bulk=True, bulk_mode='x')
+
+
+def test_apply_action_reports_429_retries_per_row(monkeypatch):
+    from types import SimpleNamespace
+
+    from Space_OdT.v21 import ui_v211
+    from Space_OdT.v21.transformacion import common
+
+    class _ThrottledError(Exception):
+        response = SimpleNamespace(status_code=429, headers={'Retry-After': '0'})
+
+    calls = {'count': 0}
+
+    def _handler(token, **kwargs):
+        calls['count'] += 1
+        if calls['count'] == 1:
+            raise _ThrottledError()
+        return {'status_code': 200}
+
+    monkeypatch.setattr(common, 'RATE_LIMIT_GATE', common.RateLimitGate(initial_interval=0.0))
+    monkeypatch.setitem(ui_v211.HANDLERS, 'usuarios_modificar_licencias', _handler)
+
+    result = ui_v211._apply_action(
+        action_id='usuarios_modificar_licencias',
+        rows=[{'person_id': 'p1', 'add_license_ids': 'lic-a'}, {'person_id': 'p2', 'add_license_ids': 'lic-b'}],
+        mapping={},
+        token='tkn',
+    )
+
+    assert [row['retries_429'] for row in result['rows_preview']] == [1, 0]
+    assert [row['status'] for row in result['rows_preview']] == ['ok', 'ok']
+
+
+def test_job_route_parses_job_paths():
+    from Space_OdT.v21 import ui_v211
+
+    assert ui_v211._job_route('/api/jobs/abc') == ('abc', '')
+    assert ui_v211._job_route('/api/jobs/abc/events?x=1') == ('abc', 'events')
+    assert ui_v211._job_route('/api/jobs') is None
+    assert ui_v211._job_route('/api/menu') is None
+
+
+def test_apply_action_reports_progress_and_stops_on_cancel(monkeypatch):
+    from Space_OdT.v21 import ui_v211
+    from Space_OdT.v21.transformacion.bulk_runner import BulkJob
+
+    job = BulkJob(action_id='usuarios_modificar_licencias', rows_total=4)
+
+    def _handler(token, **kwargs):
+        if kwargs['person_id'] == 'p2':
+            job.cancel()
+        return {'status_code': 200}
+
+    monkeypatch.setitem(ui_v211.HANDLERS, 'usuarios_modificar_licencias', _handler)
+
+    result = ui_v211._apply_action(
+        action_id='usuarios_modificar_licencias',
+        rows=[{'person_id': f'p{i}', 'add_license_ids': 'lic'} for i in range(1, 5)],
+        mapping={},
+        token='tkn',
+        bulk=True,
+        chunk_size=4,
+        max_workers=1,
+        job=job,
+    )
+
+    assert result['cancelled'] is True
+    assert result['total_rows'] == 2
+    assert job.rows_done == 2
+    assert job.orders == [{'order_index': 1, **result['bulk']['orders'][0]}]
+    assert result['bulk']['orders'][0]['status'] == 'cancelled'
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from Space_OdT.v21.transformacion import usuarios_asignar_location_desde_csv as users_csv
+from Space_OdT.v21.transformacion import common
+
+
+@pytest.fixture(autouse=True)
+def _logs_in_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(common, 'LOGS_DIR', tmp_path / 'logs')
+    yield
+    common.flush_audit_logs()
+
+
+class _RestError(Exception):
+    def __init__(self, code: int):
+        super().__init__(f'error {code}')
+        self.code = code
+
+
+class _JobResponse(SimpleNamespace):
+    def model_dump(self, **kwargs):
+        return {'jobDetails': {'id': self.job_details.id}}
+
+
+class _FakeApi:
+    def __init__(self, people: dict[str, SimpleNamespace], *, single_user_only: bool = False,
+                 failing_locations: tuple[str, ...] = ()):
+        self._people = people
+        self.single_user_only = single_user_only
+        self.failing_locations = failing_locations
+        self.list_calls: list[list[str]] = []
+        self.details_calls: list[str] = []
+        self.jobs: list[tuple[str, list[str]]] = []
+        self.status_calls: list[str] = []
+        self.updated: list[str] = []
+        self.people = SimpleNamespace(list=self._list, details=self._details, update=self._update)
+        move_users = SimpleNamespace(validate_or_initiate=self._validate_or_initiate, status=self._status)
+        self.telephony = SimpleNamespace(jobs=SimpleNamespace(move_users=move_users))
+
+    def _list(self, id_list=None, calling_data=None):
+        self.list_calls.append(list(id_list))
+        return [self._people[person_id] for person_id in id_list if person_id in self._people]
+
+    def _details(self, person_id, calling_data=None):
+        self.details_calls.append(person_id)
+        return SimpleNamespace(person_id=person_id, location_id='loc-x', extension='9999')
+
+    def _update(self, person, calling_data=None):
+        self.updated.append(person.person_id)
+        return person
+
+    def _validate_or_initiate(self, users_list):
+        users = [user.user_id for user in users_list[0].users]
+        if self.single_user_only and len(users) > 1:
+            raise _RestError(1026005)
+        if users_list[0].location_id in self.failing_locations:
+            raise _RestError(400)
+        self.jobs.append((users_list[0].location_id, users))
+        job_id = f'job-{len(self.jobs)}'
+        return _JobResponse(job_details=SimpleNamespace(id=job_id), users_list=[])
+
+    def _status(self, job_id):
+        self.status_calls.append(job_id)
+        return SimpleNamespace(latest_execution_status='COMPLETED')
+
+
+def _write_csv(tmp_path, rows: list[tuple[str, str]]):
+    csv_path = tmp_path / 'people_to_location.csv'
+    lines = ['selected,person_id,target_location_id', *[f'1,{person_id},{location}' for person_id, location in rows]]
+    csv_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return csv_path
+
+
+def _calling(person_id: str, location_id: str = 'loc-old') -> SimpleNamespace:
+    return SimpleNamespace(person_id=person_id, location_id=location_id, extension=f'1{person_id[-1]}')
+
+
+def test_assign_users_groups_calling_users_into_move_jobs_per_location(tmp_path):
+    people = {
+        'p1': _calling('p1'),
+        'p2': _calling('p2'),
+        'p3': _calling('p3'),
+        'p4': _calling('p4'),
+        'p5': SimpleNamespace(person_id='p5', location_id=None, extension=None),
+        'p6': _calling('p6', location_id='loc-b'),
+    }
+    api = _FakeApi(people)
+    csv_path = _write_csv(
+        tmp_path,
+        [('p1', 'loc-a'), ('p2', 'loc-a'), ('p3', 'loc-a'), ('p4', 'loc-b'), ('p5', 'loc-a'), ('p6', 'loc-b')],
+    )
+
+    results = users_csv.assign_users_to_locations(csv_path=csv_path, dry_run=False, api=api, batch_size=2)
+
+    assert api.list_calls == [['p1', 'p2', 'p3', 'p4', 'p5', 'p6']]
+    assert api.details_calls == []
+    assert api.jobs == [('loc-a', ['p1', 'p2']), ('loc-a', ['p3']), ('loc-b', ['p4'])]
+    assert sorted(api.status_calls) == ['job-1', 'job-2', 'job-3']
+    assert api.updated == ['p5']
+    assert [item['status'] for item in results] == ['updated', 'updated', 'updated', 'updated', 'updated', 'unchanged']
+    assert results[0]['job_id'] == results[1]['job_id'] == 'job-1'
+    assert results[0]['job_status'] == 'COMPLETED'
+
+
+def test_assign_users_falls_back_to_single_user_jobs(tmp_path):
+    people = {person_id: _calling(person_id) for person_id in ('p1', 'p2', 'p3')}
+    api = _FakeApi(people, single_user_only=True)
+    csv_path = _write_csv(tmp_path, [('p1', 'loc-a'), ('p2', 'loc-a'), ('p3', 'loc-a')])
+
+    results = users_csv.assign_users_to_locations(csv_path=csv_path, dry_run=False, api=api, batch_size=3,
+                                                  wait_jobs=False)
+
+    assert api.jobs == [('loc-a', ['p1']), ('loc-a', ['p2']), ('loc-a', ['p3'])]
+    assert api.status_calls == []
+    assert [item['status'] for item in results] == ['submitted'] * 3
+
+
+def test_assign_users_defaults_to_one_user_per_move_job(tmp_path):
+    people = {person_id: _calling(person_id) for person_id in ('p1', 'p2')}
+    api = _FakeApi(people, single_user_only=True)
+    csv_path = _write_csv(tmp_path, [('p1', 'loc-a'), ('p2', 'loc-a')])
+
+    users_csv.assign_users_to_locations(csv_path=csv_path, dry_run=False, api=api, wait_jobs=False)
+
+    assert api.jobs == [('loc-a', ['p1']), ('loc-a', ['p2'])]
+
+
+def test_assign_users_keeps_going_and_logs_each_result_when_a_job_fails(tmp_path):
+    people = {
+        'p1': _calling('p1'),
+        'p2': _calling('p2'),
+        'p3': SimpleNamespace(person_id='p3', location_id=None, extension=None),
+    }
+    api = _FakeApi(people, failing_locations=('loc-a',))
+    csv_path = _write_csv(tmp_path, [('p3', 'loc-a'), ('p1', 'loc-a'), ('p2', 'loc-b')])
+
+    results = users_csv.assign_users_to_locations(csv_path=csv_path, dry_run=False, api=api, wait_jobs=False)
+
+    assert api.jobs == [('loc-b', ['p2'])]
+    assert [(item['person_id'], item['status']) for item in results] == [
+        ('p3', 'updated'), ('p1', 'error'), ('p2', 'submitted')]
+    assert results[1]['error'] == 'error 400'
+    common.flush_audit_logs()
+    log_path = tmp_path / 'logs' / f'{users_csv.SCRIPT_NAME}.log'
+    events = [json.loads(line) for line in log_path.read_text(encoding='utf-8').splitlines()]
+    assert [(event['event'], event['payload'].get('person_id')) for event in events] == [
+        ('user_location_updated', 'p3'),
+        ('move_users_job', None),
+        ('user_location_updated', 'p1'),
+        ('move_users_job', None),
+        ('user_location_updated', 'p2'),
+    ]
+    assert events[3]['payload']['response'] == {'jobDetails': {'id': 'job-1'}}
+
+
+def test_fetch_people_uses_id_list_chunks_and_details_fallback():
+    people = {f'p{index}': _calling(f'p{index}') for index in range(170)}
+    api = _FakeApi(people)
+
+    fetched = users_csv._fetch_people(api, [*people, 'p-missing', 'p1'])
+
+    assert [len(chunk) for chunk in api.list_calls] == [85, 85, 1]
+    assert api.details_calls == ['p-missing']
+    assert len(fetched) == 171
+
+
+def test_wait_for_move_jobs_polls_until_terminal(monkeypatch):
+    monkeypatch.setattr(users_csv.time, 'sleep', lambda _: None)
+    statuses = {'job-1': iter(['STARTED', 'COMPLETED']), 'job-2': iter(['FAILED'])}
+    api = SimpleNamespace(
+        telephony=SimpleNamespace(
+            jobs=SimpleNamespace(
+                move_users=SimpleNamespace(
+                    status=lambda job_id: SimpleNamespace(latest_execution_status=next(statuses[job_id]))
+                )
+            )
+        )
+    )
+
+    assert users_csv._wait_for_move_jobs(api, ['job-1', 'job-2']) == {'job-1': 'COMPLETED', 'job-2': 'FAILED'}
@@ -2,7 +2,17 @@ from __future__ import annotations
 
 from types import SimpleNamespace
 
+import pytest
+
 from Space_OdT.v21.transformacion.usuarios_modificar_licencias import modificar_licencias_usuario
+from Space_OdT.v21.transformacion import common
+
+
+@pytest.fixture(autouse=True)
+def _logs_in_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(common, 'LOGS_DIR', tmp_path / 'logs')
+    yield
+    common.flush_audit_logs()
 
 
 class _Model:
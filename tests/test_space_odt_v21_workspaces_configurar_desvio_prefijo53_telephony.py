@@ -2,9 +2,19 @@ from __future__ import annotations
 
 from types import SimpleNamespace
 
+import pytest
+
 from Space_OdT.v21.transformacion.workspaces_configurar_desvio_prefijo53_telephony import (
     configurar_desvio_prefijo53_workspace_telephony,
 )
+from Space_OdT.v21.transformacion import common
+
+
+@pytest.fixture(autouse=True)
+def _logs_in_tmp(monkeypatch, tmp_path):
+    monkeypatch.setattr(common, 'LOGS_DIR', tmp_path / 'logs')
+    yield
+    common.flush_audit_logs()
 
 
 class _Session:
@@ -1,5 +1,6 @@
 import asyncio
 from pathlib import Path
+from types import SimpleNamespace
 
 from Space_OdT.v2.engine import MissingV2InputsError, V2Runner, parse_stage_decision
 from Space_OdT.v2.models import InputRecord, Stage, StageDecision
@@ -62,3 +63,132 @@ def test_v2_runner_bootstraps_missing_inputs_and_fails_guided(tmp_path: Path) ->
     assert (v2_dir / 'input_softphones.csv').exists()
     assert (v2_dir / 'static_policy.json').exists()
     assert (v2_dir / 'decisions.sample.json').exists()
+
+
+class _FakeAsApi:
+    def __init__(self, **kwargs):
+        self.people = self
+        self.licenses = self
+        self.session = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def me(self):
+        return None
+
+    async def list(self):
+        return []
+
+
+def _write_inputs(v2_dir: Path, count: int) -> None:
+    v2_dir.mkdir(parents=True)
+    (v2_dir / 'static_policy.json').write_text('{}', encoding='utf-8')
+    (v2_dir / 'decisions.sample.json').write_text('{}', encoding='utf-8')
+    rows = ''.join(f'u{i}@example.com,lic-1,loc-1,{1000 + i}\n' for i in range(count))
+    (v2_dir / 'input_softphones.csv').write_text(
+        'user_email,calling_license_id,location_id,extension\n' + rows, encoding='utf-8')
+
+
+def test_v2_runner_streams_records_through_bounded_pool_and_resumes_after_crash(
+        tmp_path: Path, monkeypatch) -> None:
+    import Space_OdT.v2.engine as engine
+    from Space_OdT.v2.io import load_run_state
+    from Space_OdT.v2.models import ChangeEntry, FailureEntry, RecordResult
+
+    monkeypatch.setattr(engine, 'AsWebexSimpleApi', _FakeAsApi)
+    _write_inputs(tmp_path / 'v2', 6)
+    processed: list[str] = []
+    active = 0
+    peak = 0
+
+    async def process_record(self, api, record, *args, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        processed.append(record.user_email)
+        if record.user_email == 'u4@example.com' and crash:
+            raise RuntimeError('connection lost')
+        change = ChangeEntry(record.user_email, 'assign_calling_license', 'success', None, None, 'applied')
+        if record.user_email == 'u1@example.com' and crash:
+            failure = FailureEntry(record.user_email, 'assign_calling_license', 'RestError', 400, None, 'bad')
+            return RecordResult(record.user_email, 'failed', 'assign_calling_license'), [failure], [change]
+        return RecordResult(record.user_email, 'success'), [], [change]
+
+    monkeypatch.setattr(V2Runner, '_process_record', process_record)
+    runner = V2Runner(token='t', out_dir=tmp_path, concurrent_requests=1, compact_every=2,
+                      decision_provider=lambda stage: (StageDecision.YES, None))
+
+    crash = True
+    with pytest.raises(RuntimeError):
+        asyncio.run(runner.run())
+
+    assert peak == 1
+    state = load_run_state(tmp_path / 'v2' / 'run_state.json')
+    assert state['in_progress'] is True
+    # u0, u2 and u3 succeeded inside the processed prefix; only the failure is kept
+    assert state['processed_offset'] == 4
+    assert sorted(state['record_results']) == ['u1@example.com']
+    assert state['completed_count'] == 3 and state['failed_count'] == 1
+
+    crash = False
+    processed.clear()
+    final = asyncio.run(runner.run(only_failures=True))
+
+    # the failed record plus the ones the interrupted run never finished
+    assert processed == ['u1@example.com', 'u4@example.com', 'u5@example.com']
+    assert final['in_progress'] is False
+    assert final['completed_count'] == 6 and final['failed_count'] == 0
+    assert final['processed_offset'] == 6 and final['record_results'] == {}
+    assert not (tmp_path / 'v2' / 'run_state.journal.jsonl').exists()
+    assert 'u5@example.com' in (tmp_path / 'v2' / 'report.html').read_text(encoding='utf-8')
+
+
+class _SettingsApi:
+    """Fake API with voicemail and intercept settings; records every call."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+        self.people = SimpleNamespace(details=self._details)
+        self.licenses = SimpleNamespace(assign_licenses_to_users=self._call('assign'))
+        self.person_settings = SimpleNamespace(
+            voicemail=SimpleNamespace(read=self._call('voicemail.read', {'enabled': True}),
+                                      configure=self._call('voicemail.configure')),
+            call_intercept=SimpleNamespace(read=self._call('intercept.read', {'enabled': True}),
+                                           configure=self._call('intercept.configure')),
+        )
+
+    def _call(self, name: str, value=None):
+        async def call(**kwargs):
+            self.calls.append(name)
+            await asyncio.sleep(0)
+            return value
+        return call
+
+    async def _details(self, **kwargs):
+        self.calls.append('details')
+        return {'licenses': ['lic-1'], 'locationId': 'loc-1', 'extension': '1001'}
+
+
+def test_process_record_skips_matching_stages_and_writes_the_rest() -> None:
+    api = _SettingsApi()
+    runner = V2Runner(token='t', out_dir=Path('.'))
+    record = _record(voicemail_enabled=True, intercept_enabled=False)
+    policy = {'voicemail_defaults': {'enabled': True}, 'intercept_defaults': {'enabled': False}}
+    resolvers = {'email_to_person_id': {'user@example.com': 'p1'}, 'location_name_to_id': {}}
+    decisions = {stage: (StageDecision.YES, None) for stage in Stage}
+
+    result, failures, changes = asyncio.run(runner._process_record(api, record, resolvers, policy, decisions, {}))
+
+    assert result.status == 'success' and failures == []
+    assert [(c.stage, c.status) for c in changes] == [
+        ('assign_calling_license', 'skipped'), ('apply_voicemail', 'skipped'), ('apply_call_intercept', 'success'),
+    ]
+    # one prefetch read per stage, then a write and a read back only where something changed
+    assert sorted(api.calls) == sorted(['details', 'voicemail.read', 'intercept.read', 'intercept.configure',
+                                        'intercept.read', 'details'])
@@ -50,3 +50,50 @@ def test_load_v1_maps_reads_csv_inventory(tmp_path: Path) -> None:
     assert maps['email_to_person_id']['u@example.com'] == 'p-1'
     assert maps['location_name_to_id']['madrid'] == 'l-1'
     assert maps['queue_name_to_id']['q1'] == 'q-1'
+
+
+def test_run_journal_survives_without_compaction(tmp_path: Path) -> None:
+    from Space_OdT.v2.io import RunJournal, load_run_state
+    from Space_OdT.v2.models import RecordResult
+
+    state_path = tmp_path / 'run_state.json'
+    journal = RunJournal(state_path, load_run_state(state_path), compact_every=100)
+    journal.append(RecordResult('a@example.com', 'success'))
+    journal.append(RecordResult('b@example.com', 'failed', 'apply_forwarding'))
+
+    # no compaction yet: the results are only in the journal
+    assert not state_path.exists()
+    state = load_run_state(state_path)
+    assert state['record_results']['b@example.com']['failed_stage'] == 'apply_forwarding'
+
+    journal.close()
+    assert load_run_state(state_path)['failed_count'] == 1
+
+
+def test_run_journal_keeps_only_failures_and_in_progress_results(tmp_path: Path) -> None:
+    from Space_OdT.v2.io import RunJournal, load_run_state
+    from Space_OdT.v2.models import RecordResult
+
+    state_path = tmp_path / 'run_state.json'
+    state = load_run_state(state_path)
+    journal = RunJournal(state_path, state, compact_every=1000)
+    largest = 0
+    total = 20_000
+    # records finish slightly out of order, as they do in the worker pool
+    for base in range(0, total, 4):
+        for index in (base + 1, base, base + 3, base + 2):
+            email = f'u{index}@example.com'
+            journal.start(index, email)
+            journal.append(RecordResult(email, 'failed' if index % 1000 == 0 else 'success'))
+            largest = max(largest, len(state['record_results']))
+
+    assert largest <= 20 + 2
+    assert state['processed_offset'] == total
+    assert state['completed_count'] == total - 20 and state['failed_count'] == 20
+    assert sorted(state['record_results']) == sorted(f'u{i}@example.com' for i in range(0, total, 1000))
+
+    # a crash before the next compaction: the journal replays to the same state
+    replayed = load_run_state(state_path)
+    assert replayed['processed_offset'] == total
+    assert replayed['failed_count'] == 20 and len(replayed['record_results']) == 20
+    journal.close()
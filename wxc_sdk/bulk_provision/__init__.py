@@ -3,7 +3,8 @@ Bulk provision bot components.
 """
 
 from .config import Config
-from .data_pipeline import DataPipelineResult, UserRow, WorkspaceRow, DeviceRow, SiteBundle
+from .data_pipeline import DataPipelineResult, UserRow, WorkspaceRow, DeviceRow, SiteBundle, StreamingPipeline, \
+    stream_pipeline
 from .executor import Executor
 
 __all__ = [
@@ -13,5 +14,7 @@ __all__ = [
     "WorkspaceRow",
     "DeviceRow",
     "SiteBundle",
+    "StreamingPipeline",
+    "stream_pipeline",
     "Executor",
 ]
@@ -1,6 +1,10 @@
+import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
-from typing import Optional
+from itertools import islice
+from typing import Any, Optional, TypeVar
 
+from wxc_sdk.locations import Location, LocationAddress
 from wxc_sdk.people import Person
 from wxc_sdk.workspaces import Workspace
 
@@ -11,6 +15,21 @@ def parse_semicolon_list(value: Optional[str]) -> list[str]:
     return [item.strip() for item in value.split(";") if item.strip()]
 
 
+def normalize_mac(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return re.sub(r"[^0-9A-Fa-f]", "", value).upper() or None
+
+
+T = TypeVar("T")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 def email_display_name(email: str) -> str:
     local = email.split("@")[0]
     return local.replace(".", " ").replace("_", " ").title()
@@ -23,13 +42,34 @@ class LocationIdentity:
     external_id: Optional[str]
 
 
-def build_person(*, email: str, location_id: str, licenses: Optional[list[str]] = None) -> Person:
-    return Person(
-        emails=[email],
-        display_name=email_display_name(email),
-        location_id=location_id,
-        licenses=licenses,
-    )
+def build_person(
+    *,
+    email: str,
+    location_id: str,
+    licenses: Optional[list[str]] = None,
+    display_name: Optional[str] = None,
+) -> Person:
+    """
+    Person with only the fields the CSV supplies set
+
+    An empty licence list means no licence profile was given; planning and updates must not strip the remote
+    licences or overwrite the remote display name. See :func:`person_for_create` for the create defaults
+    """
+    values: dict[str, Any] = {"emails": [email], "location_id": location_id}
+    if display_name:
+        values["display_name"] = display_name
+    if licenses:
+        values["licenses"] = licenses
+    return Person(**values)
+
+
+def person_for_create(person: Person) -> Person:
+    """
+    Person to create: the display name defaults to one derived from the email
+    """
+    if person.display_name:
+        return person
+    return person.model_copy(update={"display_name": email_display_name(person.emails[0])})
 
 
 def build_workspace(
@@ -39,9 +79,25 @@ def build_workspace(
     external_id: Optional[str],
     licenses: Optional[list[str]] = None,
 ) -> Workspace:
-    return Workspace(
-        display_name=display_name,
-        location_id=location_id,
-        external_id=external_id,
-        licenses=licenses,
-    )
+    values: dict[str, Any] = {"display_name": display_name, "location_id": location_id, "external_id": external_id}
+    if licenses:
+        values["licenses"] = licenses
+    return Workspace(**values)
+
+
+LOCATION_FIELDS = ("name", "time_zone", "preferred_language", "announcement_language", "latitude", "longitude", "notes")
+LOCATION_ADDRESS_FIELDS = ("address1", "address2", "city", "state", "postal_code", "country")
+
+
+def build_location(payload: dict[str, Any]) -> Location:
+    """
+    Location with only the fields present in the payload set
+
+    ``Location.update()`` sends every set field, None included; fields missing from the CSV must stay unset so an
+    update does not clear their remote values
+    """
+    values = {name: payload[name] for name in LOCATION_FIELDS if payload.get(name) is not None}
+    address = {name: payload[name] for name in LOCATION_ADDRESS_FIELDS if payload.get(name) is not None}
+    if address:
+        values["address"] = LocationAddress(**address)
+    return Location(**values)
@@ -23,7 +23,6 @@ class Config:
     max_rows_users: int
     request_timeout_seconds: int
     max_retries: int
-    circuit_breaker_threshold: float
     enable_safe_compensation: bool
     log_level: str
     http_proxy: Optional[str]
@@ -31,6 +30,11 @@ class Config:
     no_proxy: Optional[str]
     ssl_verify: bool
     requests_ca_bundle: Optional[str]
+    plan_only: bool = False
+    device_concurrency: int = 8
+    circuit_breaker_failures: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+    metrics_interval_seconds: float = 10.0
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -58,7 +62,6 @@ class Config:
             max_rows_users=int(os.getenv("MAX_ROWS_USERS", "21000")),
             request_timeout_seconds=int(os.getenv("REQUEST_TIMEOUT_SECONDS", "20")),
             max_retries=int(os.getenv("MAX_RETRIES", "5")),
-            circuit_breaker_threshold=float(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "0.80")),
             enable_safe_compensation=_env_bool(os.getenv("ENABLE_SAFE_COMPENSATION"), False),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
             http_proxy=os.getenv("HTTP_PROXY"),
@@ -66,4 +69,9 @@ class Config:
             no_proxy=os.getenv("NO_PROXY"),
             ssl_verify=_env_bool(os.getenv("SSL_VERIFY"), True),
             requests_ca_bundle=os.getenv("REQUESTS_CA_BUNDLE"),
+            plan_only=_env_bool(os.getenv("PLAN_ONLY"), False),
+            device_concurrency=int(os.getenv("DEVICE_CONCURRENCY", "8")),
+            circuit_breaker_failures=int(os.getenv("CIRCUIT_BREAKER_FAILURES", "5")),
+            circuit_breaker_reset_seconds=float(os.getenv("CIRCUIT_BREAKER_RESET_SECONDS", "30")),
+            metrics_interval_seconds=float(os.getenv("METRICS_INTERVAL_SECONDS", "10")),
         )
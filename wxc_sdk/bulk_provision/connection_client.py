@@ -1,6 +1,11 @@
 import logging
-from dataclasses import dataclass
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
 from typing import Any, Optional
+from urllib.parse import urlparse
 
 from requests import Response
 from tenacity import RetryCallState, Retrying, retry_if_exception, stop_after_attempt, wait_exponential_jitter
@@ -10,8 +15,143 @@ from wxc_sdk.tokens import Tokens
 
 log = logging.getLogger(__name__)
 
+# path segments which look like Webex IDs, UUIDs or email addresses
+_ID_SEGMENT = re.compile(r"^([A-Za-z0-9_\-=]{20,}|[0-9a-fA-F\-]{32,}|[^/]+@[^/]+)$")
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of sending a request to an endpoint with an open circuit
+    """
+
+    def __init__(self, endpoint: str):
+        super().__init__(f"circuit open for {endpoint}")
+        self.endpoint = endpoint
+
+
+class CircuitState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures; after ``reset_seconds`` a single probe request is let
+    through (half open) and its outcome closes or re-opens the circuit
+    """
+    endpoint: str
+    failure_threshold: int
+    reset_seconds: float
+    state: CircuitState = CircuitState.closed
+    consecutive_failures: int = 0
+    opened_at: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == CircuitState.closed:
+                return
+            if self.state == CircuitState.open and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = CircuitState.half_open
+                log.info("circuit_half_open", extra={"endpoint": self.endpoint})
+                return
+            raise CircuitOpenError(self.endpoint)
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CircuitState.closed:
+                log.info("circuit_closed", extra={"endpoint": self.endpoint})
+            self.state = CircuitState.closed
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CircuitState.half_open or self.consecutive_failures >= self.failure_threshold:
+                if self.state != CircuitState.open:
+                    log.warning(
+                        "circuit_open",
+                        extra={"endpoint": self.endpoint, "consecutive_failures": self.consecutive_failures},
+                    )
+                self.state = CircuitState.open
+                self.opened_at = time.monotonic()
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """
+    Endpoint a request is accounted to: method and URL path with IDs replaced by placeholders
+    """
+    path = urlparse(url).path
+    segments = ["{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+@dataclass
+class CircuitBreakers:
+    failure_threshold: int
+    reset_seconds: float
+    _breakers: dict[str, CircuitBreaker] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def for_endpoint(self, method: str, url: str) -> CircuitBreaker:
+        key = endpoint_key(method, url)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    endpoint=key, failure_threshold=self.failure_threshold, reset_seconds=self.reset_seconds
+                )
+                self._breakers[key] = breaker
+            return breaker
+
+
+class CircuitBreakerSession(RestSession):
+    """
+    Rest session which fails fast on endpoints with an open circuit
+
+    5xx responses, connection errors and any unexpected exception count as failures; any other response closes the
+    circuit. With a ``retrying`` policy every request is retried by the session itself, so SDK API calls made on this
+    session get the same retries and timeout as :meth:`ConnectionClient.request`.
+    """
+
+    def __init__(self, *, breakers: CircuitBreakers, retrying: Optional[Retrying] = None,
+                 timeout_seconds: Optional[float] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.breakers = breakers
+        self.retrying = retrying
+        self.timeout_seconds = timeout_seconds
+
+    def _request_w_response(self, method: str, url: str, *args, **kwargs):
+        if self.timeout_seconds is not None:
+            kwargs.setdefault("timeout", self.timeout_seconds)
+        if self.retrying is None:
+            return self._attempt(method, url, *args, **kwargs)
+        return self.retrying(self._attempt, method, url, *args, **kwargs)
+
+    def _attempt(self, method: str, url: str, *args, **kwargs):
+        breaker = self.breakers.for_endpoint(method, url)
+        breaker.before_call()
+        try:
+            result = super()._request_w_response(method, url, *args, **kwargs)
+        except RestError as exc:
+            if exc.response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        except BaseException:
+            # connection errors, but also anything else: a half open probe must always be resolved
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        return result
+
 
 def _should_retry(exc: Exception) -> bool:
+    if isinstance(exc, CircuitOpenError):
+        return False
     if isinstance(exc, RestError):
         status = exc.response.status_code
         return status == 429 or status >= 500
@@ -44,17 +184,34 @@ class ConnectionClient:
     proxy_url: Optional[str] = None
     ca_bundle: Optional[str] = None
     session: Optional[RestSession] = None
+    concurrent_requests: int = 1
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
 
     def __post_init__(self) -> None:
-        session = RestSession(
-            tokens=Tokens(access_token=self.token),
-            concurrent_requests=1,
-            retry_429=False,
-            proxy_url=self.proxy_url,
-            verify=self.ca_bundle or self.verify,
+        # one retry policy for all requests; tenacity keeps per-call state in the call itself
+        self._retrying = Retrying(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_exponential_jitter(multiplier=1, max=10),
+            retry=retry_if_exception(_should_retry),
+            reraise=True,
+            before_sleep=_before_sleep,
         )
-        session.BASE = self.base_url
-        self.session = session
+        if self.session is None:
+            session = CircuitBreakerSession(
+                breakers=CircuitBreakers(
+                    failure_threshold=self.breaker_failure_threshold, reset_seconds=self.breaker_reset_seconds
+                ),
+                retrying=self._retrying,
+                timeout_seconds=self.timeout_seconds,
+                tokens=Tokens(access_token=self.token),
+                concurrent_requests=self.concurrent_requests,
+                retry_429=False,
+                proxy_url=self.proxy_url,
+                verify=self.ca_bundle or self.verify,
+            )
+            session.BASE = self.base_url
+            self.session = session
 
     def request(
         self,
@@ -66,14 +223,6 @@ class ConnectionClient:
         headers: Optional[dict[str, str]] = None,
         ignore_status: Optional[int] = None,
     ) -> ResponseData:
-        retrying = Retrying(
-            stop=stop_after_attempt(self.max_retries),
-            wait=wait_exponential_jitter(multiplier=1, max=10),
-            retry=retry_if_exception(_should_retry),
-            reraise=True,
-            before_sleep=_before_sleep,
-        )
-
         def _do_request() -> ResponseData:
             response, data = self.session._request_w_response(
                 method,
@@ -86,4 +235,7 @@ class ConnectionClient:
             )
             return ResponseData(response=response, data=data)
 
-        return retrying(_do_request)
+        if isinstance(self.session, CircuitBreakerSession) and self.session.retrying is not None:
+            # the session applies the retry policy itself
+            return _do_request()
+        return self._retrying(_do_request)
@@ -1,7 +1,8 @@
 import csv
 import hashlib
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from typing import Any, Optional
 
@@ -56,6 +57,12 @@ class DataPipelineResult:
     rejected: list[RejectedRow]
 
 
+RejectHandler = Callable[[RejectedRow], None]
+
+HASH_CHUNK_SIZE = 1024 * 1024
+# 128-bit digests: an accidental collision (a new key taken for a duplicate) is negligible at any CSV size
+KEY_DIGEST_SIZE = 16
+
 USERS_HEADER = [
     "email",
     "location_key",
@@ -101,6 +108,9 @@ DEVICES_HEADER = [
     "notes",
 ]
 
+#: optional trailing columns of devices.csv
+DEVICES_OPTIONAL_HEADER = ["mac"]
+
 
 def _normalize_value(value: Optional[str]) -> Optional[str]:
     if value is None:
@@ -119,29 +129,199 @@ def _load_site_bundle(input_dir: Path) -> SiteBundle:
     return SiteBundle(payload=payload, input_hash=input_hash, locations=locations)
 
 
-def _hash_file(path: Path, current: hashlib._hashlib.HASH) -> None:
-    current.update(path.read_bytes())
+def _hash_file(path: Path, current: hashlib._hashlib.HASH) -> int:
+    """
+    Update the hash with the file content; returns the number of lines
+    """
+    lines = 0
+    last = b""
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            current.update(chunk)
+            lines += chunk.count(b"\n")
+            last = chunk
+    if last and not last.endswith(b"\n"):
+        lines += 1
+    return lines
 
 
-def _bundle_hash(paths: list[Path]) -> str:
+def _bundle_hash(paths: list[Path]) -> tuple[str, dict[Path, int]]:
     current = hashlib.sha256()
-    for path in paths:
-        _hash_file(path, current)
-    return current.hexdigest()
+    lines = {path: _hash_file(path, current) for path in paths}
+    return current.hexdigest(), lines
+
+
+class _KeySet:
+    """
+    Duplicate detection on 16-byte key digests instead of the full keys
+    """
+
+    def __init__(self) -> None:
+        self._digests: set[bytes] = set()
 
+    def add(self, key: str) -> bool:
+        """
+        Register a key; returns False if the key was seen before
+        """
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=KEY_DIGEST_SIZE).digest()
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
 
-def _load_csv_rows(path: Path) -> list[dict[str, Any]]:
+
+def _check_header(path: Path, expected: list[str], optional: Optional[list[str]] = None) -> None:
+    with path.open("r", newline="") as handle:
+        header = next(csv.reader(handle), None)
+    if header != expected and header != expected + (optional or []):
+        raise AssertionError(f"{path.name} header mismatch")
+
+
+def _iter_csv_rows(path: Path) -> Iterator[tuple[int, dict[str, Optional[str]]]]:
     with path.open("r", newline="") as handle:
         reader = csv.DictReader(handle)
-        return list(reader)
+        for row_id, row in enumerate(reader, 2):
+            yield row_id, {k: _normalize_value(v) for k, v in row.items()}
 
 
-def build_pipeline(input_dir: Path) -> DataPipelineResult:
+def _reject(on_reject: Optional[RejectHandler], rejected: RejectedRow) -> None:
+    if on_reject is not None:
+        on_reject(rejected)
+
+
+def iter_users(path: Path, on_reject: Optional[RejectHandler] = None) -> Iterator[UserRow]:
+    seen = _KeySet()
+    for row_id, normalized in _iter_csv_rows(path):
+        email = normalized.get("email")
+        location_key = normalized.get("location_key")
+        if not email or not location_key:
+            _reject(
+                on_reject,
+                RejectedRow(
+                    row_id=row_id,
+                    reason_code=ReasonCode.invalid_input_schema,
+                    reason_message="Missing required fields",
+                    raw_row_minified=str({"email": email, "location_key": location_key}),
+                ),
+            )
+            continue
+        if not seen.add(email):
+            _reject(
+                on_reject,
+                RejectedRow(
+                    row_id=row_id,
+                    reason_code=ReasonCode.duplicate_key,
+                    reason_message=f"Duplicate email {email}",
+                    raw_row_minified=str({"email": email}),
+                ),
+            )
+            continue
+        yield UserRow(
+            row_id=row_id,
+            entity_key=email,
+            location_key=location_key,
+            data=normalized,
+        )
+
+
+def iter_workspaces(path: Path, on_reject: Optional[RejectHandler] = None) -> Iterator[WorkspaceRow]:
+    seen = _KeySet()
+    for row_id, normalized in _iter_csv_rows(path):
+        name = normalized.get("workspace_display_name")
+        location_key = normalized.get("location_key")
+        if not name or not location_key:
+            _reject(
+                on_reject,
+                RejectedRow(
+                    row_id=row_id,
+                    reason_code=ReasonCode.invalid_input_schema,
+                    reason_message="Missing required fields",
+                    raw_row_minified=str({"workspace_display_name": name, "location_key": location_key}),
+                ),
+            )
+            continue
+        if not seen.add(name):
+            _reject(
+                on_reject,
+                RejectedRow(
+                    row_id=row_id,
+                    reason_code=ReasonCode.duplicate_key,
+                    reason_message=f"Duplicate workspace {name}",
+                    raw_row_minified=str({"workspace_display_name": name}),
+                ),
+            )
+            continue
+        yield WorkspaceRow(
+            row_id=row_id,
+            entity_key=name,
+            location_key=location_key,
+            data=normalized,
+        )
+
+
+def iter_devices(path: Path, on_reject: Optional[RejectHandler] = None) -> Iterator[DeviceRow]:
+    for row_id, normalized in _iter_csv_rows(path):
+        device_type = normalized.get("device_type")
+        owner_key = normalized.get("owner_key")
+        location_key = normalized.get("location_key")
+        action = normalized.get("action")
+        if not device_type or not owner_key or not location_key or not action:
+            _reject(
+                on_reject,
+                RejectedRow(
+                    row_id=row_id,
+                    reason_code=ReasonCode.invalid_input_schema,
+                    reason_message="Missing required fields",
+                    raw_row_minified=str(
+                        {
+                            "device_type": device_type,
+                            "owner_key": owner_key,
+                            "location_key": location_key,
+                            "action": action,
+                        }
+                    ),
+                ),
+            )
+            continue
+        yield DeviceRow(
+            row_id=row_id,
+            entity_key=f"{device_type}:{owner_key}",
+            location_key=location_key,
+            data=normalized,
+        )
+
+
+@dataclass(frozen=True)
+class StreamingPipeline:
+    """
+    Validated input bundle; rows are read lazily from the CSV files
+
+    Each call to :meth:`users`, :meth:`workspaces` or :meth:`devices` starts a new pass over the respective file.
+    Rejected rows are reported through ``on_reject`` as they are encountered.
+    """
+    site_bundle: SiteBundle
+    users_path: Path
+    workspaces_path: Optional[Path]
+    devices_path: Optional[Path]
+    #: number of data lines per entity type; an estimate as quoted fields can span lines
+    row_estimates: dict[str, int] = field(default_factory=dict)
+
+    def users(self, on_reject: Optional[RejectHandler] = None) -> Iterator[UserRow]:
+        return iter_users(self.users_path, on_reject)
+
+    def workspaces(self, on_reject: Optional[RejectHandler] = None) -> Iterator[WorkspaceRow]:
+        if self.workspaces_path is None:
+            return iter(())
+        return iter_workspaces(self.workspaces_path, on_reject)
+
+    def devices(self, on_reject: Optional[RejectHandler] = None) -> Iterator[DeviceRow]:
+        if self.devices_path is None:
+            return iter(())
+        return iter_devices(self.devices_path, on_reject)
+
+
+def stream_pipeline(input_dir: Path) -> StreamingPipeline:
     site_bundle = _load_site_bundle(input_dir)
-    rejected: list[RejectedRow] = []
-    users: list[UserRow] = []
-    workspaces: list[WorkspaceRow] = []
-    devices: list[DeviceRow] = []
 
     users_path = input_dir / "users.csv"
     workspaces_path = input_dir / "workspaces.csv"
@@ -150,136 +330,42 @@ def build_pipeline(input_dir: Path) -> DataPipelineResult:
     assert users_path.exists(), "users.csv is required"
 
     expected_paths = [users_path, input_dir / "site.json"]
+    _check_header(users_path, USERS_HEADER)
     if workspaces_path.exists():
+        _check_header(workspaces_path, WORKSPACES_HEADER)
         expected_paths.append(workspaces_path)
     if devices_path.exists():
+        _check_header(devices_path, DEVICES_HEADER, DEVICES_OPTIONAL_HEADER)
         expected_paths.append(devices_path)
 
-    bundle_hash = _bundle_hash(expected_paths)
+    bundle_hash, lines = _bundle_hash(expected_paths)
+    row_estimates = {
+        entity_type: max(lines[path] - 1, 0)
+        for entity_type, path in (("user", users_path), ("workspace", workspaces_path), ("device", devices_path))
+        if path in lines
+    }
     site_bundle = SiteBundle(
         payload=site_bundle.payload,
         input_hash=bundle_hash,
         locations=site_bundle.locations,
     )
+    return StreamingPipeline(
+        site_bundle=site_bundle,
+        users_path=users_path,
+        workspaces_path=workspaces_path if workspaces_path.exists() else None,
+        devices_path=devices_path if devices_path.exists() else None,
+        row_estimates=row_estimates,
+    )
 
-    with users_path.open("r", newline="") as handle:
-        reader = csv.DictReader(handle)
-        if reader.fieldnames != USERS_HEADER:
-            raise AssertionError("users.csv header mismatch")
-        seen = set()
-        for row_id, row in enumerate(reader, 2):
-            normalized = {k: _normalize_value(v) for k, v in row.items()}
-            email = normalized.get("email")
-            location_key = normalized.get("location_key")
-            if not email or not location_key:
-                rejected.append(
-                    RejectedRow(
-                        row_id=row_id,
-                        reason_code=ReasonCode.invalid_input_schema,
-                        reason_message="Missing required fields",
-                        raw_row_minified=str({"email": email, "location_key": location_key}),
-                    )
-                )
-                continue
-            if email in seen:
-                rejected.append(
-                    RejectedRow(
-                        row_id=row_id,
-                        reason_code=ReasonCode.duplicate_key,
-                        reason_message=f"Duplicate email {email}",
-                        raw_row_minified=str({"email": email}),
-                    )
-                )
-                continue
-            seen.add(email)
-            users.append(
-                UserRow(
-                    row_id=row_id,
-                    entity_key=email,
-                    location_key=location_key,
-                    data=normalized,
-                )
-            )
-
-    if workspaces_path.exists():
-        with workspaces_path.open("r", newline="") as handle:
-            reader = csv.DictReader(handle)
-            if reader.fieldnames != WORKSPACES_HEADER:
-                raise AssertionError("workspaces.csv header mismatch")
-            seen = set()
-            for row_id, row in enumerate(reader, 2):
-                normalized = {k: _normalize_value(v) for k, v in row.items()}
-                name = normalized.get("workspace_display_name")
-                location_key = normalized.get("location_key")
-                if not name or not location_key:
-                    rejected.append(
-                        RejectedRow(
-                            row_id=row_id,
-                            reason_code=ReasonCode.invalid_input_schema,
-                            reason_message="Missing required fields",
-                            raw_row_minified=str({"workspace_display_name": name, "location_key": location_key}),
-                        )
-                    )
-                    continue
-                if name in seen:
-                    rejected.append(
-                        RejectedRow(
-                            row_id=row_id,
-                            reason_code=ReasonCode.duplicate_key,
-                            reason_message=f"Duplicate workspace {name}",
-                            raw_row_minified=str({"workspace_display_name": name}),
-                        )
-                    )
-                    continue
-                seen.add(name)
-                workspaces.append(
-                    WorkspaceRow(
-                        row_id=row_id,
-                        entity_key=name,
-                        location_key=location_key,
-                        data=normalized,
-                    )
-                )
-
-    if devices_path.exists():
-        with devices_path.open("r", newline="") as handle:
-            reader = csv.DictReader(handle)
-            if reader.fieldnames != DEVICES_HEADER:
-                raise AssertionError("devices.csv header mismatch")
-            for row_id, row in enumerate(reader, 2):
-                normalized = {k: _normalize_value(v) for k, v in row.items()}
-                device_type = normalized.get("device_type")
-                owner_key = normalized.get("owner_key")
-                location_key = normalized.get("location_key")
-                action = normalized.get("action")
-                if not device_type or not owner_key or not location_key or not action:
-                    rejected.append(
-                        RejectedRow(
-                            row_id=row_id,
-                            reason_code=ReasonCode.invalid_input_schema,
-                            reason_message="Missing required fields",
-                            raw_row_minified=str(
-                                {
-                                    "device_type": device_type,
-                                    "owner_key": owner_key,
-                                    "location_key": location_key,
-                                    "action": action,
-                                }
-                            ),
-                        )
-                    )
-                    continue
-                devices.append(
-                    DeviceRow(
-                        row_id=row_id,
-                        entity_key=f"{device_type}:{owner_key}",
-                        location_key=location_key,
-                        data=normalized,
-                    )
-                )
 
+def build_pipeline(input_dir: Path) -> DataPipelineResult:
+    stream = stream_pipeline(input_dir)
+    rejected: list[RejectedRow] = []
+    users = list(stream.users(rejected.append))
+    workspaces = list(stream.workspaces(rejected.append))
+    devices = list(stream.devices(rejected.append))
     return DataPipelineResult(
-        site_bundle=site_bundle,
+        site_bundle=stream.site_bundle,
         users=users,
         workspaces=workspaces,
         devices=devices,
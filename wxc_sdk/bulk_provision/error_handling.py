@@ -7,6 +7,8 @@ from requests import HTTPError
 
 from wxc_sdk.rest import RestError
 
+from .connection_client import CircuitOpenError
+
 log = logging.getLogger(__name__)
 
 
@@ -21,6 +23,7 @@ class ReasonCode(str, Enum):
     invalid_response_schema = "invalid_response_schema"
     ambiguous_match = "ambiguous_match"
     half_applied = "half_applied"
+    circuit_open = "circuit_open"
 
 
 class ErrorClass(str, Enum):
@@ -68,6 +71,12 @@ def classify_http_status(status_code: int) -> ErrorInfo:
 
 
 def map_exception(exc: Exception) -> ErrorInfo:
+    if isinstance(exc, CircuitOpenError):
+        return ErrorInfo(
+            reason_code=ReasonCode.circuit_open,
+            reason_message=str(exc),
+            error_class=ErrorClass.retryable_external,
+        )
     if isinstance(exc, RestError):
         status_code = exc.response.status_code
         info = classify_http_status(status_code)
@@ -1,25 +1,35 @@
 import json
 import logging
-from dataclasses import dataclass
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Optional
 
 from wxc_sdk import WebexSimpleApi
+from wxc_sdk.devices import Device
 from wxc_sdk.locations import Location
 from wxc_sdk.people import Person
+from wxc_sdk.telephony.devices import MACState
 from wxc_sdk.workspaces import Workspace
 
-from .action_helpers import build_person, build_workspace
+from .action_helpers import build_location, build_person, build_workspace, chunked, normalize_mac, person_for_create
 from .batch_iterator import iter_batches
 from .config import Config
-from .data_pipeline import DataPipelineResult, DeviceRow, SiteBundle, UserRow, WorkspaceRow, build_pipeline
+from .connection_client import ConnectionClient
+from .data_pipeline import DeviceRow, RejectedRow, RejectHandler, SiteBundle, UserRow, WorkspaceRow, stream_pipeline
 from .error_handling import ErrorInfo, ReasonCode, classify_http_status, map_exception
+from .metrics import RunMetrics
+from .planner import PlanAction, PlanDecision, merge_update, plan_entity
 from .state_store import CheckpointStore
 from .writers import Writers
 
 log = logging.getLogger(__name__)
 
+DEVICE_ACTIONS = {"create", "apply_changes"}
+MAC_VALIDATION_CHUNK_SIZE = 100
+
 
 @dataclass
 class ExecutorContext:
@@ -30,6 +40,11 @@ class ExecutorContext:
     checkpoint: CheckpointStore
     run_dir: Path
     location_cache: dict[str, dict[str, Any]]
+    remote_locations: Optional[dict[str, Location]] = None
+    device_owner_keys: frozenset[str] = frozenset()
+    person_index: dict[str, str] = field(default_factory=dict)
+    workspace_index: dict[str, str] = field(default_factory=dict)
+    metrics: RunMetrics = field(default_factory=RunMetrics)
 
 
 class Executor:
@@ -37,22 +52,35 @@ class Executor:
         self.config = config
 
     def run(self) -> None:
-        pipeline = build_pipeline(self.config.input_dir)
+        pipeline = stream_pipeline(self.config.input_dir)
         run_dir = self._run_dir()
         writers = Writers(
             results_path=run_dir / "results.csv",
             pending_path=run_dir / "pending_rows.csv",
             rejected_path=run_dir / "rejected_rows.csv",
+            plan_path=run_dir / "plan.csv",
         )
-        for rejected in pipeline.rejected:
-            writers.write_rejected(
-                row_id=rejected.row_id,
-                reason_code=rejected.reason_code.value,
-                reason_message=rejected.reason_message,
-                raw_row_minified=rejected.raw_row_minified,
-            )
+
         checkpoint = CheckpointStore(run_dir / "checkpoint.json")
-        api = self._build_api()
+        metrics = RunMetrics(path=run_dir / "metrics.json", interval_seconds=self.config.metrics_interval_seconds)
+
+        def on_reject(entity_type: str) -> RejectHandler:
+            def handler(rejected: RejectedRow) -> None:
+                writers.write_rejected(
+                    row_id=rejected.row_id,
+                    reason_code=rejected.reason_code.value,
+                    reason_message=rejected.reason_message,
+                    raw_row_minified=rejected.raw_row_minified,
+                )
+                metrics.record_rejected(entity_type)
+
+            return handler
+
+        metrics.set_total("location", len(pipeline.site_bundle.locations))
+        for entity_type, rows in pipeline.row_estimates.items():
+            metrics.set_total(entity_type, rows)
+        api = self._build_api(self._build_client())
+        api.session.register_response_callback(metrics.on_response)
         context = ExecutorContext(
             config=self.config,
             api=api,
@@ -61,11 +89,17 @@ class Executor:
             checkpoint=checkpoint,
             run_dir=run_dir,
             location_cache={},
+            # only owners of devices are indexed to keep memory independent of the number of users
+            device_owner_keys=frozenset(row.data["owner_key"] for row in pipeline.devices()),
+            metrics=metrics,
         )
-        self._process_locations(context)
-        self._process_users(context, pipeline)
-        self._process_workspaces(context, pipeline)
-        self._process_devices(context, pipeline)
+        try:
+            self._process_locations(context)
+            self._process_users(context, pipeline.users(on_reject("user")))
+            self._process_workspaces(context, pipeline.workspaces(on_reject("workspace")))
+            self._process_devices(context, pipeline.devices(on_reject("device")))
+        finally:
+            metrics.write()
 
     def _run_dir(self) -> Path:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
@@ -73,14 +107,23 @@ class Executor:
         run_dir.mkdir(parents=True, exist_ok=True)
         return run_dir
 
-    def _build_api(self) -> WebexSimpleApi:
-        api = WebexSimpleApi(
-            tokens=self.config.webex_token,
-            retry_429=False,
-            concurrent_requests=1,
+    def _build_client(self) -> ConnectionClient:
+        return ConnectionClient(
+            base_url=self.config.webex_base_url,
+            token=self.config.webex_token,
+            timeout_seconds=self.config.request_timeout_seconds,
+            max_retries=self.config.max_retries,
+            verify=self.config.ssl_verify,
+            proxy_url=self.config.https_proxy or self.config.http_proxy,
+            ca_bundle=self.config.requests_ca_bundle,
+            concurrent_requests=self.config.device_concurrency,
+            breaker_failure_threshold=self.config.circuit_breaker_failures,
+            breaker_reset_seconds=self.config.circuit_breaker_reset_seconds,
         )
-        api.session.BASE = self.config.webex_base_url
-        return api
+
+    def _build_api(self, client: ConnectionClient) -> WebexSimpleApi:
+        # all SDK calls of the run share the pooled session, retry policy and circuit breakers of the connection client
+        return WebexSimpleApi(tokens=self.config.webex_token, session=client.session)
 
     def _process_locations(self, context: ExecutorContext) -> None:
         locations = list(context.site_bundle.locations.values())
@@ -95,33 +138,43 @@ class Executor:
                 row_id = index
                 location_key = location_payload.get("location_key", f"location_{row_id}")
                 try:
-                    location_id = self._lookup_location(context, location_payload)
-                    if location_id:
-                        self._update_location(context, location_id, location_payload)
-                        context.writers.write_result(
-                            batch_id=batch.batch_id,
-                            row_id=row_id,
-                            entity_type="location",
-                            entity_key=location_key,
-                            step="update",
-                            status="success",
-                            http_status=200,
-                            message="updated",
-                            remote_id=location_id,
-                        )
+                    with context.metrics.timed("location", "lookup"):
+                        remote = self._lookup_remote_location(context, location_payload)
+                    desired = build_location(location_payload)
+                    decision = plan_entity(
+                        entity_type="location",
+                        entity_key=location_key,
+                        desired=desired,
+                        remote=remote,
+                        remote_id=remote.location_id if remote else None,
+                    )
+                    self._write_plan(context, batch.batch_id, row_id, decision)
+                    if self.config.plan_only:
+                        continue
+                    if decision.action == PlanAction.create:
+                        with context.metrics.timed("location", "create"):
+                            location_id = self._create_location(context, location_payload)
+                        self._cache_location(context, location_payload, location_id)
+                        message = "created"
+                    elif decision.action == PlanAction.update:
+                        location_id = decision.remote_id
+                        with context.metrics.timed("location", "update"):
+                            self._update_location(context, location_id, desired)
+                        message = "updated"
                     else:
-                        location_id = self._create_location(context, location_payload)
-                        context.writers.write_result(
-                            batch_id=batch.batch_id,
-                            row_id=row_id,
-                            entity_type="location",
-                            entity_key=location_key,
-                            step="create",
-                            status="success",
-                            http_status=200,
-                            message="created",
-                            remote_id=location_id,
-                        )
+                        location_id = decision.remote_id
+                        message = "unchanged"
+                    context.writers.write_result(
+                        batch_id=batch.batch_id,
+                        row_id=row_id,
+                        entity_type="location",
+                        entity_key=location_key,
+                        step=decision.action.value,
+                        status="success",
+                        http_status=200,
+                        message=message,
+                        remote_id=location_id,
+                    )
                     self._write_checkpoint(context, "location", row_id)
                 except Exception as exc:
                     info = map_exception(exc)
@@ -136,11 +189,12 @@ class Executor:
                         http_status=info.http_status,
                         raw_row_minified=json.dumps({"location_key": location_key}),
                     )
-            self._log_batch_end(batch.batch_id, "location")
+            context.metrics.record_rows("location", len(batch.items))
+            self._log_batch_end(batch.batch_id, "location", context.metrics)
 
-    def _process_users(self, context: ExecutorContext, pipeline: DataPipelineResult) -> None:
+    def _process_users(self, context: ExecutorContext, rows: Iterable[UserRow]) -> None:
         for batch in iter_batches(
-            pipeline.users,
+            rows,
             batch_size=self.config.batch_size_users,
             max_rows=self.config.max_rows_users,
             max_batches=self.config.max_rows_users // self.config.batch_size_users + 1,
@@ -148,11 +202,12 @@ class Executor:
             self._log_batch_start(batch.batch_id, "user")
             for row in batch.items:
                 self._process_user_row(context, batch.batch_id, row)
-            self._log_batch_end(batch.batch_id, "user")
+                context.metrics.record_rows("user")
+            self._log_batch_end(batch.batch_id, "user", context.metrics)
 
-    def _process_workspaces(self, context: ExecutorContext, pipeline: DataPipelineResult) -> None:
+    def _process_workspaces(self, context: ExecutorContext, rows: Iterable[WorkspaceRow]) -> None:
         for batch in iter_batches(
-            pipeline.workspaces,
+            rows,
             batch_size=self.config.batch_size_users,
             max_rows=self.config.max_rows_users,
             max_batches=self.config.max_rows_users // self.config.batch_size_users + 1,
@@ -160,31 +215,294 @@ class Executor:
             self._log_batch_start(batch.batch_id, "workspace")
             for row in batch.items:
                 self._process_workspace_row(context, batch.batch_id, row)
-            self._log_batch_end(batch.batch_id, "workspace")
+                context.metrics.record_rows("workspace")
+            self._log_batch_end(batch.batch_id, "workspace", context.metrics)
 
-    def _process_devices(self, context: ExecutorContext, pipeline: DataPipelineResult) -> None:
+    def _process_devices(self, context: ExecutorContext, rows: Iterable[DeviceRow]) -> None:
+        apply_queue: dict[str, tuple[int, DeviceRow]] = {}
+        last_batch_id = 0
         for batch in iter_batches(
-            pipeline.devices,
+            rows,
             batch_size=self.config.batch_size_users,
             max_rows=self.config.max_rows_users,
             max_batches=self.config.max_rows_users // self.config.batch_size_users + 1,
         ):
             self._log_batch_start(batch.batch_id, "device")
+            last_batch_id = batch.batch_id
+            creates: list[tuple[DeviceRow, str]] = []
             for row in batch.items:
-                context.writers.write_pending(
-                    batch_id=batch.batch_id,
+                action = (row.data.get("action") or "").lower()
+                mac = normalize_mac(row.data.get("mac"))
+                if action not in DEVICE_ACTIONS:
+                    self._write_device_pending(
+                        context, batch.batch_id, row, "device", ReasonCode.out_of_scope, f"Unsupported action {action}"
+                    )
+                elif not mac:
+                    self._write_device_pending(
+                        context, batch.batch_id, row, "device", ReasonCode.invalid_input_schema, "Missing MAC address"
+                    )
+                elif action == "create":
+                    creates.append((row, mac))
+                else:
+                    self._queue_apply_changes(context, batch.batch_id, row, mac, apply_queue)
+            creates = self._validate_device_macs(context, batch.batch_id, creates)
+            self._create_devices(context, batch.batch_id, creates, apply_queue)
+            context.metrics.record_rows("device", len(batch.items))
+            self._log_batch_end(batch.batch_id, "device", context.metrics)
+        self._apply_device_changes(context, last_batch_id, apply_queue)
+
+    def _validate_device_macs(
+        self, context: ExecutorContext, batch_id: int, creates: list[tuple[DeviceRow, str]]
+    ) -> list[tuple[DeviceRow, str]]:
+        """
+        Validate MACs of a batch in chunks; returns the rows with available MACs
+        """
+        valid: list[tuple[DeviceRow, str]] = []
+        for chunk in chunked(creates, MAC_VALIDATION_CHUNK_SIZE):
+            try:
+                with context.metrics.timed("device", "validate_mac"):
+                    response = context.api.telephony.devices.validate_macs(
+                        macs=[mac for _, mac in chunk], org_id=context.config.org_id
+                    )
+            except Exception as exc:
+                info = map_exception(exc)
+                for row, _ in chunk:
+                    self._write_device_pending(
+                        context, batch_id, row, "validate_mac", info.reason_code, info.reason_message, info.http_status
+                    )
+                continue
+            states = {normalize_mac(status.mac): status for status in response.mac_status or []}
+            for row, mac in chunk:
+                status = states.get(mac)
+                if status is None or status.state == MACState.available:
+                    valid.append((row, mac))
+                    continue
+                self._write_device_pending(
+                    context,
+                    batch_id,
+                    row,
+                    "validate_mac",
+                    ReasonCode.non_retryable_external,
+                    status.message or f"MAC {mac} {status.state}",
+                )
+        return valid
+
+    def _create_devices(
+        self,
+        context: ExecutorContext,
+        batch_id: int,
+        creates: list[tuple[DeviceRow, str]],
+        apply_queue: dict[str, tuple[int, DeviceRow]],
+    ) -> None:
+        owned: list[tuple[DeviceRow, str, dict[str, str]]] = []
+        for row, mac in creates:
+            try:
+                owner = self._resolve_device_owner(context, row.data["owner_key"])
+            except Exception as exc:
+                info = map_exception(exc)
+                self._write_device_pending(
+                    context, batch_id, row, "lookup_owner", info.reason_code, info.reason_message, info.http_status
+                )
+                continue
+            if owner is None:
+                self._write_device_pending(
+                    context,
+                    batch_id,
+                    row,
+                    "lookup_owner",
+                    ReasonCode.ambiguous_match,
+                    f"Unknown owner_key {row.data['owner_key']}",
+                )
+                continue
+            owned.append((row, mac, owner))
+        if self.config.plan_only:
+            for row, _, _ in owned:
+                self._write_plan(
+                    context,
+                    batch_id,
+                    row.row_id,
+                    PlanDecision(entity_type="device", entity_key=row.entity_key, action=PlanAction.create,
+                                 remote_id=None),
+                )
+            return
+
+        def create(row: DeviceRow, mac: str, owner: dict[str, str]) -> Device:
+            with context.metrics.timed("device", "create"):
+                return context.api.devices.create_by_mac_address(
+                    mac=mac, model=row.data.get("model"), org_id=context.config.org_id, **owner
+                )
+
+        # creates finish out of order: only checkpoint the longest prefix of rows which are all done
+        order = [row.row_id for row, _, _ in owned]
+        finished: set[int] = set()
+        prefix = 0
+        with ThreadPoolExecutor(max_workers=self.config.device_concurrency) as pool:
+            futures = {pool.submit(create, row, mac, owner): row for row, mac, owner in owned}
+            for future in as_completed(futures):
+                row = futures[future]
+                self._record_device_create(context, batch_id, row, future, apply_queue)
+                finished.add(row.row_id)
+                advanced = prefix
+                while prefix < len(order) and order[prefix] in finished:
+                    prefix += 1
+                if prefix > advanced:
+                    self._write_checkpoint(context, "device", order[prefix - 1])
+
+    def _record_device_create(
+        self,
+        context: ExecutorContext,
+        batch_id: int,
+        row: DeviceRow,
+        future: Future,
+        apply_queue: dict[str, tuple[int, DeviceRow]],
+    ) -> None:
+        try:
+            device = future.result()
+        except Exception as exc:
+            info = map_exception(exc)
+            self._write_device_pending(
+                context, batch_id, row, "create", info.reason_code, info.reason_message, info.http_status
+            )
+            return
+        device_id = device and (device.calling_device_id or device.device_id)
+        context.writers.write_result(
+            batch_id=batch_id,
+            row_id=row.row_id,
+            entity_type="device",
+            entity_key=row.entity_key,
+            step="create",
+            status="success",
+            http_status=200,
+            message="created",
+            remote_id=device_id,
+        )
+        if device_id:
+            apply_queue.setdefault(device_id, (batch_id, row))
+
+    def _queue_apply_changes(
+        self,
+        context: ExecutorContext,
+        batch_id: int,
+        row: DeviceRow,
+        mac: str,
+        apply_queue: dict[str, tuple[int, DeviceRow]],
+    ) -> None:
+        try:
+            devices = list(context.api.devices.list(mac=mac, org_id=context.config.org_id))
+        except Exception as exc:
+            info = map_exception(exc)
+            self._write_device_pending(
+                context, batch_id, row, "lookup_device", info.reason_code, info.reason_message, info.http_status
+            )
+            return
+        if len(devices) != 1:
+            self._write_device_pending(
+                context, batch_id, row, "lookup_device", ReasonCode.ambiguous_match,
+                f"{len(devices)} devices with MAC {mac}"
+            )
+            return
+        device = devices[0]
+        apply_queue.setdefault(device.calling_device_id or device.device_id, (batch_id, row))
+
+    def _apply_device_changes(
+        self, context: ExecutorContext, batch_id: int, apply_queue: dict[str, tuple[int, DeviceRow]]
+    ) -> None:
+        """
+        Apply changes once per device after all device rows have been processed
+        """
+        if not apply_queue:
+            return
+        if self.config.plan_only:
+            for device_id, (row_batch_id, row) in apply_queue.items():
+                self._write_plan(
+                    context,
+                    row_batch_id,
+                    row.row_id,
+                    PlanDecision(entity_type="device", entity_key=row.entity_key, action=PlanAction.update,
+                                 remote_id=device_id, changed_fields=("apply_changes",)),
+                )
+            return
+        self._log_batch_start(batch_id, "device_apply_changes")
+
+        def apply_changes(device_id: str) -> None:
+            with context.metrics.timed("device", "apply_changes"):
+                context.api.telephony.devices.apply_changes(device_id=device_id, org_id=context.config.org_id)
+
+        with ThreadPoolExecutor(max_workers=self.config.device_concurrency) as pool:
+            futures = {pool.submit(apply_changes, device_id): device_id for device_id in apply_queue}
+            for future in as_completed(futures):
+                device_id = futures[future]
+                row_batch_id, row = apply_queue[device_id]
+                try:
+                    future.result()
+                except Exception as exc:
+                    info = map_exception(exc)
+                    self._write_device_pending(
+                        context, row_batch_id, row, "apply_changes", info.reason_code, info.reason_message,
+                        info.http_status
+                    )
+                    continue
+                context.writers.write_result(
+                    batch_id=row_batch_id,
                     row_id=row.row_id,
                     entity_type="device",
                     entity_key=row.entity_key,
-                    step="device",
-                    reason_code=ReasonCode.out_of_scope.value,
-                    reason_message="Device operations not implemented",
-                    http_status=None,
-                    raw_row_minified=json.dumps(
-                        {"device_type": row.data.get("device_type"), "owner_key": row.data.get("owner_key")}
-                    ),
+                    step="apply_changes",
+                    status="success",
+                    http_status=204,
+                    message="changes applied",
+                    remote_id=device_id,
                 )
-            self._log_batch_end(batch.batch_id, "device")
+        self._log_batch_end(batch_id, "device_apply_changes", context.metrics)
+
+    def _resolve_device_owner(self, context: ExecutorContext, owner_key: str) -> Optional[dict[str, str]]:
+        """
+        Owner keyword arguments for create_by_mac_address; owners provisioned in this run are resolved from the
+        indexes built in the user and workspace phases
+        """
+        if owner_key in context.person_index:
+            return {"person_id": context.person_index[owner_key]}
+        if owner_key in context.workspace_index:
+            return {"workspace_id": context.workspace_index[owner_key]}
+        if "@" in owner_key:
+            person = self._lookup_person(context, owner_key)
+            if person is None:
+                return None
+            context.person_index[owner_key] = person.person_id
+            return {"person_id": person.person_id}
+        workspace = self._lookup_workspace(context, owner_key)
+        if workspace is None:
+            return None
+        context.workspace_index[owner_key] = workspace.workspace_id
+        return {"workspace_id": workspace.workspace_id}
+
+    def _write_device_pending(
+        self,
+        context: ExecutorContext,
+        batch_id: int,
+        row: DeviceRow,
+        step: str,
+        reason_code: ReasonCode,
+        reason_message: str,
+        http_status: Optional[int] = None,
+    ) -> None:
+        context.writers.write_pending(
+            batch_id=batch_id,
+            row_id=row.row_id,
+            entity_type="device",
+            entity_key=row.entity_key,
+            step=step,
+            reason_code=reason_code.value,
+            reason_message=reason_message,
+            http_status=http_status,
+            raw_row_minified=json.dumps(
+                {
+                    "device_type": row.data.get("device_type"),
+                    "owner_key": row.data.get("owner_key"),
+                    "mac": row.data.get("mac"),
+                }
+            ),
+        )
 
     def _process_user_row(self, context: ExecutorContext, batch_id: int, row: UserRow) -> None:
         location_id = self._resolve_location_id(context, row.location_key)
@@ -204,26 +522,39 @@ class Executor:
         licenses = self._resolve_profile_list(context.site_bundle, "licenses", row.data.get("licenses"))
         person = build_person(email=row.entity_key, location_id=location_id, licenses=licenses)
         try:
-            remote = self._lookup_person(context, row.entity_key)
-            if remote:
-                self._update_person(context, remote.person_id, person)
-                status = "update"
-                remote_id = remote.person_id
-            else:
-                created = context.api.people.create(person)
-                status = "create"
+            with context.metrics.timed("user", "lookup"):
+                remote = self._lookup_person(context, row.entity_key)
+            decision = plan_entity(
+                entity_type="user",
+                entity_key=row.entity_key,
+                desired=person,
+                remote=remote,
+                remote_id=remote.person_id if remote else None,
+            )
+            self._write_plan(context, batch_id, row.row_id, decision)
+            if self.config.plan_only:
+                return
+            remote_id = decision.remote_id
+            if decision.action == PlanAction.create:
+                with context.metrics.timed("user", "create"):
+                    created = context.api.people.create(person_for_create(person))
                 remote_id = created.person_id
+            elif decision.action == PlanAction.update:
+                with context.metrics.timed("user", "update"):
+                    self._update_person(context, remote, person)
             context.writers.write_result(
                 batch_id=batch_id,
                 row_id=row.row_id,
                 entity_type="user",
                 entity_key=row.entity_key,
-                step=status,
+                step=decision.action.value,
                 status="success",
                 http_status=200,
-                message="ok",
+                message="unchanged" if decision.action == PlanAction.noop else "ok",
                 remote_id=remote_id,
             )
+            if remote_id and row.entity_key in context.device_owner_keys:
+                context.person_index[row.entity_key] = remote_id
             self._write_checkpoint(context, "user", row.row_id)
         except Exception as exc:
             info = map_exception(exc)
@@ -262,26 +593,39 @@ class Executor:
             licenses=licenses,
         )
         try:
-            remote = self._lookup_workspace(context, row.entity_key)
-            if remote:
-                self._update_workspace(context, remote.workspace_id, workspace)
-                status = "update"
-                remote_id = remote.workspace_id
-            else:
-                created = context.api.workspaces.create(workspace)
-                status = "create"
+            with context.metrics.timed("workspace", "lookup"):
+                remote = self._lookup_workspace(context, row.entity_key)
+            decision = plan_entity(
+                entity_type="workspace",
+                entity_key=row.entity_key,
+                desired=workspace,
+                remote=remote,
+                remote_id=remote.workspace_id if remote else None,
+            )
+            self._write_plan(context, batch_id, row.row_id, decision)
+            if self.config.plan_only:
+                return
+            remote_id = decision.remote_id
+            if decision.action == PlanAction.create:
+                with context.metrics.timed("workspace", "create"):
+                    created = context.api.workspaces.create(workspace)
                 remote_id = created.workspace_id
+            elif decision.action == PlanAction.update:
+                with context.metrics.timed("workspace", "update"):
+                    self._update_workspace(context, remote, workspace)
             context.writers.write_result(
                 batch_id=batch_id,
                 row_id=row.row_id,
                 entity_type="workspace",
                 entity_key=row.entity_key,
-                step=status,
+                step=decision.action.value,
                 status="success",
                 http_status=200,
-                message="ok",
+                message="unchanged" if decision.action == PlanAction.noop else "ok",
                 remote_id=remote_id,
             )
+            if remote_id and row.entity_key in context.device_owner_keys:
+                context.workspace_index[row.entity_key] = remote_id
             self._write_checkpoint(context, "workspace", row.row_id)
         except Exception as exc:
             info = map_exception(exc)
@@ -297,21 +641,46 @@ class Executor:
                 raw_row_minified=json.dumps({"workspace_display_name": row.entity_key}),
             )
 
+    def _remote_locations(self, context: ExecutorContext) -> dict[str, Location]:
+        if context.remote_locations is None:
+            remote_locations: dict[str, Location] = {}
+            for location in context.api.locations.list():
+                remote_locations.setdefault(location.name, location)
+                external_id = getattr(location, "external_id", None)
+                if external_id:
+                    remote_locations.setdefault(external_id, location)
+            context.remote_locations = remote_locations
+        return context.remote_locations
+
+    def _lookup_remote_location(self, context: ExecutorContext, payload: dict[str, Any]) -> Optional[Location]:
+        name = payload.get("location_name") or payload.get("name")
+        external_id = payload.get("location_external_id") or payload.get("external_id")
+        remote_locations = self._remote_locations(context)
+        if external_id and external_id in remote_locations:
+            return remote_locations[external_id]
+        if name and name in remote_locations:
+            return remote_locations[name]
+        return None
+
     def _lookup_location(self, context: ExecutorContext, payload: dict[str, Any]) -> Optional[str]:
         name = payload.get("location_name") or payload.get("name")
         external_id = payload.get("location_external_id") or payload.get("external_id")
         cache_key = external_id or name
         if cache_key and cache_key in context.location_cache:
             return context.location_cache[cache_key]["location_id"]
-        locations = list(context.api.locations.list())
-        for location in locations:
-            if external_id and getattr(location, "external_id", None) == external_id:
-                context.location_cache[cache_key] = {"location_id": location.location_id}
-                return location.location_id
-            if name and location.name == name:
-                context.location_cache[cache_key] = {"location_id": location.location_id}
-                return location.location_id
-        return None
+        location = self._lookup_remote_location(context, payload)
+        if location is None:
+            return None
+        if cache_key:
+            context.location_cache[cache_key] = {"location_id": location.location_id}
+        return location.location_id
+
+    def _cache_location(self, context: ExecutorContext, payload: dict[str, Any], location_id: str) -> None:
+        name = payload.get("location_name") or payload.get("name")
+        external_id = payload.get("location_external_id") or payload.get("external_id")
+        cache_key = external_id or name
+        if cache_key:
+            context.location_cache[cache_key] = {"location_id": location_id}
 
     def _create_location(self, context: ExecutorContext, payload: dict[str, Any]) -> str:
         return context.api.locations.create(
@@ -331,23 +700,25 @@ class Executor:
             org_id=context.config.org_id,
         )
 
-    def _update_location(self, context: ExecutorContext, location_id: str, payload: dict[str, Any]) -> None:
-        settings = Location.model_validate(payload)
+    def _update_location(self, context: ExecutorContext, location_id: str, settings: Location) -> None:
         context.api.locations.update(location_id=location_id, settings=settings, org_id=context.config.org_id)
 
     def _lookup_person(self, context: ExecutorContext, email: str) -> Optional[Person]:
-        people = list(context.api.people.list(email=email))
+        # calling data is needed to compare the location
+        people = list(context.api.people.list(email=email, calling_data=True))
         return people[0] if people else None
 
-    def _update_person(self, context: ExecutorContext, person_id: str, person: Person) -> None:
-        context.api.people.update(person_id=person_id, settings=person)
+    def _update_person(self, context: ExecutorContext, remote: Person, person: Person) -> None:
+        # the people API expects all details on update
+        context.api.people.update(person=merge_update(remote, person))
 
     def _lookup_workspace(self, context: ExecutorContext, display_name: str) -> Optional[Workspace]:
         workspaces = list(context.api.workspaces.list(display_name=display_name))
         return workspaces[0] if workspaces else None
 
-    def _update_workspace(self, context: ExecutorContext, workspace_id: str, workspace: Workspace) -> None:
-        context.api.workspaces.update(workspace_id=workspace_id, settings=workspace)
+    def _update_workspace(self, context: ExecutorContext, remote: Workspace, workspace: Workspace) -> None:
+        # optional fields missing from the update are cleared, hence send the merged remote state
+        context.api.workspaces.update(workspace_id=remote.workspace_id, settings=merge_update(remote, workspace))
 
     def _resolve_location_id(self, context: ExecutorContext, location_key: str) -> Optional[str]:
         location_payload = context.site_bundle.locations.get(location_key)
@@ -364,6 +735,17 @@ class Executor:
             return []
         return profile if isinstance(profile, list) else []
 
+    def _write_plan(self, context: ExecutorContext, batch_id: int, row_id: int, decision: PlanDecision) -> None:
+        context.writers.write_plan(
+            batch_id=batch_id,
+            row_id=row_id,
+            entity_type=decision.entity_type,
+            entity_key=decision.entity_key,
+            action=decision.action.value,
+            remote_id=decision.remote_id,
+            changed_fields=decision.changed_fields,
+        )
+
     def _write_checkpoint(self, context: ExecutorContext, phase: str, last_item_id: int) -> None:
         payload = {
             "pipeline_version": context.config.pipeline_version,
@@ -381,8 +763,13 @@ class Executor:
             extra={"batch_id": batch_id, "entity_type": entity_type},
         )
 
-    def _log_batch_end(self, batch_id: int, entity_type: str) -> None:
-        log.info(
-            "batch_end",
-            extra={"batch_id": batch_id, "entity_type": entity_type},
-        )
+    def _log_batch_end(self, batch_id: int, entity_type: str, metrics: Optional[RunMetrics] = None) -> None:
+        extra = {"batch_id": batch_id, "entity_type": entity_type}
+        if metrics is not None:
+            eta = metrics.eta_seconds()
+            extra.update(
+                rows_per_second=round(metrics.rows_per_second(), 2),
+                eta_seconds=None if eta is None else round(eta),
+            )
+            metrics.maybe_write()
+        log.info("batch_end", extra=extra)
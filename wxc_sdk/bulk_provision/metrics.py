@@ -0,0 +1,164 @@
+import json
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+#: number of most recent latency samples kept per entity type and step
+LATENCY_SAMPLES = 1024
+#: window for the rolling throughput in seconds
+THROUGHPUT_WINDOW_SECONDS = 60
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+@dataclass
+class RunMetrics:
+    """
+    Throughput, step latency and API call counters of a run
+
+    Memory is bounded: latencies are kept for the most recent :data:`LATENCY_SAMPLES` calls per step and throughput
+    is kept in one bucket per second for the last :data:`THROUGHPUT_WINDOW_SECONDS` seconds.
+
+    Totals are line counts of the input files and include rows rejected at validation; those are reported through
+    :meth:`record_rejected` so that they count against the total without adding to the throughput.
+    """
+    path: Optional[Path] = None
+    interval_seconds: float = 10.0
+    started: float = field(default_factory=time.monotonic)
+    api_calls: int = 0
+    rows_total: dict[str, int] = field(default_factory=dict)
+    rows_done: dict[str, int] = field(default_factory=dict)
+    rows_rejected: dict[str, int] = field(default_factory=dict)
+    _latencies: dict[tuple[str, str], deque] = field(default_factory=dict)
+    _step_counts: dict[tuple[str, str], int] = field(default_factory=dict)
+    _buckets: deque = field(default_factory=deque)
+    _last_write: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _write_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def set_total(self, entity_type: str, rows: int) -> None:
+        with self._lock:
+            self.rows_total[entity_type] = rows
+
+    def on_response(self, response: Any, diff_ns: int) -> None:
+        """
+        Response callback for :meth:`wxc_sdk.rest.RestSession.register_response_callback`
+        """
+        with self._lock:
+            self.api_calls += 1
+
+    def record_step(self, entity_type: str, step: str, seconds: float) -> None:
+        key = (entity_type, step)
+        with self._lock:
+            samples = self._latencies.get(key)
+            if samples is None:
+                samples = self._latencies[key] = deque(maxlen=LATENCY_SAMPLES)
+            samples.append(seconds)
+            self._step_counts[key] = self._step_counts.get(key, 0) + 1
+
+    @contextmanager
+    def timed(self, entity_type: str, step: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_step(entity_type, step, time.perf_counter() - start)
+
+    def record_rows(self, entity_type: str, rows: int = 1) -> None:
+        now = int(time.monotonic())
+        with self._lock:
+            self.rows_done[entity_type] = self.rows_done.get(entity_type, 0) + rows
+            if self._buckets and self._buckets[-1][0] == now:
+                self._buckets[-1][1] += rows
+            else:
+                self._buckets.append([now, rows])
+            self._expire_buckets(now)
+        self.maybe_write()
+
+    def record_rejected(self, entity_type: str, rows: int = 1) -> None:
+        with self._lock:
+            self.rows_rejected[entity_type] = self.rows_rejected.get(entity_type, 0) + rows
+
+    def _expire_buckets(self, now: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now - THROUGHPUT_WINDOW_SECONDS:
+            self._buckets.popleft()
+
+    def rows_per_second(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_buckets(int(now))
+            rows = sum(count for _, count in self._buckets)
+        window = min(THROUGHPUT_WINDOW_SECONDS, max(now - self.started, 1.0))
+        return rows / window
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.rows_per_second()
+        with self._lock:
+            remaining = sum(max(total - self.rows_done.get(entity_type, 0) - self.rows_rejected.get(entity_type, 0), 0)
+                            for entity_type, total in self.rows_total.items())
+        if not remaining:
+            return 0.0
+        if not rate:
+            return None
+        return remaining / rate
+
+    def snapshot(self) -> dict[str, Any]:
+        rows_per_second = self.rows_per_second()
+        eta = self.eta_seconds()
+        with self._lock:
+            rows_done = sum(self.rows_done.values())
+            steps = {
+                f"{entity_type}.{step}": {
+                    "count": self._step_counts[(entity_type, step)],
+                    "p50_ms": round(_percentile(list(samples), 50) * 1000, 1),
+                    "p95_ms": round(_percentile(list(samples), 95) * 1000, 1),
+                }
+                for (entity_type, step), samples in sorted(self._latencies.items())
+            }
+            return {
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "elapsed_seconds": round(time.monotonic() - self.started, 1),
+                "rows_done": rows_done,
+                "rows_per_second": round(rows_per_second, 2),
+                "eta_seconds": None if eta is None else round(eta),
+                "api_calls": self.api_calls,
+                "api_calls_per_row": round(self.api_calls / rows_done, 2) if rows_done else None,
+                "entities": {
+                    entity_type: {
+                        "rows_done": self.rows_done.get(entity_type, 0),
+                        "rows_rejected": self.rows_rejected.get(entity_type, 0),
+                        "rows_total": self.rows_total.get(entity_type),
+                    }
+                    for entity_type in {**self.rows_total, **self.rows_done, **self.rows_rejected}
+                },
+                "steps": steps,
+            }
+
+    def maybe_write(self) -> None:
+        if self.path is None or time.monotonic() - self._last_write < self.interval_seconds:
+            return
+        self.write()
+
+    def write(self) -> None:
+        if self.path is None:
+            return
+        with self._write_lock:
+            self._last_write = time.monotonic()
+            payload = self.snapshot()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with tmp_path.open("w", encoding="utf-8") as handle:
+                json.dump(payload, handle, indent=2, sort_keys=True)
+            tmp_path.replace(self.path)
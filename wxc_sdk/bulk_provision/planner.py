@@ -0,0 +1,82 @@
+import json
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Optional
+
+from wxc_sdk.base import ApiModel
+
+
+class PlanAction(str, Enum):
+    create = "create"
+    update = "update"
+    noop = "noop"
+
+
+@dataclass(frozen=True)
+class PlanDecision:
+    entity_type: str
+    entity_key: str
+    action: PlanAction
+    remote_id: Optional[str]
+    changed_fields: tuple[str, ...] = ()
+
+
+def _matches(desired: Any, remote: Any) -> bool:
+    if isinstance(desired, dict):
+        if not isinstance(remote, dict):
+            return False
+        return all(_matches(value, remote.get(key)) for key, value in desired.items() if value is not None)
+    if isinstance(desired, list):
+        if not desired and not remote:
+            return True
+        if not isinstance(remote, list):
+            return False
+        # order of emails, licenses, ... is not significant
+        return sorted(json.dumps(item, sort_keys=True) for item in desired) == sorted(
+            json.dumps(item, sort_keys=True) for item in remote
+        )
+    return desired == remote
+
+
+def _specified(value: Any) -> bool:
+    # None and an empty list both mean the input did not specify the field
+    return value is not None and value != []
+
+
+def changed_fields(desired: ApiModel, remote: ApiModel) -> tuple[str, ...]:
+    """
+    Names of the fields set in ``desired`` which differ from ``remote``; fields not set in ``desired`` or set to an
+    empty list are ignored
+    """
+    wanted = desired.model_dump(mode="json", exclude_none=True)
+    current = remote.model_dump(mode="json", exclude_none=True)
+    return tuple(sorted(key for key, value in wanted.items()
+                        if _specified(value) and not _matches(value, current.get(key))))
+
+
+def plan_entity(
+    *,
+    entity_type: str,
+    entity_key: str,
+    desired: ApiModel,
+    remote: Optional[ApiModel],
+    remote_id: Optional[str],
+) -> PlanDecision:
+    if remote is None:
+        return PlanDecision(entity_type=entity_type, entity_key=entity_key, action=PlanAction.create, remote_id=None)
+    changed = changed_fields(desired, remote)
+    return PlanDecision(
+        entity_type=entity_type,
+        entity_key=entity_key,
+        action=PlanAction.update if changed else PlanAction.noop,
+        remote_id=remote_id,
+        changed_fields=changed,
+    )
+
+
+def merge_update(remote: ApiModel, desired: ApiModel) -> ApiModel:
+    """
+    Remote object with the fields set in ``desired`` applied; for APIs which expect all details on update
+    """
+    return remote.model_copy(update={name: getattr(desired, name) for name in desired.model_fields_set
+                                     if _specified(getattr(desired, name))})
@@ -27,6 +27,7 @@ class Writers:
     results_path: Path
     pending_path: Path
     rejected_path: Path
+    plan_path: Optional[Path] = None
 
     def write_result(
         self,
@@ -129,3 +130,31 @@ class Writers:
                 raw_row_minified,
             ],
         )
+
+    def write_plan(
+        self,
+        *,
+        batch_id: int,
+        row_id: int,
+        entity_type: str,
+        entity_key: str,
+        action: str,
+        remote_id: Optional[str],
+        changed_fields: Iterable[str],
+    ) -> None:
+        if self.plan_path is None:
+            return
+        _append_row(
+            self.plan_path,
+            ["timestamp", "batch_id", "row_id", "entity_type", "entity_key", "action", "remote_id", "changed_fields"],
+            [
+                utc_timestamp(),
+                batch_id,
+                row_id,
+                entity_type,
+                entity_key,
+                action,
+                "" if remote_id is None else remote_id,
+                ";".join(changed_fields),
+            ],
+        )